@@ -5,7 +5,7 @@ from pathlib import Path
 import sys
 
 from alembic import context
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import engine_from_config, pool, text
 
 
 # Ensure `app.*` imports work when running from backend/
@@ -14,17 +14,23 @@ if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
 from app.db.session import DATABASE_URL  # noqa: E402
+from app.db.sqlite_pragmas import install_sqlite_pragmas  # noqa: E402
 from app.models.models import Base  # noqa: E402
 
 
 config = context.config
-config.set_main_option("sqlalchemy.url", DATABASE_URL)
+# Tools migrating another database (scripts/sqlite_to_postgres.py) pass their own URL.
+if not config.attributes.get("explicit_url"):
+    config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 target_metadata = Base.metadata
 
+# pg_advisory_xact_lock key serializing concurrent `upgrade head` runs on PostgreSQL.
+MIGRATION_LOCK_KEY = 20260220
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -46,6 +52,8 @@ def run_migrations_online() -> None:
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
+    # Same journal mode / busy_timeout as the app, so migrations wait for running writers.
+    install_sqlite_pragmas(connectable)
 
     with connectable.connect() as connection:
         context.configure(
@@ -55,6 +63,9 @@ def run_migrations_online() -> None:
         )
 
         with context.begin_transaction():
+            if connection.dialect.name == "postgresql":
+                # Every app replica migrates on startup; let one of them at a time do it.
+                connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
             context.run_migrations()
 
 
@@ -0,0 +1,101 @@
+"""Add breeder_status summary table
+
+Revision ID: 20261017_0001
+Revises: 20260226_0001
+Create Date: 2026-10-17
+
+The series+sex list page used to aggregate breeder_events, egg_records and
+mating_records (four GROUP BY max() queries) on every request. We now persist
+a per-female summary that admin write paths keep up to date, so the list is a
+single indexed join.
+
+Backfill uses the same rules as the list page: prefer breeder_events, keep
+legacy tables as fallback, and take the latest of both.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0001"
+down_revision = "20260226_0001"
+branch_labels = None
+depends_on = None
+
+
+def _as_datetime(value):
+    # SQLite returns raw strings for aggregates over DateTime columns.
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def upgrade() -> None:
+    op.create_table(
+        "breeder_status",
+        sa.Column("product_id", sa.String(), sa.ForeignKey("products.id"), primary_key=True, nullable=False),
+        sa.Column("last_egg_at", sa.DateTime(), nullable=True),
+        sa.Column("last_mating_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+    bind = op.get_bind()
+
+    female_ids = [
+        row[0] for row in bind.execute(sa.text("SELECT id FROM products WHERE lower(sex) = 'female'")).fetchall()
+    ]
+    if not female_ids:
+        return
+
+    last_egg: dict = {}
+    last_mating: dict = {}
+
+    def _keep_latest(latest: dict, female_id, dt):
+        dt = _as_datetime(dt)
+        if female_id and dt and (female_id not in latest or dt > latest[female_id]):
+            latest[female_id] = dt
+
+    for female_id, dt in bind.execute(
+        sa.text("SELECT product_id, event_date FROM breeder_events WHERE event_type = 'egg'")
+    ).fetchall():
+        _keep_latest(last_egg, female_id, dt)
+
+    for female_id, dt in bind.execute(sa.text("SELECT female_id, laid_at FROM egg_records")).fetchall():
+        _keep_latest(last_egg, female_id, dt)
+
+    for female_id, dt in bind.execute(
+        sa.text("SELECT product_id, event_date FROM breeder_events WHERE event_type = 'mating'")
+    ).fetchall():
+        _keep_latest(last_mating, female_id, dt)
+
+    for female_id, dt in bind.execute(sa.text("SELECT female_id, mated_at FROM mating_records")).fetchall():
+        _keep_latest(last_mating, female_id, dt)
+
+    now = datetime.utcnow()
+    for female_id in female_ids:
+        bind.execute(
+            sa.text(
+                """
+                INSERT INTO breeder_status (
+                    product_id, last_egg_at, last_mating_at, updated_at
+                ) VALUES (
+                    :product_id, :last_egg_at, :last_mating_at, :updated_at
+                )
+                """
+            ),
+            {
+                "product_id": female_id,
+                "last_egg_at": last_egg.get(female_id),
+                "last_mating_at": last_mating.get(female_id),
+                "updated_at": now,
+            },
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("breeder_status")
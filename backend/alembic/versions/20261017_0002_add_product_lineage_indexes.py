@@ -0,0 +1,30 @@
+"""Add products sire_code / dam_code indexes
+
+Revision ID: 20261017_0002
+Revises: 20261017_0001
+Create Date: 2026-10-17
+
+Offspring and descendant lookups filter on sire_code / dam_code (one IN (...)
+query per generation); without indexes each of those is a full table scan.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0002"
+down_revision = "20261017_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_products_sire_code", "products", ["sire_code"], unique=False)
+    op.create_index("ix_products_dam_code", "products", ["dam_code"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_dam_code", table_name="products")
+    op.drop_index("ix_products_sire_code", table_name="products")
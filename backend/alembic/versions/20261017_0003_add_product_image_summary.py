@@ -0,0 +1,71 @@
+"""Add products main_image_url / thumbnail_url
+
+Revision ID: 20261017_0003
+Revises: 20261017_0002
+Create Date: 2026-10-17
+
+List pages, tree nodes and mate-load rows only need one image per product but
+loaded every product_images row to find it. Store the main/thumbnail URLs on
+products (kept in sync by the admin image endpoints) so those reads can skip
+the images join.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0003"
+down_revision = "20261017_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("products") as batch_op:
+        batch_op.add_column(sa.Column("main_image_url", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("thumbnail_url", sa.String(), nullable=True))
+
+    # Backfill: thumbnail = first image by sort_order; main = "main" image, else thumbnail.
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            """
+            SELECT product_id, url, type
+            FROM product_images
+            WHERE url IS NOT NULL AND url != ''
+            ORDER BY product_id, COALESCE(sort_order, 0)
+            """
+        )
+    ).fetchall()
+
+    summary: dict[str, list] = {}
+    for product_id, url, image_type in rows:
+        entry = summary.setdefault(product_id, [None, url])
+        if entry[0] is None and image_type == "main":
+            entry[0] = url
+
+    for product_id, (main_url, thumbnail_url) in summary.items():
+        bind.execute(
+            sa.text(
+                """
+                UPDATE products
+                SET main_image_url = :main_url,
+                    thumbnail_url = :thumbnail_url
+                WHERE id = :product_id
+                """
+            ),
+            {
+                "main_url": main_url or thumbnail_url,
+                "thumbnail_url": thumbnail_url,
+                "product_id": product_id,
+            },
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("products") as batch_op:
+        batch_op.drop_column("thumbnail_url")
+        batch_op.drop_column("main_image_url")
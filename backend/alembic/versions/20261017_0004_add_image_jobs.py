@@ -0,0 +1,68 @@
+"""Add image_jobs / image_job_items
+
+Revision ID: 20261017_0004
+Revises: 20261017_0003
+Create Date: 2026-10-17
+
+Admin uploads used to generate all image derivatives inside the request.
+Uploads are now staged and recorded as jobs processed by background worker
+threads; keeping the queue in the database lets a restart resume unfinished
+work.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0004"
+down_revision = "20261017_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "image_jobs",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("product_id", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_image_jobs_product_id", "image_jobs", ["product_id"], unique=False)
+    op.create_index("ix_image_jobs_status", "image_jobs", ["status"], unique=False)
+
+    op.create_table(
+        "image_job_items",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("job_id", sa.String(), nullable=False),
+        sa.Column("image_id", sa.String(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("source_path", sa.String(), nullable=False),
+        sa.Column("file_stem", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["image_jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_image_job_items_job_id", "image_job_items", ["job_id"], unique=False)
+    op.create_index("ix_image_job_items_status", "image_job_items", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_image_job_items_status", table_name="image_job_items")
+    op.drop_index("ix_image_job_items_job_id", table_name="image_job_items")
+    op.drop_table("image_job_items")
+    op.drop_index("ix_image_jobs_status", table_name="image_jobs")
+    op.drop_index("ix_image_jobs_product_id", table_name="image_jobs")
+    op.drop_table("image_jobs")
@@ -0,0 +1,29 @@
+"""Add product_images.url index
+
+Revision ID: 20261017_0005
+Revises: 20261017_0004
+Create Date: 2026-10-17
+
+Image files are content-addressed and shared between product_images rows;
+deleting an image counts the remaining rows with the same url before
+unlinking the blob.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0005"
+down_revision = "20261017_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_product_images_url", "product_images", ["url"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_product_images_url", table_name="product_images")
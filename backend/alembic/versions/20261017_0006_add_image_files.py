@@ -0,0 +1,46 @@
+"""Add image_files derivative manifest
+
+Revision ID: 20261017_0006
+Revises: 20261017_0005
+Create Date: 2026-10-17
+
+Generated image files are recorded per stored image URL so deletes and
+storage reporting no longer probe size directories / extensions on disk.
+Files written before this revision can be recorded with
+scripts/backfill_image_manifest.py; until then they are deleted the old way.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0006"
+down_revision = "20261017_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "image_files",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("image_url", sa.String(), nullable=False),
+        sa.Column("path", sa.String(), nullable=False),
+        sa.Column("variant", sa.String(), nullable=False),
+        sa.Column("format", sa.String(), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=True),
+        sa.Column("height", sa.Integer(), nullable=True),
+        sa.Column("bytes", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("path"),
+    )
+    op.create_index("ix_image_files_image_url", "image_files", ["image_url"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_image_files_image_url", table_name="image_files")
+    op.drop_table("image_files")
@@ -0,0 +1,72 @@
+"""Add PostgreSQL-only search and breeder indexes
+
+Revision ID: 20261017_0007
+Revises: 20261017_0006
+Create Date: 2026-10-17
+
+Product search is `code ILIKE '%term%' OR description ILIKE '%term%'`; a btree
+can't serve a leading wildcard, pg_trgm GIN indexes can. The breeder list
+without a series filter orders every turtle-album record (series_id and sex
+set) by the natural code key; the partial index covers exactly those rows.
+
+No-op on SQLite (no trigram operator classes). These indexes are not declared
+on the models, so create_all() databases don't get them.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0007"
+down_revision = "20261017_0006"
+branch_labels = None
+depends_on = None
+
+
+BREEDER_PREDICATE = sa.text("series_id IS NOT NULL AND sex IS NOT NULL")
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    if not _is_postgres():
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_products_code_trgm",
+        "products",
+        ["code"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"code": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_products_description_trgm",
+        "products",
+        ["description"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"description": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_products_breeders_code_sort",
+        "products",
+        ["code_prefix", "code_parent_number", "code_child_number", "code_child_letter", "code"],
+        unique=False,
+        postgresql_where=BREEDER_PREDICATE,
+    )
+
+
+def downgrade() -> None:
+    if not _is_postgres():
+        return
+
+    op.drop_index("ix_products_breeders_code_sort", table_name="products")
+    op.drop_index("ix_products_description_trgm", table_name="products")
+    op.drop_index("ix_products_code_trgm", table_name="products")
@@ -0,0 +1,100 @@
+"""Add partial / composite indexes for breeder queries
+
+Revision ID: 20261017_0008
+Revises: 20261017_0007
+Create Date: 2026-10-17
+
+Breeder queries all carry `series_id IS NOT NULL AND sex IS NOT NULL`;
+indexes partial on it skip the plain catalogue products. Both SQLite and
+PostgreSQL support partial indexes, and both accept an equality/IN on the
+column as implying its IS NOT NULL term.
+
+- products (series_id, sex, natural code key, exclude_from_breeding): series +
+  sex lists in natural order, breeding dashboard.
+- products sire_code / dam_code / mate_code: replace the full sire/dam
+  indexes of 20261017_0002.
+- breeder_events (event_type, male_code, product_id): mate-load candidate
+  females answered from the index alone.
+- mating_records (female_id, mated_at) / egg_records (female_id, laid_at):
+  latest record per female; replace the female_id-only indexes.
+- product_images (product_id): galleries joined onto breeder list pages were
+  found by scanning product_images once per page.
+
+tests/test_breeder_query_plans.py fails when one of these queries goes back
+to a table scan.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0008"
+down_revision = "20261017_0007"
+branch_labels = None
+depends_on = None
+
+
+BREEDER_PREDICATE = "series_id IS NOT NULL AND sex IS NOT NULL"
+
+
+def _create_breeder_index(name: str, columns: list[str]) -> None:
+    where = sa.text(BREEDER_PREDICATE)
+    op.create_index(name, "products", columns, unique=False, sqlite_where=where, postgresql_where=where)
+
+
+def upgrade() -> None:
+    _create_breeder_index(
+        "ix_products_breeder_series_sex_sort",
+        [
+            "series_id",
+            "sex",
+            "code_prefix",
+            "code_parent_number",
+            "code_child_number",
+            "code_child_letter",
+            "code",
+            "exclude_from_breeding",
+        ],
+    )
+    _create_breeder_index("ix_products_breeder_sire_code", ["sire_code"])
+    _create_breeder_index("ix_products_breeder_dam_code", ["dam_code"])
+    _create_breeder_index("ix_products_breeder_mate_code", ["mate_code"])
+    op.drop_index("ix_products_sire_code", table_name="products")
+    op.drop_index("ix_products_dam_code", table_name="products")
+
+    op.create_index(
+        "ix_breeder_events_event_type_male_code_product_id",
+        "breeder_events",
+        ["event_type", "male_code", "product_id"],
+        unique=False,
+    )
+
+    op.create_index(
+        "ix_mating_records_female_id_mated_at", "mating_records", ["female_id", "mated_at"], unique=False
+    )
+    op.drop_index("ix_mating_records_female_id", table_name="mating_records")
+    op.create_index("ix_egg_records_female_id_laid_at", "egg_records", ["female_id", "laid_at"], unique=False)
+    op.drop_index("ix_egg_records_female_id", table_name="egg_records")
+
+    op.create_index("ix_product_images_product_id", "product_images", ["product_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_product_images_product_id", table_name="product_images")
+
+    op.create_index("ix_egg_records_female_id", "egg_records", ["female_id"], unique=False)
+    op.drop_index("ix_egg_records_female_id_laid_at", table_name="egg_records")
+    op.create_index("ix_mating_records_female_id", "mating_records", ["female_id"], unique=False)
+    op.drop_index("ix_mating_records_female_id_mated_at", table_name="mating_records")
+
+    op.drop_index("ix_breeder_events_event_type_male_code_product_id", table_name="breeder_events")
+
+    op.create_index("ix_products_dam_code", "products", ["dam_code"], unique=False)
+    op.create_index("ix_products_sire_code", "products", ["sire_code"], unique=False)
+    op.drop_index("ix_products_breeder_mate_code", table_name="products")
+    op.drop_index("ix_products_breeder_dam_code", table_name="products")
+    op.drop_index("ix_products_breeder_sire_code", table_name="products")
+    op.drop_index("ix_products_breeder_series_sex_sort", table_name="products")
@@ -0,0 +1,35 @@
+"""Add owner / lease columns to image_job_items
+
+Revision ID: 20261017_0009
+Revises: 20261017_0008
+Create Date: 2026-10-17
+
+Recovery used to reset every 'running' item at process start, which also
+took back items another live process was still rendering. A claim now records
+its owner and a lease the owner keeps extending; only items whose lease has
+run out are handed back to the queue.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0009"
+down_revision = "20261017_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("image_job_items") as batch_op:
+        batch_op.add_column(sa.Column("claimed_by", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("image_job_items") as batch_op:
+        batch_op.drop_column("lease_expires_at")
+        batch_op.drop_column("claimed_by")
@@ -0,0 +1,87 @@
+"""Rebuild the natural-code-key indexes on `col IS NULL, col` expressions
+
+Revision ID: 20261017_0010
+Revises: 20261017_0009
+Create Date: 2026-10-17
+
+Breeder lists order the nullable code sort fields NULLS LAST on every backend.
+SQLite indexes are ascending NULLS FIRST, so the plain column indexes of
+20260222_0002 / 20261017_0008 found the rows but the ORDER BY still went
+through a temp B-tree. The lists now order by `col IS NULL, col` and the
+indexes carry the same expressions:
+
+- products (series_id, natural key): series lists.
+- products (series_id, sex, natural key, exclude_from_breeding), partial on
+  breeder rows: series + sex lists, breeding dashboard.
+- products (natural key), partial on breeder rows: lists without a series
+  filter; replaces the PostgreSQL-only index of 20261017_0007.
+
+tests/test_breeder_query_plans.py fails when a list page sorts in a temp B-tree.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0010"
+down_revision = "20261017_0009"
+branch_labels = None
+depends_on = None
+
+
+BREEDER_PREDICATE = "series_id IS NOT NULL AND sex IS NOT NULL"
+SORT_FIELDS = ["code_prefix", "code_parent_number", "code_child_number", "code_child_letter"]
+
+
+def _natural_key() -> list:
+    # PostgreSQL requires index expressions in parentheses.
+    elements = []
+    for column in SORT_FIELDS:
+        elements.extend([sa.text(f"({column} IS NULL)"), column])
+    return elements + ["code"]
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _create_breeder_index(name: str, columns: list) -> None:
+    where = sa.text(BREEDER_PREDICATE)
+    op.create_index(name, "products", columns, unique=False, sqlite_where=where, postgresql_where=where)
+
+
+def upgrade() -> None:
+    op.drop_index("ix_products_series_id_code_sort", table_name="products")
+    op.create_index("ix_products_series_id_code_sort", "products", ["series_id", *_natural_key()], unique=False)
+
+    op.drop_index("ix_products_breeder_series_sex_sort", table_name="products")
+    _create_breeder_index(
+        "ix_products_breeder_series_sex_sort", ["series_id", "sex", *_natural_key(), "exclude_from_breeding"]
+    )
+
+    if _is_postgres():
+        op.drop_index("ix_products_breeders_code_sort", table_name="products")
+    _create_breeder_index("ix_products_breeders_code_sort", _natural_key())
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_breeders_code_sort", table_name="products")
+    if _is_postgres():
+        op.create_index(
+            "ix_products_breeders_code_sort",
+            "products",
+            [*SORT_FIELDS, "code"],
+            unique=False,
+            postgresql_where=sa.text(BREEDER_PREDICATE),
+        )
+
+    op.drop_index("ix_products_breeder_series_sex_sort", table_name="products")
+    _create_breeder_index(
+        "ix_products_breeder_series_sex_sort", ["series_id", "sex", *SORT_FIELDS, "code", "exclude_from_breeding"]
+    )
+
+    op.drop_index("ix_products_series_id_code_sort", table_name="products")
+    op.create_index("ix_products_series_id_code_sort", "products", ["series_id", *SORT_FIELDS, "code"], unique=False)
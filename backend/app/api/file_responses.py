@@ -0,0 +1,173 @@
+"""File responses for image serving: validators, conditional GET and Range.
+
+Starlette 0.27's FileResponse sends an md5(mtime-size) ETag but neither
+evaluates conditional headers nor supports Range, and nothing sets a
+long-lived Cache-Control. Everything that serves image files
+(ImageStaticFiles, /api/images/...) goes through file_response() instead.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Mapping, Optional, Tuple
+
+import anyio
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+# Content-addressed blobs are "<sha256>[-nocrop]", older upload/import stems end in a
+# random hex suffix ("<name>_<8 hex>", "<name>_<6 hex>") and carousel / generic uploads
+# are "[carousel-]<uuid>": such files are never rewritten in place. Only these exact
+# shapes count, so an ordinary name that merely ends in hex digits stays revalidated.
+HASHED_STEM_RE = re.compile(
+    r"(?:^[0-9a-f]{64}(?:-nocrop)?$|_(?:[0-9a-f]{8}|[0-9a-f]{6})$|[0-9a-f]{8}-(?:[0-9a-f]{4}-){3}[0-9a-f]{12}$)",
+    re.IGNORECASE,
+)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def is_hashed_name(name: str) -> bool:
+    """True for image file names (or stems) carrying a random/content suffix."""
+    stem = os.path.basename(name).split(".", 1)[0]
+    return bool(HASHED_STEM_RE.search(stem))
+
+
+def make_etag(stat_result: os.stat_result) -> str:
+    return f'"{stat_result.st_ino:x}-{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match.
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def _not_modified(request_headers: Mapping[str, str], etag: str, stat_result: os.stat_result) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(stat_result.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) for a single `bytes=` range.
+
+    Returns None when the header is absent or not usable (the full file is
+    sent) and raises ValueError when the range cannot be satisfied.
+    """
+
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        # Multipart ranges are not worth supporting for images; send everything.
+        return None
+
+    start_s, sep, end_s = spec.partition("-")
+    if not sep:
+        return None
+    try:
+        if not start_s:
+            suffix = int(end_s)
+            if suffix <= 0:
+                raise ValueError
+            start, end = max(0, size - suffix), size - 1
+        else:
+            start = int(start_s)
+            end = min(int(end_s), size - 1) if end_s else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+class FileRangeResponse(Response):
+    """206 response streaming bytes [start, end] of a file."""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, start: int, end: int, headers: dict, media_type: str, method: str = "GET"):
+        super().__init__(status_code=206, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.end = end
+        self.send_body = method.upper() != "HEAD"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_body:
+            async with await anyio.open_file(self.path, mode="rb") as fh:
+                await fh.seek(self.start)
+                remaining = self.end - self.start + 1
+                while remaining > 0:
+                    chunk = await fh.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def file_response(
+    path: str,
+    request_headers: Mapping[str, str],
+    method: str = "GET",
+    media_type: Optional[str] = None,
+    immutable: bool = False,
+    headers: Optional[Mapping[str, str]] = None,
+    stat_result: Optional[os.stat_result] = None,
+) -> Response:
+    """Serve `path` honouring If-None-Match/If-Modified-Since, Range and If-Range.
+
+    `request_headers` must be a case-insensitive mapping (starlette Headers) or
+    a dict with lower-case keys.
+    """
+
+    stat_result = stat_result or os.stat(path)
+    media_type = media_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    etag = make_etag(stat_result)
+
+    out = dict(headers or {})
+    out["etag"] = etag
+    out["last-modified"] = formatdate(stat_result.st_mtime, usegmt=True)
+    out["accept-ranges"] = "bytes"
+    if immutable:
+        out["cache-control"] = IMMUTABLE_CACHE_CONTROL
+
+    if _not_modified(request_headers, etag, stat_result):
+        return Response(status_code=304, headers={k: v for k, v in out.items() if k != "accept-ranges"})
+
+    size = stat_result.st_size
+    if_range = request_headers.get("if-range")
+    range_header = request_headers.get("range")
+    if if_range and if_range.strip() != etag:
+        # The client's partial copy is stale; send the whole file.
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={"content-range": f"bytes */{size}", **out})
+
+    if byte_range is None:
+        return FileResponse(path, stat_result=stat_result, method=method, media_type=media_type, headers=out)
+
+    start, end = byte_range
+    out["content-range"] = f"bytes {start}-{end}/{size}"
+    out["content-length"] = str(end - start + 1)
+    return FileRangeResponse(path, start, end, out, media_type, method)
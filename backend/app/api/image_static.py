@@ -0,0 +1,77 @@
+"""StaticFiles mount for product images with format negotiation and resizing.
+
+`/static/images/<product_id>/<stem>.jpg` (and the `/images/...` alias) is what
+normalize_local_image_url hands out. For such paths the response is chosen by
+the request's Accept header (AVIF when available, then WebP, else the JPEG
+itself) and an optional `?w=` width, via the on-demand variant cache. Every
+negotiated response carries `Vary: Accept`. All files are served through
+app.api.file_responses (ETag/304, Range, immutable Cache-Control for hashed
+file names).
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Optional, Tuple
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, QueryParams
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.types import Scope
+
+from app.api.file_responses import file_response, is_hashed_name
+from app.services.image_variants import get_image_variant, negotiate_format
+
+
+class ImageStaticFiles(StaticFiles):
+    def __init__(self, *args, images_subdir: str = "", **kwargs):
+        super().__init__(*args, **kwargs)
+        # Location of UPLOAD_DIR inside this mount ("" when the mount is UPLOAD_DIR itself).
+        self.images_subdir = images_subdir.strip("/")
+
+    def _product_image(self, path: str) -> Optional[Tuple[str, str]]:
+        """(product_id, stem) when `path` is a full-size product JPEG."""
+        parts = [p for p in path.replace("\\", "/").split("/") if p]
+        prefix = [p for p in self.images_subdir.split("/") if p]
+        if parts[: len(prefix)] != prefix:
+            return None
+        rest = parts[len(prefix):]
+        if len(rest) != 2 or not rest[1].lower().endswith(".jpg"):
+            return None
+        return rest[0], rest[1][: -len(".jpg")]
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        if status_code != 200:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        return file_response(
+            str(full_path),
+            Headers(scope=scope),
+            method=scope["method"],
+            immutable=is_hashed_name(scope["path"]),
+            stat_result=stat_result,
+        )
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        target = self._product_image(path) if scope["method"] in ("GET", "HEAD") else None
+        if target is None:
+            return await super().get_response(path, scope)
+
+        headers = Headers(scope=scope)
+        width = QueryParams(scope.get("query_string", b"")).get("w")
+        try:
+            variant, _ = await get_image_variant(
+                *target,
+                width=int(width) if width else None,
+                fmt=negotiate_format(headers.get("accept")),
+            )
+        except FileNotFoundError:
+            raise HTTPException(status_code=404)
+        except ValueError:
+            raise HTTPException(status_code=400)
+
+        stat_result = await anyio.to_thread.run_sync(os.stat, variant)
+        response = self.file_response(variant, stat_result, scope)
+        response.headers["Vary"] = "Accept"
+        return response
@@ -1,3 +1,4 @@
+import os
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
@@ -9,11 +10,22 @@ from app.db.session import get_db
 from app.models.models import Product, ProductImage, SeriesProductRelation, BreederEvent
 from app.schemas.schemas import ProductCreate, ProductUpdate, ApiResponse
 from app.core.security import get_current_active_user, User
-from app.core.file_utils import delete_file, save_product_images_optimized
+from app.core.file_utils import UploadBudget, UploadTooLargeError
 from app.api.utils import convert_product_to_response
 from app.services.breeder_mate import process_pair_transition_description
+from app.services.breeder_status import refresh_breeder_status
+from app.services.image_jobs import (
+    discard_product_jobs,
+    enqueue_image_job,
+    notify_image_workers,
+    queued_file_stems,
+    stage_upload,
+)
+from app.services.image_store import blob_is_rendered, blob_stem_for_digest, blob_url, release_image_file
+from app.services.product_image_summary import refresh_product_image_urls
 from app.services.code_normalize import normalize_code_upper
 from app.services.code_sort_fields import parse_code_sort_fields
+from app.services.lineage_graph import patch_lineage_graph, remove_from_lineage_graph
 
 router = APIRouter()
 
@@ -75,6 +87,8 @@ async def create_product(
     db.refresh(product)
 
     _sync_primary_series_relation(db, product)
+    if (product.sex or "").lower() == "female":
+        refresh_breeder_status(db, product.id)
     db.commit()
 
     # Add images if provided
@@ -83,12 +97,17 @@ async def create_product(
             product_id=product.id,
             url=image_data.url,
             alt=image_data.alt,
-            type=image_data.type
+            type=image_data.type,
+            sort_order=image_data.sort_order,
         )
         db.add(image)
-    
+    if product_data.images:
+        db.flush()
+        refresh_product_image_urls(db, product.id)
+
     db.commit()
     db.refresh(product)
+    patch_lineage_graph(db, product)
 
     return ApiResponse(
         data=convert_product_to_response(product),
@@ -183,7 +202,11 @@ async def update_product(
         )
 
     _sync_primary_series_relation(db, product)
+    if "sex" in update_data:
+        db.flush()
+        refresh_breeder_status(db, product.id)
     db.commit()
+    patch_lineage_graph(db, product)
 
     return ApiResponse(
         data=convert_product_to_response(product),
@@ -201,16 +224,20 @@ async def delete_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    # Delete associated image files
-    for image in product.images:
-        delete_file(image.url)  # type: ignore
+    image_urls = {image.url for image in product.images}
 
     # Keep relation table clean during transition.
     db.query(SeriesProductRelation).filter(SeriesProductRelation.product_id == product.id).delete()
+    discard_product_jobs(db, product.id)
 
-    # Delete product (cascade will handle images)
+    # Delete product (cascade will handle images), then the files no other product shares.
     db.delete(product)
+    db.flush()
+    for url in image_urls:
+        release_image_file(db, url)
     db.commit()
+    notify_image_workers()
+    remove_from_lineage_graph(db, product_id)
 
     return ApiResponse(
         data=None,
@@ -224,7 +251,12 @@ async def upload_product_images(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Upload images for a product with automatic optimization (admin only)."""
+    """Upload images for a product (admin only).
+
+    Originals are staged and placeholder image rows are returned right away;
+    resized derivatives are generated by the background image job queue
+    (progress: GET /api/admin/image-jobs/{jobId}).
+    """
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -232,43 +264,85 @@ async def upload_product_images(
     if not images:
         raise HTTPException(status_code=400, detail="No images provided")
 
-    # Save and optimize uploaded files
+    # Hand the writer connection back while uploads stream to disk; the session
+    # checks one out again for the inserts below.
+    db.rollback()
+
+    # Stage uploaded originals (header check only; decoding happens in the job).
+    # Content already in the blob store is referenced without re-encoding.
+    # Uploads are streamed to disk in chunks under the per-file/per-request limits.
+    uploads = []
+    seen_stems = set()
+    budget = UploadBudget()
     try:
-        saved_images_info = await save_product_images_optimized(images, product.id)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        for upload in images:
+            if not upload.filename:
+                continue
+            staged_path, digest = await stage_upload(upload, budget)
+            file_stem = blob_stem_for_digest(digest)
+            if file_stem in seen_stems:
+                # The same content twice in one request gets one row (and at most one job item).
+                os.remove(staged_path)
+                continue
+            seen_stems.add(file_stem)
+            if blob_is_rendered(file_stem):
+                os.remove(staged_path)
+                staged_path = None
+            uploads.append((file_stem, staged_path))
+    except ValueError as e:
+        for _, path in uploads:
+            if path:
+                os.remove(path)
+        status_code = 413 if isinstance(e, UploadTooLargeError) else 400
+        raise HTTPException(status_code=status_code, detail=str(e))
+
+    if not uploads:
+        raise HTTPException(status_code=400, detail="No images provided")
+
+    # Content still queued by an earlier upload is not rendered twice: the new row
+    # shares that item's URL and files (and is dropped with it if the render fails).
+    queued = queued_file_stems(db, [file_stem for file_stem, staged_path in uploads if staged_path])
+    for i, (file_stem, staged_path) in enumerate(uploads):
+        if file_stem in queued:
+            os.remove(staged_path)
+            uploads[i] = (file_stem, None)
 
     # Get current max sort_order for this product
     max_sort_order = db.query(func.max(ProductImage.sort_order)).filter(
         ProductImage.product_id == product.id
     ).scalar() or -1
 
-    # If a new main image is uploaded, demote any existing main.
-    if any(img.get("type") == "main" for img in saved_images_info):
-        db.query(ProductImage).filter(
-            ProductImage.product_id == product.id,
-            ProductImage.type == "main",
-        ).update({"type": "gallery"})
-        db.flush()
+    # The first uploaded image becomes the new main; demote any existing main.
+    db.query(ProductImage).filter(
+        ProductImage.product_id == product.id,
+        ProductImage.type == "main",
+    ).update({"type": "gallery"})
+    db.flush()
 
-    # Create image records in database
+    # Create image records; new content gets placeholders until the job has run.
     created_images = []
-    for i, img_info in enumerate(saved_images_info):
+    job_items = []
+    for i, (file_stem, staged_path) in enumerate(uploads):
         image = ProductImage(
             product_id=product.id,
-            url=img_info["url"],
-            alt=img_info["alt"],
-            type=img_info["type"],
+            url=blob_url(file_stem),
+            alt=f"{product.id} - Image {i+1}",
+            type="main" if i == 0 else "gallery",
             sort_order=max_sort_order + i + 1  # Append to end
         )
         db.add(image)
         created_images.append(image)
+        if staged_path:
+            job_items.append((image, staged_path, file_stem))
 
+    job = enqueue_image_job(db, product.id, job_items) if job_items else None
+    db.flush()
+    refresh_product_image_urls(db, product.id)
     db.commit()
+    notify_image_workers()
 
-    # Refresh to get IDs
-    for image in created_images:
-        db.refresh(image)
+    pending_urls = {blob_url(file_stem) for file_stem, staged_path in uploads if staged_path or file_stem in queued}
+    pending_ids = {image.id for image in created_images if image.url in pending_urls}
 
     # Return the full image list (sorted) so the admin UI does not drop existing images.
     all_images = (
@@ -280,12 +354,19 @@ async def upload_product_images(
 
     return ApiResponse(
         data={
+            "jobId": job.id if job else None,
             "images": [
-                {"id": img.id, "url": img.url, "alt": img.alt, "type": img.type}
+                {
+                    "id": img.id,
+                    "url": img.url,
+                    "alt": img.alt,
+                    "type": img.type,
+                    "status": "pending" if img.id in pending_ids else "ready",
+                }
                 for img in all_images
             ]
         },
-        message=f"Successfully uploaded and optimized {len(created_images)} images"
+        message=f"Accepted {len(created_images)} images ({len(job_items)} queued for processing)"
     )
 
 @router.delete("/{product_id}/images/{image_id}", response_model=ApiResponse)
@@ -306,12 +387,10 @@ async def delete_product_image(
 
     was_main = image.type == "main"
 
-    # Delete file
-    delete_file(image.url)  # type: ignore
-
-    # Delete database record
+    # Delete database record, then the file unless another image shares it
     db.delete(image)
-    db.commit()
+    db.flush()
+    release_image_file(db, image.url)
 
     # Keep invariant: when main is deleted, promote the first remaining image.
     if was_main:
@@ -323,7 +402,10 @@ async def delete_product_image(
         )
         if next_img:
             next_img.type = "main"
-            db.commit()
+
+    db.flush()
+    refresh_product_image_urls(db, product_id)
+    db.commit()
 
     return ApiResponse(
         data=None,
@@ -355,6 +437,8 @@ async def set_product_main_image(
     ).update({"type": "gallery"})
 
     image.type = "main"
+    db.flush()
+    refresh_product_image_urls(db, product_id)
     db.commit()
 
     # Return the updated image list for convenience.
@@ -397,6 +481,8 @@ async def reorder_product_images(
         if image:
             image.sort_order = order_data["sort_order"]
 
+    db.flush()
+    refresh_product_image_urls(db, product_id)
     db.commit()
 
     # Return updated images
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.core.security import get_current_active_user, User
+from app.models.models import ImageJob
+from app.schemas.schemas import ApiResponse
+from app.services.image_jobs import job_to_dict
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=ApiResponse)
+async def get_image_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Admin: progress of a background image upload job."""
+    job = db.query(ImageJob).filter(ImageJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Image job not found")
+    return ApiResponse(data=job_to_dict(job), message="Image job retrieved successfully")
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db, get_read_db
+from app.core.security import get_current_active_user, User
+from app.schemas.schemas import ApiResponse
+from app.services.image_gc import collect_orphans
+from app.services.image_store import storage_usage
+
+router = APIRouter()
+
+
+@router.get("/usage", response_model=ApiResponse)
+async def get_image_storage_usage(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Admin: image storage usage from the derivative manifest (no filesystem walk)."""
+    return ApiResponse(data=storage_usage(db), message="Image storage usage retrieved successfully")
+
+
+async def _collect(db: Session, apply: bool, cursor: Optional[str], max_folders: Optional[int]) -> dict:
+    # The scan is throttled with sleeps: keep it off the event loop.
+    try:
+        return await asyncio.to_thread(collect_orphans, db, apply, cursor, max_folders)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/orphans", response_model=ApiResponse)
+async def get_orphaned_images(
+    cursor: Optional[str] = Query(None, description="Resume after this folder (nextCursor of the previous page)"),
+    max_folders: Optional[int] = Query(200, ge=1, alias="maxFolders"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Admin: dry-run report of image files no product references."""
+    report = await _collect(db, False, cursor, max_folders)
+    return ApiResponse(data=report, message="Orphaned images scanned successfully")
+
+
+@router.post("/orphans/reclaim", response_model=ApiResponse)
+async def reclaim_orphaned_images(
+    cursor: Optional[str] = Query(None, description="Resume after this folder (nextCursor of the previous page)"),
+    max_folders: Optional[int] = Query(200, ge=1, alias="maxFolders"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Admin: delete image files no product references."""
+    report = await _collect(db, True, cursor, max_folders)
+    return ApiResponse(data=report, message="Orphaned images reclaimed successfully")
@@ -8,6 +8,7 @@ from app.core.security import User, get_current_active_user
 from app.db.session import get_db
 from app.models.models import EggRecord, MatingRecord, Product, BreederEvent
 from app.schemas.schemas import ApiResponse, EggRecordCreate, MatingRecordCreate
+from app.services.breeder_status import refresh_breeder_status
 
 router = APIRouter()
 
@@ -139,6 +140,8 @@ async def admin_create_mating_record(
         created_at=record.created_at or payload.mated_at,
     )
     db.add(event)
+    db.flush()
+    refresh_breeder_status(db, female.id)
 
     db.commit()
     db.refresh(record)
@@ -161,7 +164,10 @@ async def admin_delete_mating_record(
         BreederEvent.source_id == record.id,
     ).delete(synchronize_session=False)
 
+    female_id = record.female_id
     db.delete(record)
+    db.flush()
+    refresh_breeder_status(db, female_id)
     db.commit()
 
     return ApiResponse(data=None, message="Mating record deleted successfully")
@@ -196,6 +202,8 @@ async def admin_create_egg_record(
         created_at=record.created_at or payload.laid_at,
     )
     db.add(event)
+    db.flush()
+    refresh_breeder_status(db, female.id)
 
     db.commit()
     db.refresh(record)
@@ -218,7 +226,10 @@ async def admin_delete_egg_record(
         BreederEvent.source_id == record.id,
     ).delete(synchronize_session=False)
 
+    female_id = record.female_id
     db.delete(record)
+    db.flush()
+    refresh_breeder_status(db, female_id)
     db.commit()
 
     return ApiResponse(data=None, message="Egg record deleted successfully")
@@ -298,6 +309,8 @@ async def admin_create_breeder_event(
         created_at=now,
     )
     db.add(e)
+    db.flush()
+    refresh_breeder_status(db, female.id)
     db.commit()
     db.refresh(e)
 
@@ -346,7 +359,10 @@ async def admin_delete_breeder_event(
                 detail="This event is auto-generated from mate code updates and cannot be deleted directly.",
             )
 
+    product_id = event.product_id
     db.delete(event)
+    db.flush()
+    refresh_breeder_status(db, product_id)
     db.commit()
 
     return ApiResponse(data=None, message="Breeder event deleted successfully")
@@ -380,7 +396,10 @@ async def admin_delete_breeder_event(
             detail="Breeder event is derived from mate_code updates; modify mate_code history instead",
         )
 
+    product_id = event.product_id
     db.delete(event)
+    db.flush()
+    refresh_breeder_status(db, product_id)
     db.commit()
 
     return ApiResponse(data=None, message="Breeder event deleted successfully")
@@ -1,25 +1,156 @@
+import base64
+import json
 from datetime import datetime
+from itertools import islice
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import nullslast, func
+from sqlalchemy import DateTime, and_, case, func, literal, not_, or_, select, type_coerce, union, union_all
 from typing import Optional
 
-from app.db.session import get_db
-from app.models.models import Product, MatingRecord, EggRecord, BreederEvent
+from app.db.session import get_async_read_db, get_read_db, run_in_session
+from app.models.models import Product, MatingRecord, EggRecord, BreederEvent, BreederStatus
 from app.schemas.schemas import ApiResponse
 from app.api.utils import convert_product_to_response, normalize_local_image_url
-from app.services.breeder_mate import parse_current_mate_code
+from app.services.breeder_status import need_mating_status
+from app.services.breeding_dashboard import build_breeding_dashboard
+from app.services.current_mate import (
+    canonical_mate_code_candidates,
+    current_mate_code,
+    current_mate_payload,
+    resolve_current_mate,
+    resolve_current_mates,
+)
+from app.services.kinship import inbreeding_risk_level, series_kinship
+from app.services.lineage_graph import LineageNode, get_lineage_graph
+from app.services.pedigree import (
+    DEFAULT_DESCENDANT_DEPTH,
+    DEFAULT_PEDIGREE_DEPTH,
+    MAX_DESCENDANT_DEPTH,
+    MAX_PEDIGREE_DEPTH,
+    ancestor_key,
+    ancestor_relationship,
+    count_offspring,
+    fetch_breeders_by_ids,
+    fetch_descendant_generations,
+)
 
 router = APIRouter()
 
 
+# Natural sort key for breeder lists (e.g. 白化-1, 白化-2, ... 白化-10).
+# `code` is unique, so the tuple is a total order usable as a keyset cursor; in
+# _natural_sort_order() form it matches the trailing index elements of
+# ix_products_series_id_code_sort, ix_products_breeder_series_sex_sort and
+# ix_products_breeders_code_sort (NATURAL_CODE_SORT_INDEX_ELEMENTS).
+_NATURAL_SORT_COLUMNS = (
+    Product.code_prefix,
+    Product.code_parent_number,
+    Product.code_child_number,
+    Product.code_child_letter,
+    Product.code,
+)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+_STREAM_BATCH_SIZE = 200
+
+
+def _natural_sort_order() -> list:
+    # NULLS LAST everywhere so ordering (and the keyset predicate) is identical on SQLite and Postgres.
+    # Spelled `col IS NULL, col` rather than NULLS LAST: SQLite indexes are NULLS FIRST, so
+    # only the expression indexes can hand rows over in this order without a sort.
+    order = []
+    for col in _NATURAL_SORT_COLUMNS[:-1]:
+        order.extend([col.is_(None), col.asc()])
+    # `code` is NOT NULL.
+    return order + [_NATURAL_SORT_COLUMNS[-1].asc()]
+
+
+def _encode_breeder_cursor(key: tuple) -> str:
+    raw = json.dumps(list(key), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_breeder_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(key, list) or len(key) != len(_NATURAL_SORT_COLUMNS) or not key[-1]:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(key)
+
+
+def _natural_sort_after(key: tuple):
+    """Keyset predicate: rows strictly after `key` in _natural_sort_order()."""
+
+    clauses = []
+    prefix_equal = []
+    for col, value in zip(_NATURAL_SORT_COLUMNS, key):
+        # With NULLS LAST nothing sorts after a NULL except other NULLs.
+        if value is not None:
+            clauses.append(and_(*prefix_equal, or_(col > value, col.is_(None))))
+        # NOT (col IS NOT NULL): SQLite takes a bare `col IS NULL` as an equality on the
+        # column and then no longer reads the ORDER BY off the expression index.
+        prefix_equal.append(not_(col.isnot(None).self_group()) if value is None else col == value)
+    return or_(*clauses)
+
+
+def _breeder_sort_key(b: Product) -> tuple:
+    return tuple(getattr(b, col.key) for col in _NATURAL_SORT_COLUMNS)
+
+
+def _breeder_list_item(
+    b: Product,
+    status_last_egg_at: Optional[datetime],
+    status_last_mating_at: Optional[datetime],
+    now: datetime,
+    mate: Optional[LineageNode] = None,
+    include_images: bool = True,
+) -> dict:
+    data = convert_product_to_response(b, include_images=include_images)
+
+    is_female = (b.sex or "").lower() == "female"
+    is_retired = bool(getattr(b, "exclude_from_breeding", False))
+
+    if is_female and not is_retired:
+        last_egg_at = status_last_egg_at
+        last_mating_at = status_last_mating_at
+        status = need_mating_status(now, last_egg_at, last_mating_at)
+        days_since_egg = (now.date() - last_egg_at.date()).days if last_egg_at else None
+    else:
+        # Non-female breeders (or retired females) should not surface mating reminders.
+        last_egg_at = None
+        last_mating_at = None
+        status = "normal"
+        days_since_egg = None
+
+    data.update(
+        {
+            "needMatingStatus": status,
+            "lastEggAt": last_egg_at.isoformat() if last_egg_at else None,
+            "lastMatingAt": last_mating_at.isoformat() if last_mating_at else None,
+            "daysSinceEgg": days_since_egg,
+            "currentMateCode": current_mate_code(b),
+            "currentMate": current_mate_payload(mate),
+        }
+    )
+    return data
+
+
 @router.get("", response_model=ApiResponse)
 async def list_breeders(
+    response: Response,
     series_id: Optional[str] = Query(None),
     sex: Optional[str] = Query(None, description="'male' | 'female'"),
     limit: int = Query(200, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
+    cursor: Optional[str] = None,
+    format_: str = Query("json", alias="format"),
+    include_images: bool = True,
 ):
     """Public: list breeders (repurposed Product) with optional series/sex filters.
 
@@ -27,171 +158,281 @@ async def list_breeders(
     - needMatingStatus: normal | need_mating | warning
     - lastEggAt / lastMatingAt
     - daysSinceEgg
+    - currentMateCode / currentMate (females)
+
+    Status inputs come from the persisted breeder_status summary (maintained by
+    admin write paths), so the whole page is a single joined query; current
+    mates are resolved for the whole page at once.
+
+    Rows are ordered by the natural code key (prefix, parent number, child
+    number, child letter, code) with missing parts sorted last on every
+    backend. `code` is unique, so the created_at tie-breaker earlier versions
+    carried never decided the order and is gone.
 
-    These are computed in bulk to avoid frontend N+1 queries.
+    Pagination is keyset-based on the natural sort key: when more rows exist,
+    the opaque cursor for the next page is returned in the `X-Next-Cursor`
+    header (pass it back as `cursor`). `format=ndjson` streams one breeder
+    object per line instead of building the whole JSON payload in memory.
+
+    `include_images=false` skips loading galleries; rows still carry
+    mainImageUrl / thumbnailUrl from the product columns.
     """
 
-    from sqlalchemy.orm import joinedload
+    if format_ not in {"json", "ndjson"}:
+        raise HTTPException(status_code=400, detail="Invalid format; must be 'json' or 'ndjson'")
+    if sex and sex not in {"male", "female"}:
+        raise HTTPException(status_code=400, detail="Invalid sex; must be 'male' or 'female'")
+
+    if format_ == "ndjson":
+        headers, batches = await run_in_session(db, _stream_breeders, series_id, sex, limit, cursor, include_images)
 
-    query = db.query(Product).options(joinedload(Product.images))
+        async def _iter_lines():
+            # Each batch is fetched on the session's own connection (awaited for an AsyncSession).
+            while True:
+                lines = await run_in_session(db, lambda _session: next(batches, None))
+                if lines is None:
+                    break
+                for line in lines:
+                    yield line
+
+        return StreamingResponse(_iter_lines(), media_type="application/x-ndjson", headers=headers)
+
+    items, next_cursor = await run_in_session(
+        db, _list_breeders_page, series_id, sex, limit, cursor, include_images
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return ApiResponse(
+        data=items,
+        message="Breeders retrieved successfully",
+    )
+
+
+def _breeder_list_query(db: Session, series_id: Optional[str], sex: Optional[str], cursor: Optional[str]):
+    query = (
+        db.query(Product, BreederStatus.last_egg_at, BreederStatus.last_mating_at)
+        .outerjoin(BreederStatus, BreederStatus.product_id == Product.id)
+    )
 
     # Only turtle-album records: must have series_id + sex populated.
     query = query.filter(Product.series_id.isnot(None)).filter(Product.sex.isnot(None))
 
     if series_id:
         query = query.filter(Product.series_id == series_id)
-
     if sex:
-        if sex not in {"male", "female"}:
-            raise HTTPException(status_code=400, detail="Invalid sex; must be 'male' or 'female'")
         query = query.filter(Product.sex == sex)
 
-    # Natural sorting by parsed code fields (e.g. 白化-1, 白化-2, ... 白化-10).
-    breeders: list[Product] = (
-        query.order_by(
-            Product.code_prefix.asc(),
-            nullslast(Product.code_parent_number.asc()),
-            nullslast(Product.code_child_number.asc()),
-            nullslast(Product.code_child_letter.asc()),
-            Product.code.asc(),
-            Product.created_at.desc(),
-        )
-        .limit(limit)
-        .all()
-    )
+    if cursor:
+        query = query.filter(_natural_sort_after(_decode_breeder_cursor(cursor)))
 
-    female_ids = [b.id for b in breeders if (b.sex or "").lower() == "female"]
+    return query.order_by(*_natural_sort_order())
 
-    last_egg_event_map: dict[str, datetime] = {}
-    last_egg_record_map: dict[str, datetime] = {}
-    last_mating_event_map: dict[str, datetime] = {}
-    last_mating_record_map: dict[str, datetime] = {}
 
-    if female_ids:
-        # Prefer breeder_events when present, but keep legacy tables as fallback.
-        for female_id, last_dt in (
-            db.query(BreederEvent.product_id, func.max(BreederEvent.event_date))
-            .filter(BreederEvent.product_id.in_(female_ids))
-            .filter(BreederEvent.event_type == "egg")
-            .group_by(BreederEvent.product_id)
-            .all()
-        ):
-            if female_id and last_dt:
-                last_egg_event_map[female_id] = last_dt
-
-        for female_id, last_dt in (
-            db.query(EggRecord.female_id, func.max(EggRecord.laid_at))
-            .filter(EggRecord.female_id.in_(female_ids))
-            .group_by(EggRecord.female_id)
-            .all()
-        ):
-            if female_id and last_dt:
-                last_egg_record_map[female_id] = last_dt
-
-        for female_id, last_dt in (
-            db.query(BreederEvent.product_id, func.max(BreederEvent.event_date))
-            .filter(BreederEvent.product_id.in_(female_ids))
-            .filter(BreederEvent.event_type == "mating")
-            .group_by(BreederEvent.product_id)
-            .all()
-        ):
-            if female_id and last_dt:
-                last_mating_event_map[female_id] = last_dt
-
-        for female_id, last_dt in (
-            db.query(MatingRecord.female_id, func.max(MatingRecord.mated_at))
-            .filter(MatingRecord.female_id.in_(female_ids))
-            .group_by(MatingRecord.female_id)
-            .all()
-        ):
-            if female_id and last_dt:
-                last_mating_record_map[female_id] = last_dt
+def _list_breeders_page(
+    db: Session,
+    series_id: Optional[str],
+    sex: Optional[str],
+    limit: int,
+    cursor: Optional[str],
+    include_images: bool,
+) -> tuple[list, Optional[str]]:
+    """One page of list items plus the next cursor (None on the last page)."""
+    from sqlalchemy.orm import selectinload
+
+    query = _breeder_list_query(db, series_id, sex, cursor)
+    if include_images:
+        # Not joinedload: it wraps the LIMITed query in a subquery and sorts that again.
+        query = query.options(selectinload(Product.images))
+    rows = query.limit(limit + 1).all()
 
-    def _pick_latest(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
-        if a and b:
-            return a if a >= b else b
-        return a or b
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = _encode_breeder_cursor(_breeder_sort_key(rows[-1][0])) if has_more and rows else None
 
     now = datetime.utcnow()
+    mates = resolve_current_mates(db, (b for b, _, _ in rows))
+    items = [
+        _breeder_list_item(b, status_last_egg_at, status_last_mating_at, now, mates.get(b.id), include_images)
+        for b, status_last_egg_at, status_last_mating_at in rows
+    ]
+    return items, next_cursor
+
+
+def _stream_breeders(
+    db: Session,
+    series_id: Optional[str],
+    sex: Optional[str],
+    limit: int,
+    cursor: Optional[str],
+    include_images: bool,
+):
+    """Response headers plus an iterator of NDJSON line batches.
 
-    items: list[dict] = []
-    for b in breeders:
-        data = convert_product_to_response(b)
-
-        is_female = (b.sex or "").lower() == "female"
-        is_retired = bool(getattr(b, "exclude_from_breeding", False))
-
-        if is_female and not is_retired:
-            last_egg_at = _pick_latest(last_egg_event_map.get(b.id), last_egg_record_map.get(b.id))
-            last_mating_at = _pick_latest(last_mating_event_map.get(b.id), last_mating_record_map.get(b.id))
-            status = _compute_need_mating_status(now, last_egg_at, last_mating_at)
-            days_since_egg = (now.date() - last_egg_at.date()).days if last_egg_at else None
-        else:
-            # Non-female breeders (or retired females) should not surface mating reminders.
-            last_egg_at = None
-            last_mating_at = None
-            status = "normal"
-            days_since_egg = None
-
-        data.update(
-            {
-                "needMatingStatus": status,
-                "lastEggAt": last_egg_at.isoformat() if last_egg_at else None,
-                "lastMatingAt": last_mating_at.isoformat() if last_mating_at else None,
-                "daysSinceEgg": days_since_egg,
-            }
-        )
-        items.append(data)
+    The iterator reads from `db` lazily; advance it inside run_in_session().
+    """
+    from sqlalchemy.orm import selectinload
 
-    return ApiResponse(
-        data=items,
-        message="Breeders retrieved successfully",
-    )
+    query = _breeder_list_query(db, series_id, sex, cursor)
+
+    # Peek at the page boundary with a key-only query so the next cursor can be
+    # sent as a header before the body starts streaming.
+    boundary = query.with_entities(*_NATURAL_SORT_COLUMNS).offset(limit - 1).limit(2).all()
+    headers = {}
+    if len(boundary) > 1:
+        headers[NEXT_CURSOR_HEADER] = _encode_breeder_cursor(tuple(boundary[0]))
+
+    stream_q = query.limit(limit).yield_per(_STREAM_BATCH_SIZE)
+    if include_images:
+        stream_q = stream_q.options(selectinload(Product.images))
+    now = datetime.utcnow()
+
+    def _iter_batches():
+        rows_iter = iter(stream_q)
+        while True:
+            batch = list(islice(rows_iter, _STREAM_BATCH_SIZE))
+            if not batch:
+                break
+            mates = resolve_current_mates(db, (b for b, _, _ in batch))
+            yield [
+                json.dumps(
+                    _breeder_list_item(b, status_last_egg_at, status_last_mating_at, now, mates.get(b.id), include_images),
+                    ensure_ascii=False,
+                )
+                + "\n"
+                for b, status_last_egg_at, status_last_mating_at in batch
+            ]
+
+    return headers, _iter_batches()
 
 
 @router.get("/by-code/{code}", response_model=ApiResponse)
 async def get_breeder_by_code(
     code: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    """Public: breeder summary by exact code.
+    """Public: breeder summary by code (resolved via the lineage graph; case-insensitive).
 
     Used by the frontend to map sireCode/damCode -> breeder id.
     """
-    from sqlalchemy.orm import joinedload
+    node = get_lineage_graph(db).get(code)
+    if not node:
+        raise HTTPException(status_code=404, detail="Breeder not found")
 
     breeder = (
-        db.query(Product)
-        .options(joinedload(Product.images))
-        .filter(Product.code == code)
-        .filter(Product.series_id.isnot(None))
-        .filter(Product.sex.isnot(None))
+        db.query(Product.id, Product.code, Product.main_image_url)
+        .filter(Product.id == node.id)
         .first()
     )
     if not breeder:
         raise HTTPException(status_code=404, detail="Breeder not found")
 
-    main_image_url = None
-    if breeder.images:
-        main_image = next((img for img in breeder.images if img.type == "main"), None)
-        main_image_url = (main_image.url if main_image else breeder.images[0].url) if breeder.images else None
-
     return ApiResponse(
         data={
             "id": breeder.id,
             "code": breeder.code,
-            "mainImageUrl": main_image_url,
+            "mainImageUrl": breeder.main_image_url,
         },
         message="Breeder retrieved successfully",
     )
 
 
+def _kinship_round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 6)
+
+
+@router.get("/pairing-matrix", response_model=ApiResponse)
+async def get_pairing_matrix(
+    series_id: str,
+    include_retired: bool = False,
+    db: Session = Depends(get_read_db),
+):
+    """Public: Wright's F of the hypothetical offspring of every male x female in a series.
+
+    `coefficients[i][j]` is the pairing of `males[i]` with `females[j]`.
+    """
+
+    graph = get_lineage_graph(db)
+    kinship = series_kinship(graph, series_id)
+
+    members = [n for n in graph.members(series_id) if include_retired or not n.exclude_from_breeding]
+    males = [n for n in members if (n.sex or "").lower() == "male"]
+    females = [n for n in members if (n.sex or "").lower() == "female"]
+
+    def _candidate(n: LineageNode) -> dict:
+        return {"id": n.id, "code": n.code, "inbreeding": _kinship_round(kinship.inbreeding(n.code))}
+
+    matrix = kinship.pairing_matrix([n.code for n in males], [n.code for n in females])
+
+    return ApiResponse(
+        data={
+            "seriesId": series_id,
+            "males": [_candidate(n) for n in males],
+            "females": [_candidate(n) for n in females],
+            "coefficients": matrix.round(6).tolist(),
+        },
+        message="Pairing matrix retrieved successfully",
+    )
+
+
+@router.get("/dashboard", response_model=ApiResponse)
+async def get_breeding_dashboard(
+    series_id: str,
+    include_retired: bool = False,
+    db: Session = Depends(get_read_db),
+):
+    """Public: mating status of every female in a series, grouped by current mate.
+
+    Each group carries per-male totals (females / needMating / warning) and its
+    females ordered most urgent first, as on the male mate-load page.
+    """
+
+    return ApiResponse(
+        data=build_breeding_dashboard(db, series_id, include_retired=include_retired),
+        message="Breeding dashboard retrieved successfully",
+    )
+
+
+@router.get("/{breeder_id}/inbreeding", response_model=ApiResponse)
+async def get_breeder_inbreeding(
+    breeder_id: str,
+    db: Session = Depends(get_read_db),
+):
+    """Public: Wright's coefficient of inbreeding for one breeder."""
+
+    graph = get_lineage_graph(db)
+    node = graph.get_by_id(breeder_id)
+    if not node:
+        raise HTTPException(status_code=404, detail="Breeder not found")
+
+    kinship = series_kinship(graph, node.series_id)
+    coefficient = kinship.inbreeding(node.code)
+
+    return ApiResponse(
+        data={
+            "breederId": node.id,
+            "code": node.code,
+            "sireCode": node.sire_code,
+            "damCode": node.dam_code,
+            "coefficient": _kinship_round(coefficient),
+            "riskLevel": inbreeding_risk_level(coefficient),
+            "parentsKnown": bool(node.sire_code and node.dam_code),
+        },
+        message="Inbreeding coefficient retrieved successfully",
+    )
+
+
 @router.get("/{breeder_id}", response_model=ApiResponse)
 async def get_breeder_detail(
     breeder_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Public: breeder (post) detail."""
+    data = await run_in_session(db, _breeder_detail, breeder_id)
+    return ApiResponse(data=data, message="Breeder retrieved successfully")
+
+
+def _breeder_detail(db: Session, breeder_id: str) -> dict:
     from sqlalchemy.orm import joinedload
     breeder = (
         db.query(Product)
@@ -208,28 +449,15 @@ async def get_breeder_detail(
 
     # For female breeders, expose a best-effort mate code even when we can't resolve
     # an actual breeder record id (so the UI can still show the yellow pill).
-    if breeder.sex == "female":
-        data["currentMateCode"] = (
-            (getattr(breeder, "mate_code", None) or "").strip()
-            or (parse_current_mate_code(getattr(breeder, "description", None)) or "").strip()
-            or None
-        )
-    else:
-        data["currentMateCode"] = None
-
-    mate = _resolve_current_mate(db, breeder)
-    if mate:
-        data["currentMate"] = {"id": mate.id, "code": mate.code}
-    else:
-        data["currentMate"] = None
-
-    return ApiResponse(data=data, message="Breeder retrieved successfully")
+    data["currentMateCode"] = current_mate_code(breeder)
+    data["currentMate"] = current_mate_payload(resolve_current_mate(db, breeder))
+    return data
 
 
 @router.get("/{breeder_id}/records", response_model=ApiResponse)
 async def get_breeder_records(
     breeder_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Public: breeder timeline records (mating + eggs).
 
@@ -258,8 +486,7 @@ async def get_breeder_records(
     }
 
     if breeder.sex == "female":
-        mate = _resolve_current_mate(db, breeder)
-        data["currentMate"] = {"id": mate.id, "code": mate.code} if mate else None
+        data["currentMate"] = current_mate_payload(resolve_current_mate(db, breeder))
 
         matings = (
             db.query(MatingRecord)
@@ -377,13 +604,19 @@ async def get_breeder_events(
     event_type: Optional[str] = Query(None, alias="type", description="mating|egg|change_mate"),
     limit: int = Query(10, ge=1, le=100),
     cursor: Optional[str] = Query(None, description="Opaque cursor from previous page"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Public: unified breeder timeline events (mating/egg/change-mate).
 
     Sorted newest-first by (event_date, created_at, id). Pagination is cursor-based.
     """
+    data = await run_in_session(db, _breeder_events, breeder_id, event_type, limit, cursor)
+    return ApiResponse(data=data, message="Breeder events retrieved successfully")
 
+
+def _breeder_events(
+    db: Session, breeder_id: str, event_type: Optional[str], limit: int, cursor: Optional[str]
+) -> dict:
     breeder = (
         db.query(Product)
         .filter(Product.id == breeder_id)
@@ -427,62 +660,25 @@ async def get_breeder_events(
     items = rows[:limit]
     next_cursor = _encode_event_cursor(items[-1]) if has_more and items else None
 
-    return ApiResponse(
-        data={
-            "items": [
-                {
-                    "id": e.id,
-                    "productId": e.product_id,
-                    "eventType": e.event_type,
-                    "eventDate": e.event_date.isoformat() if e.event_date else None,
-                    "maleCode": e.male_code,
-                    "eggCount": e.egg_count,
-                    "note": e.note,
-                    "oldMateCode": e.old_mate_code,
-                    "newMateCode": e.new_mate_code,
-                    "createdAt": e.created_at.isoformat() if e.created_at else None,
-                }
-                for e in items
-            ],
-            "nextCursor": next_cursor,
-            "hasMore": has_more,
-        },
-        message="Breeder events retrieved successfully",
-    )
-
-
-def _canonical_mate_code_candidates(code: str) -> list[str]:
-    c = (code or "").strip()
-    if not c:
-        return []
-    if c.endswith("公"):
-        return [c, c[:-1]]
-    return [c, c + "公"]
-
-
-def _compute_need_mating_status(now: datetime, last_egg_at: Optional[datetime], last_mating_at: Optional[datetime]) -> str:
-    """Return one of: normal | need_mating | warning.
-
-    Business rule (female-centric):
-    - If no egg record -> normal
-    - If there is a mating record on/after the last egg day -> normal
-    - Else -> need_mating (from egg day 0)
-      - If days_since_last_egg >= 25 -> warning
-
-    Note: egg day counts as day 0.
-    """
-
-    if not last_egg_at:
-        return "normal"
-
-    # Any mating on/after the last egg clears the need.
-    if last_mating_at and last_mating_at.date() >= last_egg_at.date():
-        return "normal"
-
-    days = (now.date() - last_egg_at.date()).days
-    if days >= 25:
-        return "warning"
-    return "need_mating"
+    return {
+        "items": [
+            {
+                "id": e.id,
+                "productId": e.product_id,
+                "eventType": e.event_type,
+                "eventDate": e.event_date.isoformat() if e.event_date else None,
+                "maleCode": e.male_code,
+                "eggCount": e.egg_count,
+                "note": e.note,
+                "oldMateCode": e.old_mate_code,
+                "newMateCode": e.new_mate_code,
+                "createdAt": e.created_at.isoformat() if e.created_at else None,
+            }
+            for e in items
+        ],
+        "nextCursor": next_cursor,
+        "hasMore": has_more,
+    }
 
 
 @router.get("/{breeder_id}/mate-load", response_model=ApiResponse)
@@ -491,7 +687,7 @@ async def get_male_mate_load(
     limit: int = Query(80, ge=1, le=300),
     include_fallback: bool = Query(True, description="Fallback to products.mate_code when few/no events exist"),
     include_retired: bool = Query(False, alias="include_retired", description="Include breeders excluded from breeding task views"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Public: for male breeder detail page.
 
@@ -502,8 +698,6 @@ async def get_male_mate_load(
     2) Fallback: female products whose mate_code matches this male's code (or with/without trailing '公').
     """
 
-    from sqlalchemy.orm import joinedload
-
     breeder = (
         db.query(Product)
         .filter(Product.id == breeder_id)
@@ -521,121 +715,74 @@ async def get_male_mate_load(
     if not male_code:
         raise HTTPException(status_code=400, detail="Breeder code is required")
 
-    # Latest mating/egg info per female.
-    # Prefer structured breeder_events when present, but keep legacy tables as fallback.
-    last_mating_with_male_event_sq = (
-        db.query(
-            BreederEvent.product_id.label("female_id"),
-            func.max(BreederEvent.event_date).label("last_mating_with_male_at"),
-        )
-        .filter(BreederEvent.event_type == "mating")
-        .filter(BreederEvent.male_code == male_code)
-        .group_by(BreederEvent.product_id)
-        .subquery()
+    # Candidate females: mated with this male (structured events or legacy records),
+    # plus females whose products.mate_code points at him.
+    candidate_ids = union(
+        select(BreederEvent.product_id)
+        .where(BreederEvent.event_type == "mating")
+        .where(BreederEvent.male_code == male_code),
+        select(MatingRecord.female_id).where(MatingRecord.male_id == breeder.id),
     )
 
-    last_mating_with_male_record_sq = (
-        db.query(
-            MatingRecord.female_id.label("female_id"),
-            func.max(MatingRecord.mated_at).label("last_mating_with_male_at"),
-        )
-        .filter(MatingRecord.male_id == breeder.id)
-        .group_by(MatingRecord.female_id)
-        .subquery()
-    )
-
-    last_egg_event_sq = (
-        db.query(
-            BreederEvent.product_id.label("female_id"),
-            func.max(BreederEvent.event_date).label("last_egg_at"),
-        )
-        .filter(BreederEvent.event_type == "egg")
-        .group_by(BreederEvent.product_id)
-        .subquery()
-    )
-
-    last_egg_record_sq = (
-        db.query(
-            EggRecord.female_id.label("female_id"),
-            func.max(EggRecord.laid_at).label("last_egg_at"),
-        )
-        .group_by(EggRecord.female_id)
-        .subquery()
-    )
-
-    last_mating_any_event_sq = (
-        db.query(
-            BreederEvent.product_id.label("female_id"),
-            func.max(BreederEvent.event_date).label("last_mating_at"),
-        )
-        .filter(BreederEvent.event_type == "mating")
-        .group_by(BreederEvent.product_id)
-        .subquery()
-    )
-
-    last_mating_any_record_sq = (
-        db.query(
-            MatingRecord.female_id.label("female_id"),
-            func.max(MatingRecord.mated_at).label("last_mating_at"),
-        )
-        .group_by(MatingRecord.female_id)
-        .subquery()
-    )
-
-    female_ids: set[str] = set()
-
-    for row in db.query(last_mating_with_male_event_sq.c.female_id).all():
-        if row and row[0]:
-            female_ids.add(row[0])
-
-    for row in db.query(last_mating_with_male_record_sq.c.female_id).all():
-        if row and row[0]:
-            female_ids.add(row[0])
-
+    fallback_ids: set[str] = set()
     if include_fallback:
-        candidates = _canonical_mate_code_candidates(male_code)
-        if candidates:
-            fallback_q = (
-                db.query(Product.id)
-                .filter(Product.series_id.isnot(None))
-                .filter(Product.sex == "female")
-                .filter(Product.mate_code.in_(candidates))
-            )
-            if not include_retired:
-                fallback_q = fallback_q.filter(Product.exclude_from_breeding.is_(False))
-
-            for r in fallback_q.all():
-                female_ids.add(r[0])
-
-    if not female_ids:
-        return ApiResponse(
-            data={
-                "maleId": breeder.id,
-                "maleCode": male_code,
-                "totals": {"relatedFemales": 0, "needMating": 0, "warning": 0},
-                "items": [],
-            },
-            message="Male mate load retrieved successfully",
+        candidates = canonical_mate_code_candidates(male_code)
+        for female in get_lineage_graph(db).females_with_mate(candidates):
+            if include_retired or not female.exclude_from_breeding:
+                fallback_ids.add(female.id)
+
+    def _is_candidate(col):
+        if fallback_ids:
+            return or_(col.in_(candidate_ids), col.in_(fallback_ids))
+        return col.in_(candidate_ids)
+
+    # One timeline over structured events and legacy records, restricted to the
+    # candidates up front, then reduced to one row per female with window maxima.
+    timeline = union_all(
+        select(
+            BreederEvent.product_id.label("female_id"),
+            BreederEvent.event_type.label("kind"),
+            BreederEvent.event_date.label("at"),
+            case((BreederEvent.male_code == male_code, 1), else_=0).label("with_male"),
         )
+        .where(BreederEvent.event_type.in_(("egg", "mating")))
+        .where(_is_candidate(BreederEvent.product_id)),
+        select(
+            MatingRecord.female_id,
+            literal("mating"),
+            MatingRecord.mated_at,
+            case((MatingRecord.male_id == breeder.id, 1), else_=0),
+        ).where(_is_candidate(MatingRecord.female_id)),
+        select(
+            EggRecord.female_id,
+            literal("egg"),
+            EggRecord.laid_at,
+            literal(0),
+        ).where(_is_candidate(EggRecord.female_id)),
+    ).subquery("timeline")
+
+    per_female = timeline.c.female_id
+    is_mating = timeline.c.kind == "mating"
+    windowed = select(
+        timeline.c.female_id,
+        func.max(case((timeline.c.kind == "egg", timeline.c.at))).over(partition_by=per_female).label("last_egg_at"),
+        func.max(case((is_mating, timeline.c.at))).over(partition_by=per_female).label("last_mating_at"),
+        func.max(case((and_(is_mating, timeline.c.with_male == 1), timeline.c.at)))
+        .over(partition_by=per_female)
+        .label("last_mating_with_male_at"),
+        func.row_number().over(partition_by=per_female, order_by=timeline.c.at.desc()).label("rn"),
+    ).subquery("windowed")
+    latest = select(windowed).where(windowed.c.rn == 1).subquery("latest")
 
     rows_q = (
         db.query(
             Product,
-            last_egg_event_sq.c.last_egg_at,
-            last_egg_record_sq.c.last_egg_at,
-            last_mating_any_event_sq.c.last_mating_at,
-            last_mating_any_record_sq.c.last_mating_at,
-            last_mating_with_male_event_sq.c.last_mating_with_male_at,
-            last_mating_with_male_record_sq.c.last_mating_with_male_at,
+            type_coerce(latest.c.last_egg_at, DateTime),
+            type_coerce(latest.c.last_mating_at, DateTime),
+            type_coerce(latest.c.last_mating_with_male_at, DateTime),
         )
-        .options(joinedload(Product.images))
-        .outerjoin(last_egg_event_sq, last_egg_event_sq.c.female_id == Product.id)
-        .outerjoin(last_egg_record_sq, last_egg_record_sq.c.female_id == Product.id)
-        .outerjoin(last_mating_any_event_sq, last_mating_any_event_sq.c.female_id == Product.id)
-        .outerjoin(last_mating_any_record_sq, last_mating_any_record_sq.c.female_id == Product.id)
-        .outerjoin(last_mating_with_male_event_sq, last_mating_with_male_event_sq.c.female_id == Product.id)
-        .outerjoin(last_mating_with_male_record_sq, last_mating_with_male_record_sq.c.female_id == Product.id)
-        .filter(Product.id.in_(list(female_ids)))
+        .outerjoin(latest, latest.c.female_id == Product.id)
+        .filter(_is_candidate(Product.id))
         .filter(Product.series_id.isnot(None))
         .filter(Product.sex == "female")
     )
@@ -651,25 +798,8 @@ async def get_male_mate_load(
     need_count = 0
     warning_count = 0
 
-    def _pick_latest(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
-        if a and b:
-            return a if a >= b else b
-        return a or b
-
-    for (
-        female,
-        last_egg_event_at,
-        last_egg_record_at,
-        last_mating_event_at,
-        last_mating_record_at,
-        last_mating_with_male_event_at,
-        last_mating_with_male_record_at,
-    ) in rows:
-        last_egg_at = _pick_latest(last_egg_event_at, last_egg_record_at)
-        last_mating_at = _pick_latest(last_mating_event_at, last_mating_record_at)
-        last_mating_with_male_at = _pick_latest(last_mating_with_male_event_at, last_mating_with_male_record_at)
-
-        status = _compute_need_mating_status(now, last_egg_at, last_mating_at)
+    for female, last_egg_at, last_mating_at, last_mating_with_male_at in rows:
+        status = need_mating_status(now, last_egg_at, last_mating_at)
         if status == "need_mating":
             need_count += 1
         elif status == "warning":
@@ -679,23 +809,8 @@ async def get_male_mate_load(
 
         # Main image URL for list rendering (avoid frontend N+1).
         # Note: normalize to public static URL (strict mode) to keep frontend rendering consistent.
-        female_main_image_url = None
-        female_thumbnail_url = None
-
-        imgs = list(getattr(female, "images", None) or [])
-        if imgs:
-            # stable ordering to make "images[0]" deterministic
-            imgs_sorted = sorted(imgs, key=lambda x: (getattr(x, "sort_order", 0) or 0))
-
-            thumb = next((img for img in imgs_sorted if getattr(img, "url", None)), None)
-            if thumb and getattr(thumb, "url", None):
-                female_thumbnail_url = normalize_local_image_url(thumb.url) or None
-
-            main_image = next((img for img in imgs_sorted if getattr(img, "type", None) == "main" and getattr(img, "url", None)), None)
-            if main_image:
-                female_main_image_url = normalize_local_image_url(main_image.url) or None
-            elif thumb and getattr(thumb, "url", None):
-                female_main_image_url = female_thumbnail_url
+        female_main_image_url = (normalize_local_image_url(female.main_image_url) or None) if female.main_image_url else None
+        female_thumbnail_url = (normalize_local_image_url(female.thumbnail_url) or None) if female.thumbnail_url else None
 
         items.append(
             {
@@ -735,95 +850,17 @@ async def get_male_mate_load(
     )
 
 
-def _get_breeder_by_code(db: Session, code: Optional[str]) -> Optional[Product]:
-    """Helper to get breeder by code."""
-    if not code:
-        return None
-    from sqlalchemy.orm import joinedload
-    return (
-        db.query(Product)
-        .options(joinedload(Product.images))
-        .filter(Product.code == code)
-        .filter(Product.series_id.isnot(None))
-        .filter(Product.sex.isnot(None))
-        .first()
-    )
-
-
-def _resolve_current_mate(db: Session, breeder: Product) -> Optional[Product]:
-    """Resolve the current mate (male breeder) for a female breeder.
-
-    Priority:
-    1) Latest "更换配偶为..." event in breeder.description
-    2) Latest mating record's male
-    """
-
-    if not breeder or breeder.sex != "female":
-        return None
-
-    # First priority: explicit mate_code (admin-managed).
-    explicit_code = (getattr(breeder, "mate_code", None) or "").strip()
-    if explicit_code:
-        candidates = [explicit_code]
-        if explicit_code.endswith("公"):
-            candidates.append(explicit_code[: -1])
-        else:
-            candidates.append(explicit_code + "公")
-
-        for c in candidates:
-            mate = _get_breeder_by_code(db, c)
-            if mate and mate.sex == "male":
-                return mate
-
-    # Second priority: last "更换配偶为..." event in description.
-    code = parse_current_mate_code(getattr(breeder, "description", None))
-    if code:
-        # Notes may include or omit the trailing "公" marker; try both.
-        candidates = [code]
-        if code.endswith("公"):
-            candidates.append(code[: -1])
-        else:
-            candidates.append(code + "公")
-
-        for c in candidates:
-            mate = _get_breeder_by_code(db, c)
-            if mate and mate.sex == "male":
-                return mate
-
-    latest = (
-        db.query(MatingRecord)
-        .filter(MatingRecord.female_id == breeder.id)
-        .order_by(MatingRecord.mated_at.desc())
-        .first()
-    )
-    if latest and latest.male_id:
-        mate = db.query(Product).filter(Product.id == latest.male_id).first()
-        if mate and mate.sex == "male":
-            return mate
-
-    return None
-
-
 def _build_node(breeder: Product, generation: int, relationship: str) -> dict:
     """Build a family tree node from a breeder."""
     if not breeder:
         return None
 
-    # Get main image from product_images relationship
-    thumbnail_url = None
-    if breeder.images:
-        # Try to find main image first, otherwise use first image
-        main_image = next((img for img in breeder.images if img.type == "main"), None)
-        if main_image:
-            thumbnail_url = main_image.url
-        elif breeder.images:
-            thumbnail_url = breeder.images[0].url
-
     return {
         "id": breeder.id,
         "code": breeder.code,
         "sex": breeder.sex,
-        "thumbnailUrl": thumbnail_url,
+        # Main image, else the first one (denormalized on products).
+        "thumbnailUrl": breeder.main_image_url,
         "generation": generation,
         "relationship": relationship,
         "sireCode": breeder.sire_code,
@@ -834,13 +871,19 @@ def _build_node(breeder: Product, generation: int, relationship: str) -> dict:
 @router.get("/{breeder_id}/family-tree", response_model=ApiResponse)
 async def get_breeder_family_tree(
     breeder_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    depth: int = Query(DEFAULT_PEDIGREE_DEPTH, ge=1, le=MAX_PEDIGREE_DEPTH),
 ):
-    """Public: breeder family tree with ancestors and descendants."""
-    from sqlalchemy.orm import joinedload
+    """Public: breeder family tree with ancestors and descendants.
+
+    `depth` is the number of ancestor generations (default 3: up to
+    great-grandparents). Relationships are walked in the lineage graph and
+    nodes are loaded with batched
+    lookups, so the query count does not grow with tree size.
+    """
+
     breeder = (
         db.query(Product)
-        .options(joinedload(Product.images))
         .filter(Product.id == breeder_id)
         .filter(Product.series_id.isnot(None))
         .filter(Product.sex.isnot(None))
@@ -852,133 +895,49 @@ async def get_breeder_family_tree(
     # Build current node
     current = _build_node(breeder, 0, "current")
 
-    mate = _resolve_current_mate(db, breeder)
-    current_mate = {"id": mate.id, "code": mate.code} if mate else None
+    current_mate = current_mate_payload(resolve_current_mate(db, breeder))
 
-    # Get ancestors
-    ancestors = {}
+    # Topology comes from the in-memory lineage graph; full rows (with images) for
+    # every node in the tree are then fetched in one batched query.
+    graph = get_lineage_graph(db)
+    node = graph.get_by_id(breeder.id) or LineageNode.from_product(breeder)
 
-    # Parents
-    father = _get_breeder_by_code(db, breeder.sire_code)
-    mother = _get_breeder_by_code(db, breeder.dam_code)
-
-    if father:
-        ancestors["father"] = _build_node(father, -1, "father")
-        # Get father's siblings
-        if father.dam_code:
-            father_siblings = (
-                db.query(Product)
-                .filter(Product.dam_code == father.dam_code)
-                .filter(Product.id != father.id)
-                .filter(Product.series_id.isnot(None))
-                .filter(Product.sex.isnot(None))
-                .all()
-            )
-            ancestors["father"]["siblings"] = [
-                _build_node(s, -1, "father_sibling") for s in father_siblings
-            ]
+    ancestor_paths = graph.ancestors(node, depth)
+    parent_siblings = {
+        path: [s for s in graph.children_by_dam(a.dam_code) if s.id != a.id]
+        for path, a in ancestor_paths
+        if len(path) == 1 and a.dam_code
+    }
+    offspring_nodes = graph.offspring(node.code, node.sex)
+    sibling_nodes = graph.siblings(node) if node.dam_code else []
+
+    rows = fetch_breeders_by_ids(
+        db,
+        [a.id for _, a in ancestor_paths]
+        + [s.id for group in parent_siblings.values() for s in group]
+        + [c.id for c in offspring_nodes]
+        + [s.id for s in sibling_nodes],
+    )
 
-        # Grandparents (paternal)
-        paternal_grandfather = _get_breeder_by_code(db, father.sire_code)
-        paternal_grandmother = _get_breeder_by_code(db, father.dam_code)
-
-        if paternal_grandfather:
-            ancestors["paternalGrandfather"] = _build_node(paternal_grandfather, -2, "paternal_grandfather")
-            # Great-grandparents (paternal-paternal)
-            ppgg_father = _get_breeder_by_code(db, paternal_grandfather.sire_code)
-            ppgg_mother = _get_breeder_by_code(db, paternal_grandfather.dam_code)
-            if ppgg_father:
-                ancestors["paternalPaternalGreatGrandfather"] = _build_node(ppgg_father, -3, "great_grandfather")
-            if ppgg_mother:
-                ancestors["paternalPaternalGreatGrandmother"] = _build_node(ppgg_mother, -3, "great_grandmother")
-
-        if paternal_grandmother:
-            ancestors["paternalGrandmother"] = _build_node(paternal_grandmother, -2, "paternal_grandmother")
-            # Great-grandparents (paternal-maternal)
-            pmgg_father = _get_breeder_by_code(db, paternal_grandmother.sire_code)
-            pmgg_mother = _get_breeder_by_code(db, paternal_grandmother.dam_code)
-            if pmgg_father:
-                ancestors["paternalMaternalGreatGrandfather"] = _build_node(pmgg_father, -3, "great_grandfather")
-            if pmgg_mother:
-                ancestors["paternalMaternalGreatGrandmother"] = _build_node(pmgg_mother, -3, "great_grandmother")
-
-    if mother:
-        ancestors["mother"] = _build_node(mother, -1, "mother")
-        # Get mother's siblings
-        if mother.dam_code:
-            mother_siblings = (
-                db.query(Product)
-                .filter(Product.dam_code == mother.dam_code)
-                .filter(Product.id != mother.id)
-                .filter(Product.series_id.isnot(None))
-                .filter(Product.sex.isnot(None))
-                .all()
-            )
-            ancestors["mother"]["siblings"] = [
-                _build_node(s, -1, "mother_sibling") for s in mother_siblings
-            ]
+    def _nodes(nodes: list[LineageNode], generation: int, relationship: str) -> list[dict]:
+        return [_build_node(rows[n.id], generation, relationship) for n in nodes if n.id in rows]
 
-        # Grandparents (maternal)
-        maternal_grandfather = _get_breeder_by_code(db, mother.sire_code)
-        maternal_grandmother = _get_breeder_by_code(db, mother.dam_code)
-
-        if maternal_grandfather:
-            ancestors["maternalGrandfather"] = _build_node(maternal_grandfather, -2, "maternal_grandfather")
-            # Great-grandparents (maternal-paternal)
-            mpgg_father = _get_breeder_by_code(db, maternal_grandfather.sire_code)
-            mpgg_mother = _get_breeder_by_code(db, maternal_grandfather.dam_code)
-            if mpgg_father:
-                ancestors["maternalPaternalGreatGrandfather"] = _build_node(mpgg_father, -3, "great_grandfather")
-            if mpgg_mother:
-                ancestors["maternalPaternalGreatGrandmother"] = _build_node(mpgg_mother, -3, "great_grandmother")
-
-        if maternal_grandmother:
-            ancestors["maternalGrandmother"] = _build_node(maternal_grandmother, -2, "maternal_grandmother")
-            # Great-grandparents (maternal-maternal)
-            mmgg_father = _get_breeder_by_code(db, maternal_grandmother.sire_code)
-            mmgg_mother = _get_breeder_by_code(db, maternal_grandmother.dam_code)
-            if mmgg_father:
-                ancestors["maternalMaternalGreatGrandfather"] = _build_node(mmgg_father, -3, "great_grandfather")
-            if mmgg_mother:
-                ancestors["maternalMaternalGreatGrandmother"] = _build_node(mmgg_mother, -3, "great_grandmother")
-
-    # Get descendants (offspring)
-    offspring = []
-    if breeder.sex == "male":
-        # Find offspring where this breeder is the father
-        children = (
-            db.query(Product)
-            .filter(Product.sire_code == breeder.code)
-            .filter(Product.series_id.isnot(None))
-            .filter(Product.sex.isnot(None))
-            .all()
-        )
-        offspring = [_build_node(child, 1, "offspring") for child in children]
-    elif breeder.sex == "female":
-        # Find offspring where this breeder is the mother
-        children = (
-            db.query(Product)
-            .filter(Product.dam_code == breeder.code)
-            .filter(Product.series_id.isnot(None))
-            .filter(Product.sex.isnot(None))
-            .all()
-        )
-        offspring = [_build_node(child, 1, "offspring") for child in children]
-
-    # Get siblings (same parents)
-    siblings = []
-    if breeder.dam_code:
-        sibling_query = (
-            db.query(Product)
-            .filter(Product.dam_code == breeder.dam_code)
-            .filter(Product.id != breeder.id)
-            .filter(Product.series_id.isnot(None))
-            .filter(Product.sex.isnot(None))
-        )
-        if breeder.sire_code:
-            sibling_query = sibling_query.filter(Product.sire_code == breeder.sire_code)
-        siblings_list = sibling_query.all()
-        siblings = [_build_node(s, 0, "sibling") for s in siblings_list]
+    ancestors = {}
+    for path, a in ancestor_paths:
+        ancestor = rows.get(a.id)
+        if ancestor is None:
+            continue
+        key = ancestor_key(path)
+        ancestors[key] = _build_node(ancestor, -len(path), ancestor_relationship(path))
+        # Parents also carry their own siblings (same dam).
+        if path in parent_siblings:
+            ancestors[key]["siblings"] = _nodes(parent_siblings[path], -1, f"{key}_sibling")
+
+    # Descendants: offspring via sire_code (males) or dam_code (females).
+    offspring = _nodes(offspring_nodes, 1, "offspring")
+
+    # Siblings (same parents)
+    siblings = _nodes(sibling_nodes, 0, "sibling")
 
     # Get mating records for current breeder
     mating_records = []
@@ -1056,3 +1015,55 @@ async def get_breeder_family_tree(
     }
 
     return ApiResponse(data=data, message="Family tree retrieved successfully")
+
+
+@router.get("/{breeder_id}/descendants", response_model=ApiResponse)
+async def get_breeder_descendants(
+    breeder_id: str,
+    db: Session = Depends(get_read_db),
+    depth: int = Query(DEFAULT_DESCENDANT_DEPTH, ge=1, le=MAX_DESCENDANT_DEPTH),
+):
+    """Public: descendant subtree of a breeder with per-node offspring counts.
+
+    Descendants are returned flat, one entry per breeder, with `generation`
+    (1 = offspring) and sireCode/damCode to rebuild the tree client-side. The
+    subtree is walked breadth-first with one query per generation plus one
+    grouped count query per side, regardless of how prolific the breeder is.
+    """
+    breeder = (
+        db.query(Product)
+        .filter(Product.id == breeder_id)
+        .filter(Product.series_id.isnot(None))
+        .filter(Product.sex.isnot(None))
+        .first()
+    )
+    if not breeder:
+        raise HTTPException(status_code=404, detail="Breeder not found")
+
+    generations = fetch_descendant_generations(db, breeder, depth)
+    counts = count_offspring(db, [breeder, *(c for gen in generations for c in gen)])
+
+    def _node(b: Product, generation: int, relationship: str) -> dict:
+        node = _build_node(b, generation, relationship)
+        node["offspringCount"] = counts.get(b.code, 0)
+        return node
+
+    descendants = [
+        _node(child, generation, "descendant")
+        for generation, children in enumerate(generations, start=1)
+        for child in children
+    ]
+
+    # More generations exist below the requested depth.
+    truncated = len(generations) == depth and any(counts.get(c.code, 0) for c in generations[-1])
+
+    data = {
+        "current": _node(breeder, 0, "current"),
+        "depth": depth,
+        "descendants": descendants,
+        "generationCounts": [len(children) for children in generations],
+        "totalDescendants": len(descendants),
+        "truncated": truncated,
+    }
+
+    return ApiResponse(data=data, message="Descendants retrieved successfully")
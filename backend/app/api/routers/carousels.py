@@ -6,7 +6,7 @@ from app.db.session import get_db
 from app.models.models import Carousel
 from app.schemas.schemas import ApiResponse
 from app.core.security import get_current_active_user, User
-from app.core.file_utils import delete_file, save_carousel_image
+from app.core.file_utils import UploadTooLargeError, delete_file, save_carousel_image
 
 router = APIRouter()
 
@@ -49,9 +49,13 @@ async def create_carousel(
     db: Session = Depends(get_db)
 ):
     """Create a new carousel with image upload (admin only)."""
+    # Hand the writer connection (checked out by the auth lookup) back while the image streams in.
+    db.rollback()
     # Save uploaded image with carousel-specific optimization
     try:
         image_url = await save_carousel_image(image)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to save image: {str(e)}")
 
@@ -100,26 +104,32 @@ async def update_carousel(
     if not carousel:
         raise HTTPException(status_code=404, detail="Carousel not found")
 
-    # Update basic fields
-    setattr(carousel, 'title', title)
-    setattr(carousel, 'description', description)
-    setattr(carousel, 'link_url', linkUrl)
-    setattr(carousel, 'is_active', isActive)
-    setattr(carousel, 'sort_order', sortOrder)
-
     # Handle image update if provided
     if image and image.filename:
+        old_image_url = carousel.image_url
+        # Hand the writer connection back while the image streams in.
+        db.rollback()
+
         # Delete old image
-        if carousel.image_url:
-            delete_file(carousel.image_url)
+        if old_image_url:
+            delete_file(old_image_url)
 
         # Save new image with carousel-specific optimization
         try:
             new_image_url = await save_carousel_image(image)
             setattr(carousel, 'image_url', new_image_url)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Failed to save image: {str(e)}")
 
+    # Update basic fields
+    setattr(carousel, 'title', title)
+    setattr(carousel, 'description', description)
+    setattr(carousel, 'link_url', linkUrl)
+    setattr(carousel, 'is_active', isActive)
+    setattr(carousel, 'sort_order', sortOrder)
+
     db.commit()
     db.refresh(carousel)
 
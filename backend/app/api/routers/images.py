@@ -1,8 +1,11 @@
 import os
 from pathlib import Path
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
+
+from app.api.file_responses import file_response, is_hashed_name
+from app.services.image_variants import get_image_variant, negotiate_format
 
 router = APIRouter()
 
@@ -13,7 +16,7 @@ UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "static/images"))
 
 
 @router.get("/images/{filename}")
-async def get_image(filename: str):
+async def get_image(filename: str, request: Request):
     # Prevent path traversal and directory access.
     if not filename or "/" in filename or "\\" in filename or filename.startswith("."):
         raise HTTPException(status_code=400, detail="Invalid filename")
@@ -22,5 +25,34 @@ async def get_image(filename: str):
     if not path.exists() or not path.is_file():
         raise HTTPException(status_code=404, detail="Image not found")
 
-    # Let browser cache; images are content-addressed by filename in our usage.
-    return FileResponse(path)
+    # Images are content-addressed by filename in our usage: hashed names are cached forever.
+    return file_response(str(path), request.headers, immutable=is_hashed_name(filename))
+
+
+@router.get("/images/{product_id}/{stem}")
+async def get_product_image_variant(
+    product_id: str,
+    stem: str,
+    request: Request,
+    w: Optional[int] = None,
+    fmt: Optional[str] = None,
+):
+    """Product image resized on demand (w snaps to a fixed set of widths).
+
+    fmt=jpg|webp|avif forces a format; otherwise it is negotiated from Accept.
+    Variants are rendered on first request and kept in an LRU disk cache.
+    """
+    try:
+        path, media_type = await get_image_variant(product_id, stem, w, fmt or negotiate_format(request.headers.get("accept")))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    return file_response(
+        path,
+        request.headers,
+        media_type=media_type,
+        immutable=is_hashed_name(stem),
+        headers=None if fmt else {"vary": "Accept"},
+    )
@@ -7,6 +7,7 @@ from app.db.session import get_db
 from app.schemas.schemas import ApiResponse
 from app.core.security import get_current_active_user, User
 from app.services.import_service import BatchImportService
+from app.services.lineage_graph import invalidate_lineage_graph
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -42,11 +43,15 @@ async def batch_import_products(
     if zip_file and not zip_file.filename.lower().endswith(".zip"):
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a ZIP file for images.")
 
+    # Hand the writer connection (checked out by the auth lookup) back while the files are read.
+    db.rollback()
     try:
         excel_content = await excel_file.read()
         zip_content = await zip_file.read() if zip_file else None
         
         result = await BatchImportService.process_import(db, excel_content, zip_content)
+        # Imported rows may add/replace many breeders; rebuild lineage lazily.
+        invalidate_lineage_graph(db)
         
         if not result["success"]:
             # If the process itself failed (not just individual rows)
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import or_
 from typing import Optional
 import logging
 
-from app.db.session import get_db
+from app.db.session import get_async_read_db, get_read_db, run_in_session
 from app.models.models import Product, FeaturedProduct
 from app.schemas.schemas import ApiResponse, SortOption
 from app.api.utils import convert_product_to_response, split_category_values, group_categories
+from app.services.current_mate import current_mate_code, current_mate_payload, resolve_current_mates
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -15,7 +17,7 @@ logger = logging.getLogger(__name__)
 @router.get("/featured", response_model=ApiResponse)
 async def get_featured_products(
     limit: int = Query(8, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     featured_products = db.query(Product).filter(
         Product.is_featured == True
@@ -31,7 +33,7 @@ async def get_featured_products(
     )
 
 @router.get("/filter-options", response_model=ApiResponse)
-async def get_filter_options(db: Session = Depends(get_db)):
+async def get_filter_options(db: Session = Depends(get_read_db)):
     """Get available filter options with improved grouping."""
 
     # Get price range
@@ -62,9 +64,28 @@ async def get_products(
     series_id: Optional[str] = Query(None),
     price_min: Optional[float] = Query(None),
     price_max: Optional[float] = Query(None),
-    db: Session = Depends(get_db)
+    include_images: bool = Query(True, description="Set false to omit galleries (mainImageUrl/thumbnailUrl are always returned)"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get products with filtering, sorting, and pagination."""
+    data = await run_in_session(
+        db, _get_products, page, limit, search, sort, sex, series_id, price_min, price_max, include_images
+    )
+    return ApiResponse(data=data, message="Products retrieved successfully")
+
+
+def _get_products(
+    db: Session,
+    page: int,
+    limit: int,
+    search: Optional[str],
+    sort: Optional[SortOption],
+    sex: Optional[str],
+    series_id: Optional[str],
+    price_min: Optional[float],
+    price_max: Optional[float],
+    include_images: bool,
+) -> dict:
     query = db.query(Product)
 
     # Apply search filter
@@ -107,26 +128,32 @@ async def get_products(
 
     # Apply pagination
     offset = (page - 1) * limit
+    if include_images:
+        query = query.options(selectinload(Product.images))
     products = query.offset(offset).limit(limit).all()
 
     # Calculate total pages
     total_pages = (total + limit - 1) // limit
 
-    # Convert to response format
-    product_responses = [convert_product_to_response(product) for product in products]
-
-    return ApiResponse(
-        data={
-            "products": product_responses,
-            "total": total,
-            "page": page,
-            "totalPages": total_pages
-        },
-        message="Products retrieved successfully"
-    )
+    # Convert to response format (current mate for female breeders, resolved per page).
+    mates = resolve_current_mates(db, products)
+    product_responses = []
+    for product in products:
+        item = convert_product_to_response(product, include_images=include_images)
+        if product.sex == "female":
+            item["currentMateCode"] = current_mate_code(product)
+            item["currentMate"] = current_mate_payload(mates.get(product.id))
+        product_responses.append(item)
+
+    return {
+        "products": product_responses,
+        "total": total,
+        "page": page,
+        "totalPages": total_pages
+    }
 
 @router.get("/{product_id}", response_model=ApiResponse)
-async def get_product(product_id: str, db: Session = Depends(get_db)):
+async def get_product(product_id: str, db: Session = Depends(get_read_db)):
     """Get single product by ID."""
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
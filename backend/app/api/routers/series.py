@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_async_read_db, run_in_session
 from app.models.models import Series
 from app.schemas.schemas import ApiResponse
 
@@ -10,9 +11,14 @@ router = APIRouter()
 
 @router.get("", response_model=ApiResponse)
 async def list_series(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Public: list active series for browsing."""
+    data = await run_in_session(db, _list_series)
+    return ApiResponse(data=data, message="Series retrieved successfully")
+
+
+def _list_series(db: Session) -> list:
     series = (
         db.query(Series)
         .filter(Series.is_active == True)  # noqa: E712
@@ -20,7 +26,7 @@ async def list_series(
         .all()
     )
 
-    data = [
+    return [
         {
             "id": s.id,
             "name": s.name,
@@ -32,5 +38,3 @@ async def list_series(
         }
         for s in series
     ]
-
-    return ApiResponse(data=data, message="Series retrieved successfully")
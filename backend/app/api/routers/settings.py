@@ -8,7 +8,7 @@ from app.db.session import get_db
 from app.models.models import Settings
 from app.schemas.schemas import ApiResponse
 from app.core.security import get_current_active_user, User
-from app.core.file_utils import save_multiple_files
+from app.core.file_utils import UploadTooLargeError, save_multiple_files
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -55,36 +55,45 @@ async def update_settings(
 ):
     """Update application settings (admin only)."""
     settings = db.query(Settings).first()
-    if not settings:
-        settings = Settings()
-        db.add(settings)
-
-    # Update basic settings
-    settings.company_name = company_name
-    settings.company_logo = company_logo
-    settings.company_description = company_description
-    settings.contact_phone = contact_phone
-    settings.contact_email = contact_email
-    settings.contact_address = contact_address
-    settings.wechat_number = wechat_number
 
     # Handle QR code file upload
+    new_qr_code = None
     if qr_code_file and qr_code_file.filename:
+        old_qr_code = settings.customer_service_qr_code if settings else None
+        # Hand the writer connection back while the file streams in.
+        db.rollback()
         try:
             # Delete old QR code file if exists
-            if settings.customer_service_qr_code:
-                old_file_path = os.path.join("static", settings.customer_service_qr_code)
+            if old_qr_code:
+                old_file_path = os.path.join("static", old_qr_code)
                 if os.path.exists(old_file_path):
                     os.remove(old_file_path)
 
             # Save new QR code file
             qr_code_files = await save_multiple_files([qr_code_file], "qr_codes")
             if qr_code_files:
-                settings.customer_service_qr_code = qr_code_files[0]["url"]
+                new_qr_code = qr_code_files[0]["url"]
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         except Exception as e:
             logger.error(f"Error uploading QR code: {str(e)}")
             raise HTTPException(status_code=400, detail="QR code upload failed")
 
+    if not settings:
+        settings = Settings()
+        db.add(settings)
+
+    # Update basic settings
+    settings.company_name = company_name
+    settings.company_logo = company_logo
+    settings.company_description = company_description
+    settings.contact_phone = contact_phone
+    settings.contact_email = contact_email
+    settings.contact_address = contact_address
+    settings.wechat_number = wechat_number
+    if new_qr_code:
+        settings.customer_service_qr_code = new_qr_code
+
     db.commit()
     db.refresh(settings)
 
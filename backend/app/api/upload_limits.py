@@ -0,0 +1,65 @@
+"""Request-size limit for multipart uploads, enforced before the body is parsed.
+
+UploadBudget (app.core.file_utils) only sees bytes once Starlette's multipart
+parser has spooled every part, i.e. after the whole body was received. This
+ASGI middleware rejects multipart requests over UPLOAD_MAX_REQUEST_BYTES up
+front: a too-large Content-Length is answered with 413 without reading the
+body, and bodies without one (chunked) are counted as they are received and
+cut off as soon as they pass the limit.
+"""
+
+from __future__ import annotations
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import file_utils
+from app.schemas.schemas import ErrorResponse
+
+# Multipart framing (boundaries, part headers) on top of the file bytes the budget counts.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _too_large_detail(limit: int) -> str:
+    return f"Upload exceeds the limit of {limit} bytes per request"
+
+
+class UploadSizeLimitMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        # Read at request time so the limit follows file_utils (and test overrides).
+        limit = file_utils.UPLOAD_MAX_REQUEST_BYTES
+        allowed = limit + MULTIPART_OVERHEAD_BYTES
+        content_length = headers.get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > allowed:
+            response = JSONResponse(
+                status_code=413, content=ErrorResponse(message=_too_large_detail(limit)).model_dump()
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > allowed:
+                    # Raised inside body parsing; FastAPI re-raises HTTPException as-is.
+                    raise HTTPException(status_code=413, detail=_too_large_detail(limit))
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,8 +1,10 @@
 from app.models.models import Product
+from app.services.image_store import BLOB_FOLDER, split_local_image_url
 import os
 import uuid
 from pathlib import Path
 from urllib.parse import quote, urlparse
+from typing import Optional
 
 # 获取实际的图片目录（支持 Docker 环境）
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "static/images")
@@ -75,8 +77,10 @@ def _to_local_static_path(image_url: str) -> str:
 def normalize_local_image_url(image_url: str) -> str:
     """将 DB 存储的图片路径规范化为对外可访问的静态 URL（严格模式）。
 
-    规范：只允许产品图片使用 `images/<product_id>/<filename>` 的结构，并输出为：
+    规范：只允许产品图片使用 `images/<product_id>/<filename>` 或内容寻址的
+    `images/blobs/<sha256>.jpg` 结构，并输出为：
     - `/static/images/<product_id>/<filename>`
+    - `/static/images/blobs/<filename>`
 
     例外：
     - 外链（http/https）原样返回
@@ -96,32 +100,18 @@ def normalize_local_image_url(image_url: str) -> str:
     if image_url.startswith("/api/images/"):
         return image_url
 
-    parsed = urlparse(image_url)
-    path = parsed.path or image_url
-
-    # Extract `<folder>/<filename>` after known prefixes.
-    prefix = None
-    for candidate in ("/static/images/", "static/images/", "/images/", "images/"):
-        if path.startswith(candidate):
-            prefix = candidate
-            break
-
-    if prefix is None:
+    # Extract `<folder>/<filename>` after known prefixes (same parser as image GC).
+    parts = split_local_image_url(image_url)
+    if parts is None:
         return ""
+    folder, filename = parts
 
-    rest = path[len(prefix) :].lstrip("/")
-    if not rest or "/" not in rest:
-        return ""
-
-    folder, filename = rest.split("/", 1)
-    if not folder or not filename or "/" in filename:
-        return ""
-
-    # Enforce `<uuid>` folder to fully drop code-based storage.
-    try:
-        folder = str(uuid.UUID(folder))
-    except Exception:
-        return ""
+    # Enforce `<uuid>` folder (or the shared content-addressed store) to fully drop code-based storage.
+    if folder != BLOB_FOLDER:
+        try:
+            folder = str(uuid.UUID(folder))
+        except Exception:
+            return ""
 
     return quote(f"/static/images/{folder}/{filename}", safe="/%")
 
@@ -131,12 +121,21 @@ def normalize_local_image_url(image_url: str) -> str:
 def _normalize_image_url(image_url: str) -> str:
     return normalize_local_image_url(image_url)
 
-def convert_product_to_response(product: Product) -> dict:
-    """Convert Product model to response format matching frontend expectations."""
+def _summary_image_url(url: Optional[str]) -> Optional[str]:
+    return (normalize_local_image_url(url) or None) if url else None
+
+
+def convert_product_to_response(product: Product, include_images: bool = True) -> dict:
+    """Convert Product model to response format matching frontend expectations.
+
+    With include_images=False the gallery is omitted (empty list) and product.images
+    is never touched, so callers can skip loading it; mainImageUrl / thumbnailUrl
+    come from the denormalized product columns either way.
+    """
     # Convert images
 
     images = []
-    for img in sorted(product.images, key=lambda x: x.sort_order):
+    for img in sorted(product.images if include_images else [], key=lambda x: x.sort_order):
         url = getattr(img, "url", None)
         if not url:
             continue
@@ -172,6 +171,8 @@ def convert_product_to_response(product: Product) -> dict:
         "sireImageUrl": normalize_local_image_url(product.sire_image_url) if product.sire_image_url else None,
         "damImageUrl": normalize_local_image_url(product.dam_image_url) if product.dam_image_url else None,
 
+        "mainImageUrl": _summary_image_url(getattr(product, "main_image_url", None)),
+        "thumbnailUrl": _summary_image_url(getattr(product, "thumbnail_url", None)),
         "images": images,
         "pricing": {
             "costPrice": product.cost_price,
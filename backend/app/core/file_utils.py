@@ -4,10 +4,17 @@
 提供图片上传、优化、删除等功能
 """
 
+import asyncio
+import glob
+import io
 import os
 import shutil
+import tempfile
+import threading
 import uuid
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional
 from fastapi import UploadFile
 from PIL import Image, ImageOps
 from pathlib import Path
@@ -18,87 +25,373 @@ try:
 except:
     pass
 
+# AVIF 编码为可选依赖（pillow-avif-plugin）；不可用时只提供 JPEG/WebP
+try:
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+Image.init()
+AVIF_SUPPORTED = "AVIF" in Image.SAVE
+
 # 配置（支持环境变量）
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "static/images")
 IMAGES_DIR = UPLOAD_DIR
 STATIC_DIR = os.path.dirname(UPLOAD_DIR) if "/" in UPLOAD_DIR else "static"
 CAROUSEL_DIR = os.path.join(IMAGES_DIR, "carousel")
 QR_CODES_DIR = os.path.join(STATIC_DIR, "qr_codes")
+# 按需渲染的图片变体缓存（/api/images/{product_id}/{stem}?w=&fmt=）
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(STATIC_DIR, "image_cache"))
 
 # 确保目录存在
 os.makedirs(IMAGES_DIR, exist_ok=True)
 os.makedirs(CAROUSEL_DIR, exist_ok=True)
 os.makedirs(QR_CODES_DIR, exist_ok=True)
 
+# 产品图片派生尺寸（原图之外）
+PRODUCT_IMAGE_SIZES = {
+    'thumbnail': (150, 150),
+    'small': (300, 300),
+    'medium': (500, 500),
+    'large': (800, 800)
+}
+
+# 上传时预先生成的尺寸（逗号分隔的 PRODUCT_IMAGE_SIZES 名称；默认全部生成，
+# 前端 buildImageUrl/buildSrcSet 直接请求 <folder>/<size>/<stem>.webp|jpg）。
+# 其他宽度由 /api/images/{product_id}/{stem}?w= 按需渲染并缓存
+PRERENDER_SIZES = {
+    name: PRODUCT_IMAGE_SIZES[name]
+    for name in (
+        part.strip() for part in os.getenv("IMAGE_PRERENDER_SIZES", ",".join(PRODUCT_IMAGE_SIZES)).split(",")
+    )
+    if name in PRODUCT_IMAGE_SIZES
+}
+
+# 上传大小限制（字节）：单个文件 / 单次请求合计，在分块写盘时即时检查
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(30 * 1024 * 1024)))
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(200 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# 上传原图处理前的临时落盘目录
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR", tempfile.gettempdir())
+
+# 上传图片派生处理的进程数（0 = 不使用进程池，改用线程，适合受限环境/测试）
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_image_executor: Optional[ProcessPoolExecutor] = None
+_image_executor_lock = threading.Lock()
+
+
+def _prepare_image(img: Image.Image, crop_square: bool = False) -> Image.Image:
+    """解码后的一次性处理：转 RGB、EXIF 自动旋转、可选居中裁成正方形"""
+    # 转换为RGB模式（确保兼容性）
+    if img.mode in ('RGBA', 'P'):
+        img = img.convert('RGB')
+
+    # 自动旋转（处理EXIF信息）
+    img = ImageOps.exif_transpose(img)
+
+    # Optional center-crop to square (used by turtle-album: 1:1 everywhere)
+    if crop_square:
+        w, h = img.size
+        side = min(w, h)
+        left = (w - side) // 2
+        top = (h - side) // 2
+        img = img.crop((left, top, left + side, top + side))
+    return img
+
+
+def _draft(img: Image.Image, min_side: Optional[int]) -> None:
+    """JPEG 在解码时按 1/2、1/4、1/8 于 DCT 域缩小，两边仍不小于 min_side
+
+    两边都保证，EXIF 旋转后也满足。必须在图片加载之前调用；其他格式不做处理。
+    """
+    if min_side and img.format == 'JPEG':
+        img.draft(img.mode, (min_side, min_side))
+
+
+def _downscale(img: Image.Image, size) -> Image.Image:
+    """LANCZOS 缩放到 size；先用 reduce() 以 2 的幂整数倍快速缩小
+
+    reduce 后至少保留目标尺寸 2 倍的余量，最终的 LANCZOS 仍负责抗锯齿，
+    画质与直接 LANCZOS 基本一致，但大图的卷积开销小得多。
+    """
+    factor = 1
+    while img.width >= size[0] * factor * 4 and img.height >= size[1] * factor * 4:
+        factor *= 2
+    if factor > 1:
+        img = img.reduce(factor)
+    if img.size == tuple(size):
+        return img.copy()
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+
+def _scale(img: Image.Image, size, crop_square: bool = False) -> Image.Image:
+    """缩放但不补边：正方形图直接缩放到 size，其余保持宽高比缩进 size 内（不放大）"""
+    if crop_square:
+        # After square-crop we can do an exact resize without padding.
+        return _downscale(img, size)
+
+    ratio = min(size[0] / img.width, size[1] / img.height)
+    if ratio >= 1:
+        return img.copy()
+    return _downscale(img, (max(1, round(img.width * ratio)), max(1, round(img.height * ratio))))
+
+
+def _pad(img: Image.Image, size) -> Image.Image:
+    """居中放到 size 的白色画布上（已是 size 时原样返回）"""
+    if img.size == tuple(size):
+        return img
+    new_img = Image.new('RGB', size, (255, 255, 255))
+    paste_x = (size[0] - img.size[0]) // 2
+    paste_y = (size[1] - img.size[1]) // 2
+    new_img.paste(img, (paste_x, paste_y))
+    return new_img
+
+
+def _fit_size(img: Image.Image, size, crop_square: bool = False) -> Image.Image:
+    """调整到目标尺寸（不修改传入的图片）"""
+    scaled = _scale(img, size, crop_square)
+    # 如果需要确切的尺寸，在中心创建新图片
+    return scaled if crop_square else _pad(scaled, size)
+
+
+def _save_image(img: Image.Image, output_path: str, format: str, quality: int) -> None:
+    # 确保输出目录存在
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    # 保存优化后的图片
+    save_params = {'format': format}
+    if format == 'JPEG':
+        save_params.update({
+            'quality': quality,
+            'optimize': True,
+            'progressive': True
+        })
+    elif format == 'WebP':
+        save_params.update({
+            'quality': quality,
+            'method': 6,
+            'lossless': False
+        })
+    elif format == 'AVIF':
+        save_params.update({
+            'quality': quality,
+        })
+
+    img.save(output_path, **save_params)
+
+
 def optimize_single_image(input_path: str, output_path: str, size=None, quality=85, format='JPEG', crop_square: bool = False):
     """优化单张图片"""
     try:
         with Image.open(input_path) as img:
-            # 转换为RGB模式（确保兼容性）
-            if img.mode in ('RGBA', 'P'):
-                img = img.convert('RGB')
-            
-            # 自动旋转（处理EXIF信息）
-            img = ImageOps.exif_transpose(img)
-            
-            # Optional center-crop to square (used by turtle-album: 1:1 everywhere)
-            if crop_square:
-                w, h = img.size
-                side = min(w, h)
-                left = (w - side) // 2
-                top = (h - side) // 2
-                img = img.crop((left, top, left + side, top + side))
+            if size:
+                _draft(img, max(size))
+            img = _prepare_image(img, crop_square)
 
             # 调整尺寸
             if size:
-                if crop_square:
-                    # After square-crop we can do an exact resize without padding.
-                    img = img.resize(size, Image.Resampling.LANCZOS)
-                else:
-                    # 保持宽高比
-                    img.thumbnail(size, Image.Resampling.LANCZOS)
-
-                    # 如果需要确切的尺寸，在中心创建新图片
-                    if img.size != size:
-                        new_img = Image.new('RGB', size, (255, 255, 255))
-                        paste_x = (size[0] - img.size[0]) // 2
-                        paste_y = (size[1] - img.size[1]) // 2
-                        new_img.paste(img, (paste_x, paste_y))
-                        img = new_img
-            
-            # 确保输出目录存在
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # 保存优化后的图片
-            save_params = {'format': format}
-            if format == 'JPEG':
-                save_params.update({
-                    'quality': quality,
-                    'optimize': True,
-                    'progressive': True
-                })
-            elif format == 'WebP':
-                save_params.update({
-                    'quality': quality,
-                    'method': 6,
-                    'lossless': False
-                })
-            
-            img.save(output_path, **save_params)
+                img = _fit_size(img, size, crop_square)
+
+            _save_image(img, output_path, format, quality)
             return True
-            
+
     except Exception as e:
         print(f"Error optimizing image {input_path}: {e}")
         return False
 
+
+def generate_image_derivatives(source, product_dir: str, file_stem: str, crop_square: bool = True, sizes=None) -> List[Dict[str, Any]]:
+    """生成产品图片的派生文件（原图 + `sizes` 中的各尺寸，JPEG 和 WebP）
+
+    源图只解码一次，旋转/裁剪只做一次，再从大到小级联缩放编码。`source` 可以是文件路径
+    或图片字节；`sizes` 默认为全部 PRODUCT_IMAGE_SIZES。作为进程池任务运行时
+    必须保持为模块级函数（可被 pickle）。失败时抛出异常。
+
+    返回写入的文件清单（path/variant/format/width/height/bytes），供调用方记录到
+    image_files 表。
+    """
+    if sizes is None:
+        sizes = PRODUCT_IMAGE_SIZES
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    with Image.open(source) as opened:
+        base = _prepare_image(opened, crop_square)
+        base.load()
+
+    written = []
+
+    def _write(img: Image.Image, variant: str, path: str, format: str, quality: int) -> None:
+        # 先写临时文件再原子替换：同一内容的两个任务并发渲染时不会互相写坏
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            _save_image(img, tmp_path, format, quality)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        written.append({
+            "path": path,
+            "variant": variant,
+            "format": "jpg" if format == 'JPEG' else format.lower(),
+            "width": img.width,
+            "height": img.height,
+            "bytes": os.path.getsize(path),
+        })
+
+    # 原图（JPEG和WebP格式）
+    _write(base, "original", os.path.join(product_dir, f"{file_stem}.jpg"), 'JPEG', 90)
+    _write(base, "original", os.path.join(product_dir, f"{file_stem}.webp"), 'WebP', 80)
+
+    # 生成各种尺寸：从大到小级联，每个尺寸由上一个（更大的）尺寸缩小而来
+    previous = base
+    for size_name, size_dims in sorted(sizes.items(), key=lambda item: item[1][0] * item[1][1], reverse=True):
+        scaled = _scale(previous, size_dims, crop_square)
+        resized = scaled if crop_square else _pad(scaled, size_dims)
+        _write(resized, size_name, os.path.join(product_dir, size_name, f"{file_stem}.jpg"), 'JPEG', 85)
+        _write(resized, size_name, os.path.join(product_dir, size_name, f"{file_stem}.webp"), 'WebP', 80)
+        previous = scaled
+
+    return written
+
+
+def render_image_variant(source_path: str, output_path: str, width: Optional[int], format: str, quality: int) -> int:
+    """按需渲染单个变体（宽度不超过 `width`，保持宽高比，不放大），返回文件大小
+
+    先写临时文件再原子替换，并发读取者不会看到半成品。作为进程池任务运行。
+    """
+    with Image.open(source_path) as opened:
+        _draft(opened, width)
+        img = _prepare_image(opened)
+        if width and img.width > width:
+            img = _downscale(img, (width, max(1, round(img.height * width / img.width))))
+
+        tmp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            _save_image(img, tmp_path, format, quality)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return os.path.getsize(output_path)
+
+
+def get_image_executor() -> Optional[ProcessPoolExecutor]:
+    """图片处理进程池（懒加载；IMAGE_WORKERS=0 时返回 None）"""
+    global _image_executor
+    if IMAGE_WORKERS <= 0:
+        return None
+    with _image_executor_lock:
+        if _image_executor is None:
+            _image_executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+        return _image_executor
+
+
+def shutdown_image_executor() -> None:
+    global _image_executor
+    with _image_executor_lock:
+        if _image_executor is not None:
+            _image_executor.shutdown(wait=True)
+            _image_executor = None
+
+
+def _discard_broken_executor(executor: ProcessPoolExecutor) -> None:
+    # A worker died (e.g. OOM on a huge upload); start a fresh pool for later requests.
+    global _image_executor
+    with _image_executor_lock:
+        if _image_executor is executor:
+            _image_executor = None
+
+
+async def run_image_task(func, *args):
+    """在进程池（或线程）中运行 CPU 密集的图片任务，不阻塞事件循环"""
+    loop = asyncio.get_running_loop()
+    executor = get_image_executor()
+    if executor is None:
+        return await asyncio.to_thread(func, *args)
+    try:
+        return await loop.run_in_executor(executor, func, *args)
+    except BrokenProcessPool:
+        _discard_broken_executor(executor)
+        raise
+
+
+def run_image_task_blocking(func, *args):
+    """同步版本：供后台任务线程使用，在进程池中运行并等待结果（无进程池时直接运行）"""
+    executor = get_image_executor()
+    if executor is None:
+        return func(*args)
+    try:
+        return executor.submit(func, *args).result()
+    except BrokenProcessPool:
+        _discard_broken_executor(executor)
+        raise
+
+
+class UploadTooLargeError(ValueError):
+    """上传超过单文件或单次请求的大小限制"""
+
+
+class UploadBudget:
+    """单次请求的上传字节预算（多个文件累计）"""
+
+    def __init__(self, max_request_bytes: Optional[int] = None, max_file_bytes: Optional[int] = None):
+        self.max_request_bytes = UPLOAD_MAX_REQUEST_BYTES if max_request_bytes is None else max_request_bytes
+        self.max_file_bytes = UPLOAD_MAX_FILE_BYTES if max_file_bytes is None else max_file_bytes
+        self.used = 0
+
+    def consume(self, n: int) -> None:
+        self.used += n
+        if self.used > self.max_request_bytes:
+            raise UploadTooLargeError(f"Upload exceeds the limit of {self.max_request_bytes} bytes per request")
+
+
+async def stream_upload(file: UploadFile, dest_path: str, budget: Optional[UploadBudget] = None, hasher=None) -> int:
+    """把 UploadFile 分块写入 dest_path（不整体读入内存），返回字节数
+
+    超过 budget 的单文件/单次请求限制时删除已写部分并抛出 UploadTooLargeError；
+    `hasher`（hashlib 对象）可在写入的同时计算摘要。
+    """
+    budget = budget or UploadBudget()
+    size = 0
+    try:
+        with open(dest_path, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > budget.max_file_bytes:
+                    raise UploadTooLargeError(
+                        f"{file.filename} exceeds the limit of {budget.max_file_bytes} bytes per file"
+                    )
+                budget.consume(len(chunk))
+                if hasher is not None:
+                    hasher.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    return size
+
+
+def upload_tmp_path(filename: Optional[str] = None) -> str:
+    """UPLOAD_TMP_DIR 下的唯一临时文件路径（保留原扩展名，便于 Pillow 识别）"""
+    os.makedirs(UPLOAD_TMP_DIR, exist_ok=True)
+    suffix = Path(filename).suffix.lower() if filename else ""
+    return os.path.join(UPLOAD_TMP_DIR, f"{uuid.uuid4().hex}{suffix}")
+
+
 async def save_multiple_files(files: List[UploadFile], subfolder: str) -> List[Dict[str, Any]]:
-    """保存多个文件到指定子文件夹"""
+    """保存多个文件到指定子文件夹（分块写入，受上传大小限制约束）"""
     if not files:
         return []
     
     saved_files = []
     dest_dir = os.path.join(STATIC_DIR, subfolder)
     os.makedirs(dest_dir, exist_ok=True)
+    budget = UploadBudget()
     
     for file in files:
         if file.filename:
@@ -108,9 +401,7 @@ async def save_multiple_files(files: List[UploadFile], subfolder: str) -> List[D
             file_path = os.path.join(dest_dir, unique_filename)
             
             # 保存文件
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
+            size = await stream_upload(file, file_path, budget)
             
             # 返回相对路径
             relative_path = f"{subfolder}/{unique_filename}"
@@ -119,7 +410,7 @@ async def save_multiple_files(files: List[UploadFile], subfolder: str) -> List[D
                 "filename": unique_filename,
                 "original_name": file.filename,
                 "url": relative_path,
-                "size": len(content)
+                "size": size
             })
     
     return saved_files
@@ -130,16 +421,13 @@ async def save_carousel_image(file: UploadFile) -> str:
         raise ValueError("No filename provided")
     
     # 生成唯一文件名
-    file_extension = Path(file.filename).suffix.lower()
     unique_filename = f"carousel-{uuid.uuid4()}.jpg"  # 统一转换为jpg
-    temp_path = f"/tmp/{uuid.uuid4()}{file_extension}"
+    temp_path = upload_tmp_path(file.filename)
     final_path = os.path.join(CAROUSEL_DIR, unique_filename)
     
     try:
-        # 先保存临时文件
-        content = await file.read()
-        with open(temp_path, "wb") as buffer:
-            buffer.write(content)
+        # 先分块保存临时文件
+        await stream_upload(file, temp_path)
         
         # 优化图片 - 轮播图需要更大尺寸
         success = optimize_single_image(
@@ -161,84 +449,23 @@ async def save_carousel_image(file: UploadFile) -> str:
         if os.path.exists(temp_path):
             os.remove(temp_path)
 
-async def save_product_images_optimized(files: List[UploadFile], product_id: str) -> List[Dict[str, Any]]:
-    """保存并优化产品图片，生成多个尺寸"""
-    if not files:
-        return []
-    
-    # 定义尺寸
-    sizes = {
-        'thumbnail': (150, 150),
-        'small': (300, 300),
-        'medium': (500, 500), 
-        'large': (800, 800)
-    }
-    
-    # 创建产品图片目录
-    product_dir = os.path.join(IMAGES_DIR, str(product_id))
-    os.makedirs(product_dir, exist_ok=True)
-    
-    # 为每个尺寸创建子目录
-    for size_name in sizes.keys():
-        size_dir = os.path.join(product_dir, size_name)
-        os.makedirs(size_dir, exist_ok=True)
-    
-    saved_images = []
-    
-    for i, file in enumerate(files):
-        if not file.filename:
-            continue
-            
-        # 生成唯一文件名
-        file_stem = Path(file.filename).stem
-        file_extension = Path(file.filename).suffix.lower()
-        unique_stem = f"{file_stem}_{uuid.uuid4().hex[:8]}"
-        temp_path = f"/tmp/{uuid.uuid4()}{file_extension}"
-        
-        try:
-            # 先保存临时文件
-            content = await file.read()
-            with open(temp_path, "wb") as buffer:
-                buffer.write(content)
-            
-            # 保存原图（JPEG和WebP格式）
-            original_jpg = os.path.join(product_dir, f"{unique_stem}.jpg")
-            original_webp = os.path.join(product_dir, f"{unique_stem}.webp")
-            
-            optimize_single_image(temp_path, original_jpg, None, quality=90, format='JPEG', crop_square=True)
-            optimize_single_image(temp_path, original_webp, None, quality=80, format='WebP', crop_square=True)
-            
-            # 生成各种尺寸
-            for size_name, size_dims in sizes.items():
-                # JPEG版本
-                jpg_path = os.path.join(product_dir, size_name, f"{unique_stem}.jpg")
-                optimize_single_image(temp_path, jpg_path, size_dims, quality=85, format='JPEG', crop_square=True)
-                
-                # WebP版本
-                webp_path = os.path.join(product_dir, size_name, f"{unique_stem}.webp")
-                optimize_single_image(temp_path, webp_path, size_dims, quality=80, format='WebP', crop_square=True)
-            
-            # 返回图片信息
-            relative_path = f"images/{product_id}/{unique_stem}.jpg"
-            image_type = "main" if i == 0 else "gallery"
-            
-            saved_images.append({
-                "url": relative_path,
-                "alt": f"{product_id} - Image {i+1}",
-                "type": image_type,
-                "filename": f"{unique_stem}.jpg",
-                "original_name": file.filename
-            })
-            
-        finally:
-            # 清理临时文件
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-    
-    return saved_images
+def delete_cached_variants(file_path: str) -> None:
+    """删除 `images/<folder>/<name>` 按需渲染的缓存变体"""
+    parts = file_path.split("/")
+    if len(parts) != 3 or parts[0] != "images":
+        return
+    file_stem = Path(parts[2]).stem
+    cache_pattern = os.path.join(IMAGE_CACHE_DIR, parts[1], f"{glob.escape(file_stem)}_w[0-9]*")
+    for cached in glob.glob(cache_pattern):
+        os.remove(cached)
+
 
 def delete_file(file_path: str) -> bool:
-    """删除文件及其所有尺寸版本"""
+    """删除文件及其所有尺寸版本（按约定的目录/扩展名逐个探测）
+
+    已记录在 image_files 清单中的产品图片应使用
+    app.services.image_store.delete_image_files，无需探测文件系统。
+    """
     if not file_path:
         return True
         
@@ -267,6 +494,8 @@ def delete_file(file_path: str) -> bool:
                         size_file = os.path.join(size_dir, f"{file_stem}{ext}")
                         if os.path.exists(size_file):
                             os.remove(size_file)
+
+                delete_cached_variants(file_path)
                 
                 return True
         else:
@@ -12,6 +12,7 @@ from __future__ import annotations
 import logging
 import os
 import shutil
+import sqlite3
 from datetime import datetime
 from pathlib import Path
 from typing import Literal
@@ -40,11 +41,13 @@ def _table_names() -> set[str]:
     return set(inspect(engine).get_table_names())
 
 
-def build_alembic_config() -> Config:
+def build_alembic_config(db_url: str = DATABASE_URL) -> Config:
     backend_dir = Path(__file__).resolve().parents[2]
     config = Config(str(backend_dir / "alembic.ini"))
     config.set_main_option("script_location", str(backend_dir / "alembic"))
-    config.set_main_option("sqlalchemy.url", DATABASE_URL)
+    # ConfigParser interpolation: a literal % (URL-encoded passwords) must be doubled.
+    config.set_main_option("sqlalchemy.url", db_url.replace("%", "%%"))
+    config.attributes["explicit_url"] = db_url != DATABASE_URL
     return config
 
 
@@ -79,7 +82,16 @@ def _backup_sqlite_file(sqlite_file: Path) -> Path:
 
     ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     backup_path = archive_dir / f"{sqlite_file.stem}.{ts}.pre_bridge.bak"
-    shutil.copy2(sqlite_file, backup_path)
+    # Online backup API: in WAL mode committed pages may still live in the -wal file,
+    # so copying the main file alone could miss them.
+    src = sqlite3.connect(str(sqlite_file))
+    dst = sqlite3.connect(str(backup_path))
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    shutil.copystat(sqlite_file, backup_path)
     return backup_path
 
 
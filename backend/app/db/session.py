@@ -1,11 +1,16 @@
 import os
+import weakref
 from pathlib import Path
 from typing import Dict, Optional, Set
 
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from app.db.sqlite_pragmas import install_sqlite_pragmas, read_only_pragmas
 
 BACKEND_DIR = Path(__file__).resolve().parents[2]
 ENV_PATH = BACKEND_DIR / ".env"
@@ -26,7 +31,14 @@ def _normalize_sqlite_url(db_url: str) -> str:
     return f"sqlite:///{normalized_path.as_posix()}"
 
 
-DATABASE_URL = _normalize_sqlite_url(os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL))
+def _normalize_postgres_url(db_url: str) -> str:
+    """Accept the `postgres://` scheme hosting providers hand out (SQLAlchemy wants `postgresql://`)."""
+    if db_url.startswith("postgres://"):
+        return "postgresql://" + db_url[len("postgres://") :]
+    return db_url
+
+
+DATABASE_URL = _normalize_sqlite_url(_normalize_postgres_url(os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)))
 
 
 def get_sqlite_file_path(db_url: str = DATABASE_URL) -> Optional[Path]:
@@ -44,14 +56,164 @@ def ensure_sqlite_parent_dir() -> None:
 
 ensure_sqlite_parent_dir()
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes", "on")
+
+
+def _sqlite_connect_args(db_url: str) -> dict:
+    return {"check_same_thread": False} if db_url.startswith("sqlite") else {}
+
+
+# Writer: a small pool for file SQLite; concurrent writers (requests, image job
+# workers, imports) wait on SQLite's write lock through busy_timeout, and WAL
+# keeps readers unblocked. The async admin handlers check out from this pool on
+# the event loop thread, so waiting for a free connection stalls the whole
+# server: keep it above 1, and release the connection (db.rollback()) before
+# awaiting upload I/O. Public reads use a separate read-only engine (get_read_db).
+DB_WRITE_POOL_SIZE = int(os.getenv("DB_WRITE_POOL_SIZE", "5"))
+DB_WRITE_POOL_TIMEOUT = float(os.getenv("DB_WRITE_POOL_TIMEOUT", "30"))
+DB_SPLIT_READS = _env_flag("DB_SPLIT_READS", "true")
+
+# Server databases (PostgreSQL): one QueuePool per engine shared by every worker thread.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle before server/proxy idle timeouts close the connection underneath the pool.
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", "true")
+
+
+def server_pool_args() -> dict:
+    """create_engine() pool arguments for non-SQLite databases."""
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def create_write_engine(
+    db_url: str = DATABASE_URL,
+    pool_size: int = DB_WRITE_POOL_SIZE,
+    pool_timeout: float = DB_WRITE_POOL_TIMEOUT,
+):
+    pool_args = {}
+    if get_sqlite_file_path(db_url) is not None:
+        pool_args = {"pool_size": pool_size, "max_overflow": 0, "pool_timeout": pool_timeout}
+    elif not db_url.startswith("sqlite"):
+        pool_args = server_pool_args()
+    write_engine = create_engine(db_url, connect_args=_sqlite_connect_args(db_url), **pool_args)
+    # WAL + per-connection pragmas (SQLITE_PRAGMA_PROFILE / SQLITE_PRAGMAS); no-op for other databases.
+    install_sqlite_pragmas(write_engine)
+    return write_engine
+
+
+def create_read_engine(write_engine, db_url: str = DATABASE_URL, read_url: Optional[str] = None):
+    """Engine for public read endpoints.
+
+    File SQLite opens the same file with `mode=ro` plus `PRAGMA query_only`;
+    READ_DATABASE_URL can point at a replica. Otherwise reads share the writer.
+    """
+
+    if read_url is None:
+        db_file = get_sqlite_file_path(db_url)
+        if db_file is None:
+            return write_engine
+        read_url = f"sqlite:///file:{db_file.as_posix()}?mode=ro&uri=true"
+
+    read_url = _normalize_postgres_url(read_url)
+    pool_args = {} if read_url.startswith("sqlite") else server_pool_args()
+    read_engine = create_engine(read_url, connect_args=_sqlite_connect_args(read_url), **pool_args)
+    install_sqlite_pragmas(read_engine, read_only_pragmas())
+    _read_engines[read_engine] = write_engine
+    return read_engine
+
+
+# read engine -> the writer engine of the same database
+_read_engines: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def primary_engine(bind):
+    """The writer engine behind `bind`; per-database caches key on this."""
+    return _read_engines.get(bind, bind)
+
+
+# Async drivers for the public read path, by sync dialect.
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+DB_ASYNC_READS = _env_flag("DB_ASYNC_READS", "true")
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "5"))
+
+
+def _async_url(db_url: str) -> Optional[str]:
+    url = make_url(db_url)
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        return None
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def create_async_read_engine(
+    write_engine,
+    db_url: str = DATABASE_URL,
+    read_url: Optional[str] = None,
+    pool_size: int = DB_ASYNC_POOL_SIZE,
+):
+    """AsyncEngine over the same database as create_read_engine(), or None.
+
+    None for in-memory SQLite (the data lives in the writer's connection), other
+    backends and when the async driver (aiosqlite / asyncpg) is not installed;
+    callers then fall back to the sync read engine.
+    """
+
+    if read_url is None:
+        db_file = get_sqlite_file_path(db_url)
+        if db_file is not None:
+            read_url = f"sqlite:///file:{db_file.as_posix()}?mode=ro&uri=true"
+        elif db_url.startswith("sqlite"):
+            return None
+        else:
+            read_url = db_url
+    async_url = _async_url(_normalize_postgres_url(read_url))
+    if async_url is None:
+        return None
+
+    if async_url.startswith("sqlite"):
+        # aiosqlite defaults to NullPool for files: keep warm connections (and their page cache).
+        pool_args = {"poolclass": AsyncAdaptedQueuePool, "pool_size": pool_size}
+        connect_args = _sqlite_connect_args(async_url)
+    else:
+        pool_args = server_pool_args()
+        # Same guarantee as mode=ro on SQLite: the public read path cannot write.
+        connect_args = {"server_settings": {"default_transaction_read_only": "on"}}
+    try:
+        async_engine = create_async_engine(async_url, connect_args=connect_args, **pool_args)
+    except ImportError:
+        return None
+    install_sqlite_pragmas(async_engine.sync_engine, read_only_pragmas())
+    _read_engines[async_engine.sync_engine] = write_engine
+    return async_engine
+
+
+engine = create_write_engine()
+read_engine = (
+    create_read_engine(engine, read_url=os.getenv("READ_DATABASE_URL") or None) if DB_SPLIT_READS else engine
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+async_read_engine = (
+    create_async_read_engine(engine, read_url=os.getenv("READ_DATABASE_URL") or None)
+    if DB_SPLIT_READS and DB_ASYNC_READS
+    else None
+)
+AsyncReadSessionLocal = (
+    async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False) if async_read_engine else None
+)
 
 
-def get_db():
+def get_write_db():
     db = SessionLocal()
     try:
         yield db
@@ -59,6 +221,48 @@ def get_db():
         db.close()
 
 
+# Admin/write routes; kept under its historical name.
+get_db = get_write_db
+
+
+def get_read_db():
+    """Session on the read-only engine, for public GET endpoints."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """AsyncSession on the read-only engine, for the hot public endpoints.
+
+    Falls back to a sync read session when no async engine is configured;
+    run_in_session() accepts either.
+    """
+    if AsyncReadSessionLocal is None:
+        db = ReadSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+        return
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+async def run_in_session(db, fn, *args, **kwargs):
+    """Call `fn(session, *args, **kwargs)` with the ORM session behind `db`.
+
+    On an AsyncSession the sync ORM code (queries, lazy loads) runs through
+    AsyncSession.run_sync, so its I/O awaits the async driver instead of
+    blocking the event loop. A plain Session (scripts, tests) is used as is.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return fn(db, *args, **kwargs)
+
+
 def create_tables():
     from app.models.models import Base
 
@@ -71,12 +275,19 @@ def validate_schema_or_raise() -> None:
     We still fail fast when columns are missing to avoid partial startup.
     """
     required_columns: Dict[str, Set[str]] = {
-        "products": {"series_id", "sex", "offspring_unit_price", "code"},
+        "products": {"series_id", "sex", "offspring_unit_price", "code", "main_image_url", "thumbnail_url"},
         # series.code is required for admin UI + OpenClaw uploads; series.name is not unique.
         "series": {"id", "name", "code"},
         "series_product_rel": {"series_id", "product_id"},
         "mating_records": {"female_id", "male_id", "mated_at"},
         "egg_records": {"female_id", "laid_at"},
+        # Persisted need-mating inputs read by the breeder list page.
+        "breeder_status": {"product_id", "last_egg_at", "last_mating_at"},
+        # Background image upload queue.
+        "image_jobs": {"id", "product_id", "status", "total", "completed", "failed"},
+        "image_job_items": {"job_id", "image_id", "source_path", "file_stem", "status"},
+        # Derivative manifest (deletes / storage usage without filesystem probing).
+        "image_files": {"image_url", "path", "variant", "format", "bytes"},
     }
 
     inspector = inspect(engine)
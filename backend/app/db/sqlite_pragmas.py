@@ -0,0 +1,94 @@
+"""Per-connection SQLite tuning.
+
+Production runs on a single SQLite file on a PVC: public readers and admin
+writers (imports, uploads, the image job queue) share it. With the default
+rollback journal a writer blocks every reader for the length of its
+transaction; in WAL mode readers keep reading the last committed snapshot.
+
+The pragmas are applied from an engine `connect` event, so every pooled
+connection (and the Alembic migration connection) gets them. Select a profile
+with SQLITE_PRAGMA_PROFILE and override single values with SQLITE_PRAGMAS,
+e.g. `SQLITE_PRAGMAS="mmap_size=0,cache_size=-16000"`.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQLITE_PRAGMA_PROFILES: Dict[str, Dict[str, str]] = {
+    # Rollback journal, SQLite defaults (only wait for locks instead of failing).
+    "default": {
+        "busy_timeout": "5000",
+    },
+    "wal": {
+        "journal_mode": "WAL",
+        # Durable at checkpoints; a power loss can only drop the last commits.
+        "synchronous": "NORMAL",
+        "busy_timeout": "5000",
+        "temp_store": "MEMORY",
+        # Negative cache_size is KiB: 64 MiB page cache per connection.
+        "cache_size": "-65536",
+        "mmap_size": str(256 * 1024 * 1024),
+    },
+}
+
+DEFAULT_SQLITE_PRAGMA_PROFILE = "wal"
+
+
+def parse_pragmas(value: Optional[str]) -> Dict[str, str]:
+    """Parse `name=value,name=value` (as in SQLITE_PRAGMAS)."""
+    pragmas: Dict[str, str] = {}
+    for part in (value or "").split(","):
+        name, sep, setting = part.partition("=")
+        if sep and name.strip():
+            pragmas[name.strip().lower()] = setting.strip()
+    return pragmas
+
+
+def sqlite_pragmas(profile: Optional[str] = None, overrides: Optional[str] = None) -> Dict[str, str]:
+    """Pragmas for `profile` (default: SQLITE_PRAGMA_PROFILE) plus `overrides` (default: SQLITE_PRAGMAS)."""
+    profile = profile or os.getenv("SQLITE_PRAGMA_PROFILE", DEFAULT_SQLITE_PRAGMA_PROFILE)
+    if profile not in SQLITE_PRAGMA_PROFILES:
+        raise ValueError(
+            f"Unknown SQLITE_PRAGMA_PROFILE {profile!r}; expected one of {sorted(SQLITE_PRAGMA_PROFILES)}"
+        )
+    pragmas = dict(SQLITE_PRAGMA_PROFILES[profile])
+    pragmas.update(parse_pragmas(os.getenv("SQLITE_PRAGMAS") if overrides is None else overrides))
+    return pragmas
+
+
+def read_only_pragmas(profile: Optional[str] = None, overrides: Optional[str] = None) -> Dict[str, str]:
+    """Pragmas for read-only connections: the profile minus journal_mode, plus query_only."""
+    pragmas = sqlite_pragmas(profile, overrides)
+    # The journal mode is a property of the file, set by the writer.
+    pragmas.pop("journal_mode", None)
+    pragmas["query_only"] = "ON"
+    return pragmas
+
+
+def install_sqlite_pragmas(engine: Engine, pragmas: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Apply `pragmas` on every new DBAPI connection of a SQLite engine; returns what was installed."""
+    if engine.dialect.name != "sqlite":
+        return {}
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+    if engine.url.database in (None, "", ":memory:"):
+        # WAL and mmap need a file; in-memory databases keep their journal.
+        pragmas = {k: v for k, v in pragmas.items() if k not in ("journal_mode", "mmap_size")}
+    if not pragmas:
+        return {}
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            # journal_mode first: the others are per-connection and cheap.
+            for name, value in sorted(pragmas.items(), key=lambda item: item[0] != "journal_mode"):
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return pragmas
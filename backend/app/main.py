@@ -10,17 +10,24 @@ from pathlib import Path
 
 from app.db.session import (
     DATABASE_URL,
+    SessionLocal,
     get_db,
+    get_read_db,
     get_sqlite_file_path,
     validate_schema_or_raise,
 )
 from app.db.alembic_manager import upgrade_or_bootstrap_schema
+from app.api.image_static import ImageStaticFiles
+from app.api.upload_limits import UploadSizeLimitMiddleware
+from app.core.file_utils import shutdown_image_executor
 from app.core.security import create_admin_user
 from app.core.request_validation import has_removed_product_field_error
 from app.schemas.schemas import ErrorResponse
+from app.services.image_jobs import start_image_job_workers, stop_image_job_workers
+from app.services.lineage_graph import get_lineage_graph
 
 # Import routers
-from app.api.routers import auth, products, admin, carousels, featured, settings, imports, series, breeders, admin_series, admin_records, images
+from app.api.routers import auth, products, admin, carousels, featured, settings, imports, series, breeders, admin_series, admin_records, admin_image_jobs, admin_images, images
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -35,6 +42,10 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Oversized multipart uploads are refused before the body is parsed (added first so
+# CORS headers still wrap its 413 responses).
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -73,6 +84,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Keyset pagination cursor for GET /api/breeders.
+    expose_headers=["X-Next-Cursor"],
 )
 
 # 静态文件目录配置（支持 PVC 挂载）
@@ -85,11 +98,17 @@ if not os.path.exists("static"):
     os.makedirs("static")
 
 # Mount static files
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+# Product images under these mounts are served as WebP/AVIF when the client
+# accepts it (Vary: Accept) and can be resized with ?w=.
+app.mount(
+    "/static",
+    ImageStaticFiles(directory=STATIC_DIR, images_subdir=os.path.relpath(UPLOAD_DIR, STATIC_DIR)),
+    name="static",
+)
 
 # Public image files (optimized/originals) live under UPLOAD_DIR (default: static/images).
 # We mount /images so the frontend can render <img src="/images/...">.
-app.mount("/images", StaticFiles(directory=UPLOAD_DIR), name="images")
+app.mount("/images", ImageStaticFiles(directory=UPLOAD_DIR), name="images")
 
 # Initialize and validate schema on startup.
 @app.on_event("startup")
@@ -120,6 +139,28 @@ async def startup_event():
     finally:
         db.close()
 
+    # 3) Warm the in-memory lineage graph so the first family-tree request is fast.
+    db = next(get_read_db())
+    try:
+        graph = get_lineage_graph(db)
+        logger.info(f"Lineage graph ready: {len(graph)} breeders")
+    except Exception as e:
+        logger.error(f"Failed to build lineage graph: {e}")
+    finally:
+        db.close()
+
+    # 4) Start background image job workers (resumes jobs interrupted by a restart).
+    start_image_job_workers(SessionLocal)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Let in-flight image derivative jobs finish and stop the worker processes;
+    # queued items stay pending and are picked up on the next start.
+    stop_image_job_workers()
+    shutdown_image_executor()
+
+
 # Middleware for request logging
 @app.middleware("http")
 @app.middleware("http")
@@ -191,6 +232,8 @@ app.include_router(images.router, prefix="/api", tags=["Images"])
 # Turtle-album admin APIs
 app.include_router(admin_series.router, prefix="/api/admin/series", tags=["Admin Series"])
 app.include_router(admin_records.router, prefix="/api/admin", tags=["Admin Records"])
+app.include_router(admin_image_jobs.router, prefix="/api/admin/image-jobs", tags=["Admin Image Jobs"])
+app.include_router(admin_images.router, prefix="/api/admin/images", tags=["Admin Images"])
 
 # Health check (放在静态文件之前)
 @app.get("/health")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, JSON, Index
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, JSON, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -6,6 +6,32 @@ import uuid
 
 Base = declarative_base()
 
+# Turtle-album breeders are the products with series_id and sex set; every breeder
+# query carries this predicate, so their indexes are partial on it.
+BREEDER_PREDICATE = "series_id IS NOT NULL AND sex IS NOT NULL"
+
+
+def _breeder_index(name: str, *columns) -> Index:
+    where = text(BREEDER_PREDICATE)
+    return Index(name, *columns, sqlite_where=where, postgresql_where=where)
+
+
+# Natural code key as breeder lists order it: NULLS LAST spelled `col IS NULL, col`
+# (identical on SQLite and PostgreSQL), then the unique code. The expressions are
+# parenthesized because PostgreSQL requires it in index definitions.
+NATURAL_CODE_SORT_INDEX_ELEMENTS = (
+    text("(code_prefix IS NULL)"),
+    "code_prefix",
+    text("(code_parent_number IS NULL)"),
+    "code_parent_number",
+    text("(code_child_number IS NULL)"),
+    "code_child_number",
+    text("(code_child_letter IS NULL)"),
+    "code_child_letter",
+    "code",
+)
+
+
 def utc_now():
     """Return current UTC datetime with microsecond precision."""
     return datetime.utcnow()
@@ -38,15 +64,21 @@ class Product(Base):
     __tablename__ = "products"
 
     __table_args__ = (
-        Index(
-            "ix_products_series_id_code_sort",
+        Index("ix_products_series_id_code_sort", "series_id", *NATURAL_CODE_SORT_INDEX_ELEMENTS),
+        # Series + sex breeder lists in natural order (exclude_from_breeding answered from the index).
+        _breeder_index(
+            "ix_products_breeder_series_sex_sort",
             "series_id",
-            "code_prefix",
-            "code_parent_number",
-            "code_child_number",
-            "code_child_letter",
-            "code",
+            "sex",
+            *NATURAL_CODE_SORT_INDEX_ELEMENTS,
+            "exclude_from_breeding",
         ),
+        # Breeder list without a series filter.
+        _breeder_index("ix_products_breeders_code_sort", *NATURAL_CODE_SORT_INDEX_ELEMENTS),
+        # Offspring / descendant / mate lookups.
+        _breeder_index("ix_products_breeder_sire_code", "sire_code"),
+        _breeder_index("ix_products_breeder_dam_code", "dam_code"),
+        _breeder_index("ix_products_breeder_mate_code", "mate_code"),
     )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -73,6 +105,11 @@ class Product(Base):
     sire_image_url = Column(String)
     dam_image_url = Column(String)
 
+    # Denormalized from product_images (maintained by admin image endpoints):
+    # main = image typed "main" else the first by sort_order; thumbnail = first by sort_order.
+    main_image_url = Column(String)
+    thumbnail_url = Column(String)
+
     # If true, exclude from breeding task views/reminders (but keep history/lineage intact).
     exclude_from_breeding = Column(Boolean, default=False, nullable=False)
 
@@ -114,6 +151,12 @@ class Product(Base):
         back_populates="female",
         cascade="all, delete-orphan",
     )
+    breeder_status = relationship(
+        "BreederStatus",
+        back_populates="product",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
 
 class SeriesProductRelation(Base):
     __tablename__ = "series_product_rel"
@@ -129,8 +172,11 @@ class SeriesProductRelation(Base):
 class MatingRecord(Base):
     __tablename__ = "mating_records"
 
+    # Latest mating per female (status summary, current mate fallback).
+    __table_args__ = (Index("ix_mating_records_female_id_mated_at", "female_id", "mated_at"),)
+
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    female_id = Column(String, ForeignKey("products.id"), nullable=False, index=True)
+    female_id = Column(String, ForeignKey("products.id"), nullable=False)
     male_id = Column(String, ForeignKey("products.id"), nullable=False, index=True)
     mated_at = Column(DateTime, nullable=False, index=True)
     notes = Column(Text)
@@ -143,8 +189,11 @@ class MatingRecord(Base):
 class EggRecord(Base):
     __tablename__ = "egg_records"
 
+    # Latest egg per female.
+    __table_args__ = (Index("ix_egg_records_female_id_laid_at", "female_id", "laid_at"),)
+
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    female_id = Column(String, ForeignKey("products.id"), nullable=False, index=True)
+    female_id = Column(String, ForeignKey("products.id"), nullable=False)
     laid_at = Column(DateTime, nullable=False, index=True)
     count = Column(Integer)
     notes = Column(Text)
@@ -156,6 +205,11 @@ class EggRecord(Base):
 class BreederEvent(Base):
     __tablename__ = "breeder_events"
 
+    # Male-centric mate-load scans: females with a mating event naming a male code.
+    __table_args__ = (
+        Index("ix_breeder_events_event_type_male_code_product_id", "event_type", "male_code", "product_id"),
+    )
+
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     # The female breeder/product id this event belongs to.
     product_id = Column(String, ForeignKey("products.id"), nullable=False, index=True)
@@ -181,12 +235,32 @@ class BreederEvent(Base):
     product = relationship("Product", backref="breeder_events")
 
 
+class BreederStatus(Base):
+    """Persisted per-female summary used by list pages (need-mating inputs).
+
+    Maintained by the admin write paths via app.services.breeder_status so that
+    list endpoints can read it with a single join instead of aggregating
+    breeder_events / egg_records / mating_records on every request.
+    """
+
+    __tablename__ = "breeder_status"
+
+    product_id = Column(String, ForeignKey("products.id"), primary_key=True)
+    last_egg_at = Column(DateTime)
+    last_mating_at = Column(DateTime)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
+
+    product = relationship("Product", back_populates="breeder_status")
+
+
 class ProductImage(Base):
     __tablename__ = "product_images"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    product_id = Column(String, ForeignKey("products.id"), nullable=False)
-    url = Column(String, nullable=False)  # Relative path to image
+    product_id = Column(String, ForeignKey("products.id"), nullable=False, index=True)
+    # Relative path to image; blob URLs (images/blobs/<sha256>.jpg) may be shared by
+    # several rows, the number of referencing rows is the blob's reference count.
+    url = Column(String, nullable=False, index=True)
     alt = Column(String, nullable=False)
     type = Column(String, nullable=False)  # 'main', 'gallery', 'dimensions', 'detail'
     sort_order = Column(Integer, default=0)  # For ordering images
@@ -195,6 +269,76 @@ class ProductImage(Base):
     # Relationships
     product = relationship("Product", back_populates="images")
 
+
+class ImageFile(Base):
+    """Manifest of files generated for a stored image URL.
+
+    Written when derivatives are generated, so deleting an image and storage
+    reporting are queries instead of filesystem probing. Keyed by
+    product_images.url because content-addressed blobs are shared between rows.
+    """
+
+    __tablename__ = "image_files"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    image_url = Column(String, nullable=False, index=True)
+    # Relative to UPLOAD_DIR, e.g. "blobs/<sha256>.webp" or "<product_id>/small/<stem>.jpg".
+    path = Column(String, nullable=False, unique=True)
+    # 'original' or a PRODUCT_IMAGE_SIZES name
+    variant = Column(String, nullable=False)
+    format = Column(String, nullable=False)  # 'jpg' | 'webp'
+    width = Column(Integer)
+    height = Column(Integer)
+    bytes = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=utc_now, nullable=False)
+
+
+class ImageJob(Base):
+    """Background derivative generation for one admin upload request.
+
+    Items are processed by app.services.image_jobs worker threads; unfinished
+    items are picked up again after a restart.
+    """
+
+    __tablename__ = "image_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    product_id = Column(String, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
+    # 'pending' | 'running' | 'done' | 'failed' (failed = at least one item failed)
+    status = Column(String, nullable=False, default="pending", index=True)
+    total = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=utc_now, nullable=False)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
+    finished_at = Column(DateTime)
+
+    items = relationship("ImageJobItem", back_populates="job", cascade="all, delete-orphan", order_by="ImageJobItem.position")
+
+
+class ImageJobItem(Base):
+    __tablename__ = "image_job_items"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_id = Column(String, ForeignKey("image_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    # The placeholder product_images row whose files this item produces.
+    image_id = Column(String, nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+    # Staged original upload (removed once processed).
+    source_path = Column(String, nullable=False)
+    file_stem = Column(String, nullable=False)
+    # 'pending' | 'running' | 'done' | 'failed'
+    status = Column(String, nullable=False, default="pending", index=True)
+    error = Column(Text)
+    # Running items: the worker that claimed them and how long its claim holds
+    # without a heartbeat; expired items go back to the queue.
+    claimed_by = Column(String)
+    lease_expires_at = Column(DateTime)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
+
+    job = relationship("ImageJob", back_populates="items")
+
+
 class User(Base):
     __tablename__ = "users"
 
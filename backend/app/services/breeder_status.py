@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.models import BreederEvent, BreederStatus, EggRecord, MatingRecord, Product
+
+
+# Days since the last egg (without a later mating) after which need_mating escalates.
+NEED_MATING_WARNING_DAYS = 25
+
+
+def need_mating_status(now: datetime, last_egg_at: Optional[datetime], last_mating_at: Optional[datetime]) -> str:
+    """Return one of: normal | need_mating | warning.
+
+    Business rule (female-centric):
+    - If no egg record -> normal
+    - If there is a mating record on/after the last egg day -> normal
+    - Else -> need_mating (from egg day 0)
+      - If days_since_last_egg >= NEED_MATING_WARNING_DAYS -> warning
+
+    Note: egg day counts as day 0.
+    """
+
+    if not last_egg_at:
+        return "normal"
+
+    # Any mating on/after the last egg clears the need.
+    if last_mating_at and last_mating_at.date() >= last_egg_at.date():
+        return "normal"
+
+    days = (now.date() - last_egg_at.date()).days
+    if days >= NEED_MATING_WARNING_DAYS:
+        return "warning"
+    return "need_mating"
+
+
+def _pick_latest(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
+    if a and b:
+        return a if a >= b else b
+    return a or b
+
+
+def refresh_breeder_status(db: Session, product_id: str) -> Optional[BreederStatus]:
+    """Recompute the persisted breeder_status row for one female breeder.
+
+    Called by admin write paths (record/event create+delete, product create/update)
+    inside their transaction; the caller flushes its pending writes first and
+    commits afterwards.
+
+    Data priority matches the list page: prefer breeder_events, keep legacy
+    egg_records/mating_records as fallback, and take the latest of both.
+    Non-female products have their status row removed.
+    """
+
+    product = db.query(Product).filter(Product.id == product_id).first()
+    if not product:
+        return None
+
+    status = db.query(BreederStatus).filter(BreederStatus.product_id == product_id).first()
+
+    if (product.sex or "").lower() != "female":
+        if status:
+            db.delete(status)
+            db.flush()
+        return None
+
+    last_egg_event_at = (
+        db.query(func.max(BreederEvent.event_date))
+        .filter(BreederEvent.product_id == product_id)
+        .filter(BreederEvent.event_type == "egg")
+        .scalar()
+    )
+    last_egg_record_at = (
+        db.query(func.max(EggRecord.laid_at))
+        .filter(EggRecord.female_id == product_id)
+        .scalar()
+    )
+
+    last_mating_event_at = (
+        db.query(func.max(BreederEvent.event_date))
+        .filter(BreederEvent.product_id == product_id)
+        .filter(BreederEvent.event_type == "mating")
+        .scalar()
+    )
+    last_mating_record_at = (
+        db.query(func.max(MatingRecord.mated_at))
+        .filter(MatingRecord.female_id == product_id)
+        .scalar()
+    )
+
+    if status is None:
+        status = BreederStatus(product_id=product_id)
+        db.add(status)
+
+    status.last_egg_at = _pick_latest(last_egg_event_at, last_egg_record_at)
+    status.last_mating_at = _pick_latest(last_mating_event_at, last_mating_record_at)
+    status.updated_at = datetime.utcnow()
+    db.flush()
+
+    return status
+
+
+def rebuild_all_breeder_status(db: Session) -> int:
+    """Recompute breeder_status for every female breeder (repair/backfill helper)."""
+
+    female_ids = [
+        row[0]
+        for row in db.query(Product.id).filter(func.lower(Product.sex) == "female").all()
+    ]
+    for female_id in female_ids:
+        refresh_breeder_status(db, female_id)
+    return len(female_ids)
@@ -0,0 +1,147 @@
+"""Series-wide breeding dashboard: mating status for every female, grouped by mate.
+
+Inputs are read set-based (breeder_status summary + batched current-mate
+resolution); the per-female status rule from the breeder list / mate-load
+pages is then applied to the whole series at once with NumPy date arithmetic.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.models import BreederStatus, Product
+from app.services.breeder_status import NEED_MATING_WARNING_DAYS
+from app.services.current_mate import current_mate_code, resolve_current_mates
+
+STATUS_SEVERITY = {"warning": 2, "need_mating": 1, "normal": 0}
+
+
+def _to_days(values: Sequence[Optional[datetime]]) -> np.ndarray:
+    # NaT for missing values; day resolution so the egg day counts as day 0.
+    return np.array([np.datetime64(v, "D") if v else np.datetime64("NaT") for v in values], dtype="datetime64[D]")
+
+
+def compute_need_mating_statuses(
+    now: datetime,
+    last_egg_at: Sequence[Optional[datetime]],
+    last_mating_at: Sequence[Optional[datetime]],
+) -> tuple[list[str], list[Optional[int]]]:
+    """Vectorized need-mating rule; returns (statuses, days_since_egg) per female.
+
+    Same rule as breeder_status.need_mating_status():
+    - no egg -> normal
+    - a mating on/after the last egg day -> normal
+    - otherwise need_mating, escalating to warning after NEED_MATING_WARNING_DAYS
+    """
+
+    egg = _to_days(last_egg_at)
+    mating = _to_days(last_mating_at)
+    today = np.datetime64(now, "D")
+
+    has_egg = ~np.isnat(egg)
+    days = np.where(has_egg, (today - egg).astype("int64"), -1)
+    # NaT comparisons are False, so females without a mating fall through to "not mated".
+    mated_since_egg = has_egg & ~np.isnat(mating) & (mating >= egg)
+
+    statuses = np.select(
+        [~has_egg | mated_since_egg, days >= NEED_MATING_WARNING_DAYS],
+        ["normal", "warning"],
+        default="need_mating",
+    )
+    days_since_egg = [int(d) if ok else None for d, ok in zip(days.tolist(), has_egg.tolist())]
+    return statuses.tolist(), days_since_egg
+
+
+def build_breeding_dashboard(
+    db: Session,
+    series_id: str,
+    include_retired: bool = False,
+    now: Optional[datetime] = None,
+) -> dict:
+    now = now or datetime.utcnow()
+
+    q = (
+        db.query(
+            Product.id,
+            Product.code,
+            Product.sex,
+            Product.mate_code,
+            Product.description,
+            Product.exclude_from_breeding,
+            BreederStatus.last_egg_at,
+            BreederStatus.last_mating_at,
+        )
+        .outerjoin(BreederStatus, BreederStatus.product_id == Product.id)
+        .filter(Product.series_id == series_id)
+        .filter(Product.sex == "female")
+    )
+    if not include_retired:
+        q = q.filter(Product.exclude_from_breeding.is_(False))
+    females = q.all()
+
+    mates = resolve_current_mates(db, females)
+    statuses, days_since_egg = compute_need_mating_statuses(
+        now,
+        [f.last_egg_at for f in females],
+        [f.last_mating_at for f in females],
+    )
+
+    groups: dict[Optional[str], dict] = {}
+    totals = {"females": 0, "needMating": 0, "warning": 0}
+
+    for female, status, days in zip(females, statuses, days_since_egg):
+        mate = mates.get(female.id)
+        mate_code = mate.code if mate else current_mate_code(female)
+        key = mate.id if mate else mate_code
+
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                "mate": {"id": mate.id, "code": mate.code} if mate else None,
+                "mateCode": mate_code,
+                "totals": {"females": 0, "needMating": 0, "warning": 0},
+                "items": [],
+            }
+
+        for bucket in (group["totals"], totals):
+            bucket["females"] += 1
+            if status == "need_mating":
+                bucket["needMating"] += 1
+            elif status == "warning":
+                bucket["warning"] += 1
+
+        group["items"].append(
+            {
+                "femaleId": female.id,
+                "femaleCode": female.code,
+                "status": status,
+                "lastEggAt": female.last_egg_at.isoformat() if female.last_egg_at else None,
+                "lastMatingAt": female.last_mating_at.isoformat() if female.last_mating_at else None,
+                "daysSinceEgg": days,
+                "excludeFromBreeding": bool(female.exclude_from_breeding),
+            }
+        )
+
+    for group in groups.values():
+        # Most urgent first, as on the mate-load page.
+        group["items"].sort(
+            key=lambda it: (STATUS_SEVERITY.get(it["status"], 0), it["daysSinceEgg"] or -1, it["femaleCode"] or ""),
+            reverse=True,
+        )
+
+    # Busiest males first; females without any mate last.
+    ordered = sorted(
+        groups.values(),
+        key=lambda g: (
+            g["mateCode"] is None,
+            -g["totals"]["warning"],
+            -g["totals"]["needMating"],
+            g["mateCode"] or "",
+        ),
+    )
+
+    return {"seriesId": series_id, "totals": totals, "groups": ordered}
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.models import MatingRecord, Product
+from app.services.breeder_mate import parse_current_mate_code
+from app.services.lineage_graph import LineageNode, get_lineage_graph
+
+
+def canonical_mate_code_candidates(code: Optional[str]) -> list[str]:
+    # Notes may include or omit the trailing "公" marker; try both.
+    c = (code or "").strip()
+    if not c:
+        return []
+    if c.endswith("公"):
+        return [c, c[:-1]]
+    return [c, c + "公"]
+
+
+def current_mate_code(breeder: Product) -> Optional[str]:
+    """Best-effort mate code for a female, even when it doesn't resolve to a breeder."""
+
+    if (breeder.sex or "").lower() != "female":
+        return None
+    return (
+        (getattr(breeder, "mate_code", None) or "").strip()
+        or (parse_current_mate_code(getattr(breeder, "description", None)) or "").strip()
+        or None
+    )
+
+
+def resolve_current_mates(db: Session, breeders: Iterable[Product]) -> dict[str, LineageNode]:
+    """Resolve the current mate (male breeder) for many females at once.
+
+    Priority per female:
+    1) Explicit products.mate_code (admin-managed)
+    2) Latest "更换配偶为..." event in breeder.description
+    3) Latest mating record's male
+
+    Codes resolve through the in-memory lineage graph; females still unresolved
+    share one windowed query for their latest mating record. Returns
+    {female_id: mate}; females without a resolvable mate are omitted.
+    """
+
+    females = [b for b in breeders if b is not None and b.sex == "female"]
+    if not females:
+        return {}
+
+    graph = get_lineage_graph(db)
+    resolved: dict[str, LineageNode] = {}
+    pending: list[str] = []
+
+    for breeder in females:
+        mate = None
+        for code in (
+            (getattr(breeder, "mate_code", None) or "").strip(),
+            parse_current_mate_code(getattr(breeder, "description", None)),
+        ):
+            for c in canonical_mate_code_candidates(code):
+                node = graph.get(c)
+                if node and node.sex == "male":
+                    mate = node
+                    break
+            if mate:
+                break
+        if mate:
+            resolved[breeder.id] = mate
+        else:
+            pending.append(breeder.id)
+
+    if pending:
+        ranked = (
+            db.query(
+                MatingRecord.female_id.label("female_id"),
+                MatingRecord.male_id.label("male_id"),
+                func.row_number()
+                .over(partition_by=MatingRecord.female_id, order_by=MatingRecord.mated_at.desc())
+                .label("rn"),
+            )
+            .filter(MatingRecord.female_id.in_(pending))
+            .subquery()
+        )
+        rows = db.query(ranked.c.female_id, ranked.c.male_id).filter(ranked.c.rn == 1).all()
+        for female_id, male_id in rows:
+            node = graph.get_by_id(male_id)
+            if node and node.sex == "male":
+                resolved[female_id] = node
+
+    return resolved
+
+
+def resolve_current_mate(db: Session, breeder: Product) -> Optional[LineageNode]:
+    if breeder is None:
+        return None
+    return resolve_current_mates(db, [breeder]).get(breeder.id)
+
+
+def current_mate_payload(mate: Optional[LineageNode]) -> Optional[dict]:
+    return {"id": mate.id, "code": mate.code} if mate else None
@@ -0,0 +1,219 @@
+"""Garbage collection of image files no product_images row references.
+
+Failed imports, abandoned uploads and the code-named folders left behind by
+scripts/migrate_images_to_product_id.py leave files under
+`<UPLOAD_DIR>/<folder>/` that nothing points at. collect_orphans() walks the
+store with os.scandir, one top-level folder at a time and in sorted order, so
+a run can stop after `max_folders` and resume from the returned cursor. Files
+are checked against the DB in batches of (folder, stem) keys, and the walk is
+rate limited so it can run against the live volume without I/O bursts.
+
+A file belongs to the URL `images/<folder>/<stem>.<ext>` (in any of the URL
+forms product rows store) whatever variant or format it is
+(`<folder>/<size>/<stem>.webp`, ...). Files younger than
+`min_age` seconds are skipped: uploads and imports render before their rows
+are committed.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import quote, unquote
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core import file_utils
+from app.models.models import ImageFile, Product, ProductImage
+from app.services.image_store import LOCAL_IMAGE_URL_PREFIXES, split_local_image_url
+
+# Folders under UPLOAD_DIR that are not product image folders.
+GC_SKIP_FOLDERS = {os.path.basename(file_utils.CAROUSEL_DIR)}
+
+IMAGE_GC_BATCH_SIZE = int(os.getenv("IMAGE_GC_BATCH_SIZE", "500"))
+# Filesystem operations (stat/unlink) per second; 0 disables throttling.
+IMAGE_GC_RATE = float(os.getenv("IMAGE_GC_RATE", "200"))
+IMAGE_GC_MIN_AGE = int(os.getenv("IMAGE_GC_MIN_AGE", "3600"))
+
+# One collection at a time: concurrent runs would only double the I/O.
+_gc_lock = threading.Lock()
+
+
+class _Throttle:
+    """Sleep so that at most `rate` operations per second are issued."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.next_at = time.monotonic()
+
+    def tick(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(now, self.next_at) + self.interval
+
+
+def _iter_files(directory: str, throttle: _Throttle) -> Iterator[os.DirEntry]:
+    try:
+        it = os.scandir(directory)
+    except FileNotFoundError:
+        return
+    # Lazily: the blobs folder can hold every image in the album.
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files(entry.path, throttle)
+            elif entry.is_file(follow_symlinks=False):
+                throttle.tick()
+                yield entry
+
+
+def _folders(cursor: Optional[str]) -> List[str]:
+    try:
+        with os.scandir(file_utils.IMAGES_DIR) as it:
+            names = [e.name for e in it if e.is_dir(follow_symlinks=False) and e.name not in GC_SKIP_FOLDERS]
+    except FileNotFoundError:
+        return []
+    return sorted(name for name in names if cursor is None or name > cursor)
+
+
+def _referenced_keys(db: Session, keys: Dict[Tuple[str, str], Set[str]]) -> Set[Tuple[str, str]]:
+    """Subset of (folder, stem) keys some product row points at.
+
+    Rows may hold any form normalize_local_image_url() serves (`images/...`,
+    `/static/images/...`, ...; create_product stores client URLs verbatim), so
+    every prefix form is looked up and matches are mapped back through the same
+    parser.
+    """
+
+    candidates: Set[str] = set()
+    for (folder, stem), exts in keys.items():
+        for ext in exts | {"jpg"}:
+            for filename in {f"{stem}.{ext}", quote(f"{stem}.{ext}")}:
+                candidates.update(f"{prefix}{folder}/{filename}" for prefix in LOCAL_IMAGE_URL_PREFIXES)
+
+    urls = sorted(candidates)
+    found: Set[str] = set()
+    for i in range(0, len(urls), IMAGE_GC_BATCH_SIZE):
+        chunk = urls[i : i + IMAGE_GC_BATCH_SIZE]
+        found.update(url for (url,) in db.query(ProductImage.url).filter(ProductImage.url.in_(chunk)).all())
+        # Pedigree photos are free-form URLs on the product itself.
+        for sire, dam in (
+            db.query(Product.sire_image_url, Product.dam_image_url)
+            .filter(or_(Product.sire_image_url.in_(chunk), Product.dam_image_url.in_(chunk)))
+            .all()
+        ):
+            found.update(u for u in (sire, dam) if u)
+
+    referenced = set()
+    for url in found & candidates:
+        folder, filename = split_local_image_url(url)
+        key = (folder, unquote(filename).rpartition(".")[0])
+        if key in keys:
+            referenced.add(key)
+    return referenced
+
+
+def _remove_empty_dirs(folder_dir: str) -> None:
+    for root, _dirs, _files in os.walk(folder_dir, topdown=False):
+        try:
+            os.rmdir(root)
+        except OSError:
+            pass
+
+
+def collect_orphans(
+    db: Session,
+    apply: bool = False,
+    cursor: Optional[str] = None,
+    max_folders: Optional[int] = None,
+    min_age: Optional[int] = None,
+    rate: Optional[float] = None,
+) -> dict:
+    """Report (or with `apply`, delete) unreferenced files under UPLOAD_DIR.
+
+    Returns totals, per-folder details and `nextCursor` (None once the whole
+    store was scanned). Commits after every lookup batch and every reclaimed
+    folder (removed manifest rows), so no transaction spans the throttled walk.
+    """
+
+    min_age = IMAGE_GC_MIN_AGE if min_age is None else min_age
+    throttle = _Throttle(IMAGE_GC_RATE if rate is None else rate)
+    cutoff = time.time() - min_age
+
+    if not _gc_lock.acquire(blocking=False):
+        raise RuntimeError("Image garbage collection is already running")
+    try:
+        folders = _folders(cursor)
+        next_cursor = None
+        if max_folders is not None and len(folders) > max_folders:
+            folders = folders[:max_folders]
+            next_cursor = folders[-1]
+
+        report = {"scannedFiles": 0, "orphanFiles": 0, "orphanBytes": 0, "reclaimedBytes": 0, "skippedRecent": 0}
+        details = []
+        for folder in folders:
+            folder_dir = os.path.join(file_utils.IMAGES_DIR, folder)
+            pending: List[os.DirEntry] = []
+            orphans: List[Tuple[str, int]] = []
+
+            def flush() -> None:
+                keys: Dict[Tuple[str, str], Set[str]] = {}
+                for entry in pending:
+                    stem, _, ext = entry.name.rpartition(".")
+                    exts = keys.setdefault((folder, stem or entry.name), set())
+                    # Only the top-level file can be the stored URL; derivatives share its stem.
+                    if os.path.dirname(entry.path) == folder_dir and ext:
+                        exts.add(ext.lower())
+                referenced = _referenced_keys(db, keys)
+                # Don't keep a pooled writer connection checked out across throttled disk I/O.
+                db.commit()
+                for entry in pending:
+                    stem = entry.name.rpartition(".")[0] or entry.name
+                    if (folder, stem) not in referenced:
+                        orphans.append((entry.path, entry.stat().st_size))
+                pending.clear()
+
+            for entry in _iter_files(folder_dir, throttle):
+                report["scannedFiles"] += 1
+                if entry.stat().st_mtime > cutoff:
+                    report["skippedRecent"] += 1
+                    continue
+                pending.append(entry)
+                if len(pending) >= IMAGE_GC_BATCH_SIZE:
+                    flush()
+            if pending:
+                flush()
+
+            if not orphans:
+                continue
+            folder_bytes = sum(size for _, size in orphans)
+            report["orphanFiles"] += len(orphans)
+            report["orphanBytes"] += folder_bytes
+            details.append({"folder": folder, "files": len(orphans), "bytes": folder_bytes})
+
+            if apply:
+                removed = []
+                for path, size in orphans:
+                    throttle.tick()
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        continue
+                    report["reclaimedBytes"] += size
+                    removed.append(os.path.relpath(path, file_utils.IMAGES_DIR).replace(os.sep, "/"))
+                for i in range(0, len(removed), IMAGE_GC_BATCH_SIZE):
+                    db.query(ImageFile).filter(ImageFile.path.in_(removed[i : i + IMAGE_GC_BATCH_SIZE])).delete(
+                        synchronize_session=False
+                    )
+                db.commit()
+                _remove_empty_dirs(folder_dir)
+
+        return {**report, "applied": apply, "folders": details, "nextCursor": next_cursor}
+    finally:
+        _gc_lock.release()
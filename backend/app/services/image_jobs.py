@@ -0,0 +1,454 @@
+"""Persistent background queue for product image derivative generation.
+
+The upload endpoint only stages the original bytes and creates placeholder
+product_images rows (final URLs, files not written yet); one image_job_items
+row per new content records the work. Uploads of content that is still queued
+share that item: their rows carry the same blob URL, get its files when it
+succeeds and are dropped with its placeholder when it fails. Worker threads claim pending items, run
+generate_image_derivatives (in the image process pool when enabled) and keep
+the parent image_jobs counters up to date for the status endpoint.
+
+Everything the workers need lives in the database plus the staging directory,
+so a restart resumes unfinished work. A claimed item carries its worker's id
+and a lease the worker keeps extending while it runs; items whose lease ran
+out (the owning process died) are claimed again, and recover_interrupted_jobs()
+puts them back to 'pending' at startup. Live claims of other processes are
+left alone.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Sequence
+
+from fastapi import UploadFile
+from PIL import Image
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core import file_utils
+from app.models.models import ImageJob, ImageJobItem, ProductImage
+from app.services.image_store import (
+    blob_url,
+    image_output_dir,
+    record_image_files,
+    reference_count,
+    release_image_file,
+)
+from app.services.product_image_summary import refresh_product_image_urls
+
+logger = logging.getLogger(__name__)
+
+# Staged originals must survive restarts but never be served, so they stay out of STATIC_DIR.
+IMAGE_JOB_STAGING_DIR = os.getenv(
+    "IMAGE_JOB_STAGING_DIR", os.path.join(file_utils.UPLOAD_TMP_DIR, "image_jobs")
+)
+# Worker threads mostly wait on the process pool; one per pool worker keeps it busy.
+IMAGE_JOB_THREADS = int(os.getenv("IMAGE_JOB_THREADS", str(max(1, file_utils.IMAGE_WORKERS))))
+# Safety net for missed wakeups (e.g. jobs enqueued by another process).
+IMAGE_JOB_POLL_SECONDS = 1.0
+# A running item whose worker has not renewed its claim for this long is taken back.
+IMAGE_JOB_LEASE_SECONDS = int(os.getenv("IMAGE_JOB_LEASE_SECONDS", "120"))
+
+
+async def stage_upload(upload: UploadFile, budget: Optional[file_utils.UploadBudget] = None) -> tuple[str, str]:
+    """Stream an uploaded original into the staging dir; returns (staged path, sha256 hex).
+
+    The upload is copied in chunks under the per-file/per-request byte limits
+    (file_utils.UploadTooLargeError). Only the image header is parsed here, so
+    obviously broken uploads are still rejected inside the request while the
+    expensive decode happens later.
+    """
+
+    os.makedirs(IMAGE_JOB_STAGING_DIR, exist_ok=True)
+    path = os.path.join(IMAGE_JOB_STAGING_DIR, f"{uuid.uuid4().hex}.upload")
+    hasher = hashlib.sha256()
+    await file_utils.stream_upload(upload, path, budget, hasher)
+
+    try:
+        with Image.open(path) as img:
+            img.verify()
+    except Exception as e:
+        _remove_staged(path)
+        raise ValueError(f"Failed to process image {upload.filename}: {e}")
+    return path, hasher.hexdigest()
+
+
+def _remove_staged(path: Optional[str]) -> None:
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            logger.warning("Failed to remove staged upload %s", path)
+
+
+def enqueue_image_job(db: Session, product_id: str, items: Sequence[tuple[ProductImage, str, str]]) -> ImageJob:
+    """Create a job for (placeholder image, staged path, file stem) triples.
+
+    The caller commits (together with the placeholder rows) and then calls
+    notify_image_workers().
+    """
+
+    db.flush()
+    job = ImageJob(product_id=product_id, status="pending", total=len(items), completed=0, failed=0)
+    db.add(job)
+    db.flush()
+    for position, (image, source_path, file_stem) in enumerate(items):
+        db.add(
+            ImageJobItem(
+                job_id=job.id,
+                image_id=image.id,
+                position=position,
+                source_path=source_path,
+                file_stem=file_stem,
+                status="pending",
+            )
+        )
+    db.flush()
+    return job
+
+
+def queued_file_stems(db: Session, file_stems: Sequence[str]) -> set:
+    """The stems among `file_stems` that a pending or running item will render."""
+
+    if not file_stems:
+        return set()
+    rows = (
+        db.query(ImageJobItem.file_stem)
+        .filter(ImageJobItem.file_stem.in_(set(file_stems)), ImageJobItem.status.in_(("pending", "running")))
+        .distinct()
+    )
+    return {file_stem for (file_stem,) in rows}
+
+
+def discard_product_jobs(db: Session, product_id: str) -> None:
+    """Drop queued work for a product being deleted (caller commits, then notify_image_workers()).
+
+    Other products' rows may share a queued item's blob (uploaded while it was
+    pending): a pending item is then re-queued for one of those rows, and a running
+    one keeps its staged original so the worker still writes the shared files.
+    """
+
+    jobs = db.query(ImageJob).filter(ImageJob.product_id == product_id).all()
+    for job in jobs:
+        for item in job.items:
+            if item.status not in ("pending", "running"):
+                continue
+            heir = (
+                db.query(ProductImage)
+                .filter(ProductImage.url == blob_url(item.file_stem), ProductImage.product_id != product_id)
+                .order_by(ProductImage.sort_order.asc(), ProductImage.id.asc())
+                .first()
+            )
+            if heir is None:
+                _remove_staged(item.source_path)
+            elif item.status == "pending":
+                enqueue_image_job(db, heir.product_id, [(heir, item.source_path, item.file_stem)])
+        db.delete(job)
+
+
+def job_to_dict(job: ImageJob) -> dict:
+    processed = (job.completed or 0) + (job.failed or 0)
+    return {
+        "id": job.id,
+        "productId": job.product_id,
+        "status": job.status,
+        "total": job.total,
+        "completed": job.completed,
+        "failed": job.failed,
+        "progress": round(processed / job.total, 4) if job.total else 1.0,
+        "createdAt": job.created_at.isoformat() if job.created_at else None,
+        "updatedAt": job.updated_at.isoformat() if job.updated_at else None,
+        "finishedAt": job.finished_at.isoformat() if job.finished_at else None,
+        "items": [
+            {"imageId": item.image_id, "status": item.status, "error": item.error}
+            for item in job.items
+        ],
+    }
+
+
+def _lease_expired(now: datetime):
+    # Items claimed before leases existed have none; they count as expired.
+    return or_(ImageJobItem.lease_expires_at.is_(None), ImageJobItem.lease_expires_at < now)
+
+
+def recover_interrupted_jobs(session_factory: Callable[[], Session]) -> int:
+    """Reset 'running' items whose lease has expired; returns how many."""
+
+    db = session_factory()
+    try:
+        count = (
+            db.query(ImageJobItem)
+            .filter(ImageJobItem.status == "running", _lease_expired(datetime.utcnow()))
+            .update({"status": "pending", "claimed_by": None, "lease_expires_at": None}, synchronize_session=False)
+        )
+        db.commit()
+        return count
+    finally:
+        db.close()
+
+
+def _output_dir(url: str, product_id: str) -> str:
+    # Blob URLs for current uploads; per-product folders for items queued before that.
+    output_dir = image_output_dir(url) or os.path.join(file_utils.IMAGES_DIR, str(product_id))
+    os.makedirs(output_dir, exist_ok=True)
+    return output_dir
+
+
+class ImageJobWorker:
+    """Thread pool draining image_job_items; process_next() is usable on its own.
+
+    While started, a heartbeat thread renews the leases of the items this
+    worker is running.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], threads: int = IMAGE_JOB_THREADS):
+        self.session_factory = session_factory
+        self.threads = max(1, threads)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        self._stop.clear()
+        for i in range(self.threads):
+            t = threading.Thread(target=self._run, name=f"image-job-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        heartbeat = threading.Thread(target=self._heartbeat, name="image-job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        self.notify()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after the items currently in progress; pending ones stay queued."""
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def renew_leases(self) -> int:
+        """Extend the leases of the items this worker is running; returns how many."""
+
+        db = self.session_factory()
+        try:
+            count = (
+                db.query(ImageJobItem)
+                .filter(ImageJobItem.claimed_by == self.owner, ImageJobItem.status == "running")
+                .update({"lease_expires_at": self._lease_deadline()}, synchronize_session=False)
+            )
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    @staticmethod
+    def _lease_deadline() -> datetime:
+        return datetime.utcnow() + timedelta(seconds=IMAGE_JOB_LEASE_SECONDS)
+
+    def _heartbeat(self) -> None:
+        # Several renewals per lease period, so one slow commit does not lose the claim.
+        while not self._stop.wait(IMAGE_JOB_LEASE_SECONDS / 4):
+            try:
+                self.renew_leases()
+            except Exception:
+                logger.exception("Image job lease renewal failed")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.process_next():
+                    continue
+            except Exception:
+                logger.exception("Image job worker iteration failed")
+            self._wake.wait(IMAGE_JOB_POLL_SECONDS)
+            self._wake.clear()
+
+    def _claim(self, db: Session) -> Optional[ImageJobItem]:
+        while True:
+            # Pending items, plus running ones whose owner stopped renewing its lease.
+            claimable = or_(
+                ImageJobItem.status == "pending",
+                (ImageJobItem.status == "running") & _lease_expired(datetime.utcnow()),
+            )
+            candidate = (
+                db.query(ImageJobItem.id, ImageJobItem.job_id)
+                .join(ImageJob, ImageJob.id == ImageJobItem.job_id)
+                .filter(claimable)
+                .order_by(ImageJob.created_at.asc(), ImageJobItem.position.asc())
+                .first()
+            )
+            if candidate is None:
+                return None
+
+            # Conditional update so two threads (or processes) never take the same item.
+            claimed = (
+                db.query(ImageJobItem)
+                .filter(ImageJobItem.id == candidate.id, claimable)
+                .update(
+                    {"status": "running", "claimed_by": self.owner, "lease_expires_at": self._lease_deadline()},
+                    synchronize_session=False,
+                )
+            )
+            if claimed:
+                db.query(ImageJob).filter(
+                    ImageJob.id == candidate.job_id, ImageJob.status == "pending"
+                ).update({"status": "running"}, synchronize_session=False)
+                db.commit()
+                return db.query(ImageJobItem).filter(ImageJobItem.id == candidate.id).one()
+            db.rollback()
+
+    def process_next(self) -> bool:
+        """Process one pending item; returns False when the queue is empty."""
+
+        db = self.session_factory()
+        try:
+            item = self._claim(db)
+            if item is None:
+                return False
+
+            item_id, job_id, image_id = item.id, item.job_id, item.image_id
+            source_path, file_stem = item.source_path, item.file_stem
+            product_id = item.job.product_id
+
+            error = None
+            files = []
+            url = self._item_url(db, image_id, file_stem)
+            # Return the writer connection to the pool while rendering, so requests and
+            # other worker threads can write meanwhile.
+            db.commit()
+            if url is not None:
+                try:
+                    files = file_utils.run_image_task_blocking(
+                        file_utils.generate_image_derivatives,
+                        source_path,
+                        _output_dir(url, product_id),
+                        file_stem,
+                        True,
+                        file_utils.PRERENDER_SIZES,
+                    )
+                except Exception as e:
+                    error = str(e) or e.__class__.__name__
+                    logger.warning("Image job %s item %s failed: %s", job_id, item_id, error)
+
+            # The placeholder (or the whole product) may have been deleted meanwhile.
+            db.expire_all()
+            item = db.query(ImageJobItem).filter(ImageJobItem.id == item_id).first()
+            image = db.query(ProductImage).filter(ProductImage.id == image_id).first()
+            if files:
+                record_image_files(db, url, files)
+            if error is not None and url is not None and not self._rendered_by_other_item(db, item_id, file_stem):
+                self._drop_placeholders(db, url)
+            elif image is None:
+                db.flush()
+                release_image_file(db, url)
+
+            if item is not None:
+                item.status = "failed" if error else "done"
+                item.error = error
+                item.lease_expires_at = None
+                self._record_progress(db, item.job, failed=error is not None)
+            db.commit()
+
+            _remove_staged(source_path)
+            return True
+        finally:
+            db.close()
+
+    @staticmethod
+    def _item_url(db: Session, image_id: str, file_stem: str) -> Optional[str]:
+        url = db.query(ProductImage.url).filter(ProductImage.id == image_id).scalar()
+        if url is None:
+            # The item's own row is gone; rows of later uploads sharing the blob still need the files.
+            shared = blob_url(file_stem)
+            if reference_count(db, shared):
+                url = shared
+        return url
+
+    @staticmethod
+    def _rendered_by_other_item(db: Session, item_id: str, file_stem: str) -> bool:
+        return (
+            db.query(ImageJobItem.id)
+            .filter(ImageJobItem.file_stem == file_stem, ImageJobItem.status == "done", ImageJobItem.id != item_id)
+            .first()
+            is not None
+        )
+
+    @staticmethod
+    def _drop_placeholders(db: Session, url: str) -> None:
+        """Delete every row showing `url` (its files were never written).
+
+        Besides the item's own placeholder these are rows of later uploads of the
+        same content, possibly on other products.
+        """
+        images = db.query(ProductImage).filter(ProductImage.url == url).all()
+        product_ids = {image.product_id for image in images}
+        lost_main = {image.product_id for image in images if image.type == "main"}
+        for image in images:
+            db.delete(image)
+        db.flush()
+        release_image_file(db, url)
+
+        # Same invariant as the delete-image endpoint: promote the first remaining image.
+        for product_id in lost_main:
+            next_img = (
+                db.query(ProductImage)
+                .filter(ProductImage.product_id == product_id)
+                .order_by(ProductImage.sort_order.asc())
+                .first()
+            )
+            if next_img:
+                next_img.type = "main"
+
+        db.flush()
+        for product_id in product_ids:
+            refresh_product_image_urls(db, product_id)
+
+    @staticmethod
+    def _record_progress(db: Session, job: ImageJob, failed: bool) -> None:
+        column = ImageJob.failed if failed else ImageJob.completed
+        db.query(ImageJob).filter(ImageJob.id == job.id).update(
+            {column: column + 1, ImageJob.updated_at: datetime.utcnow()}, synchronize_session=False
+        )
+        db.flush()
+        db.refresh(job)
+        if job.completed + job.failed >= job.total:
+            job.status = "failed" if job.failed else "done"
+            job.finished_at = datetime.utcnow()
+
+
+_worker: Optional[ImageJobWorker] = None
+
+
+def start_image_job_workers(session_factory: Callable[[], Session]) -> ImageJobWorker:
+    global _worker
+    if _worker is None:
+        resumed = recover_interrupted_jobs(session_factory)
+        if resumed:
+            logger.info("Resuming %s interrupted image job items", resumed)
+        _worker = ImageJobWorker(session_factory)
+        _worker.start()
+    return _worker
+
+
+def stop_image_job_workers() -> None:
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
+
+
+def notify_image_workers() -> None:
+    if _worker is not None:
+        _worker.notify()
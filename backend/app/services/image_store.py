@@ -0,0 +1,177 @@
+"""Content-addressed storage for product image files.
+
+Uploaded and imported originals are stored once under
+`<UPLOAD_DIR>/blobs/<sha256>.jpg` (+ the .webp sibling), keyed by the SHA-256
+of the original bytes plus the processing profile. product_images.url rows of
+any product may point at the same blob; the number of rows referencing a URL
+is its reference count, so the files are only unlinked when the last row goes.
+An identical upload finds the blob already rendered and skips re-encoding.
+
+Generated files are recorded in the image_files manifest (per stored URL), so
+deleting them and reporting disk usage do not probe the filesystem.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+from sqlalchemy import exists, func
+from sqlalchemy.orm import Session
+
+from app.core import file_utils
+from app.models.models import ImageFile, ProductImage
+
+BLOB_FOLDER = "blobs"
+
+# Forms a stored local image URL may take: canonical `images/...` rows, plus the
+# served `/static/images/...` URLs clients send back verbatim.
+LOCAL_IMAGE_URL_PREFIXES = ("/static/images/", "static/images/", "/images/", "images/")
+
+
+def split_local_image_url(url: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(folder, filename) of a local `<prefix><folder>/<filename>` image URL, else None."""
+
+    if not url or url.startswith(("http://", "https://", "/api/images/")):
+        return None
+    path = urlparse(url).path or url
+    prefix = next((p for p in LOCAL_IMAGE_URL_PREFIXES if path.startswith(p)), None)
+    if prefix is None:
+        return None
+    folder, _, filename = path[len(prefix) :].lstrip("/").partition("/")
+    if not folder or not filename or "/" in filename:
+        return None
+    return folder, filename
+
+
+def blob_stem_for_digest(digest: str, crop_square: bool = True) -> str:
+    """Stem of the blob whose original bytes have SHA-256 `digest` (hex)."""
+    # Uploads are square-cropped, batch imports keep the original framing.
+    return digest if crop_square else f"{digest}-nocrop"
+
+
+def blob_stem(content: bytes, crop_square: bool = True) -> str:
+    """Stem of the blob for `content` rendered with the given profile."""
+    return blob_stem_for_digest(hashlib.sha256(content).hexdigest(), crop_square)
+
+
+def blob_stem_for_file(path: str, crop_square: bool = True) -> str:
+    """blob_stem() of a file's bytes, hashed in chunks."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(file_utils.UPLOAD_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return blob_stem_for_digest(hasher.hexdigest(), crop_square)
+
+
+def blob_url(stem: str) -> str:
+    return f"images/{BLOB_FOLDER}/{stem}.jpg"
+
+
+def blob_dir() -> str:
+    return os.path.join(file_utils.IMAGES_DIR, BLOB_FOLDER)
+
+
+def blob_is_rendered(stem: str) -> bool:
+    base = os.path.join(blob_dir(), stem)
+    return os.path.isfile(f"{base}.jpg") and os.path.isfile(f"{base}.webp")
+
+
+def image_output_dir(url: str) -> Optional[str]:
+    """Directory the derivatives of a stored `images/<folder>/<file>` URL live in."""
+    parts = (url or "").split("/")
+    if len(parts) != 3 or parts[0] != "images":
+        return None
+    return os.path.join(file_utils.IMAGES_DIR, parts[1])
+
+
+def reference_count(db: Session, url: str) -> int:
+    return db.query(func.count(ProductImage.id)).filter(ProductImage.url == url).scalar() or 0
+
+
+def record_image_files(db: Session, image_url: str, files: Iterable[Dict[str, Any]]) -> None:
+    """Write the manifest for files returned by generate_image_derivatives (caller commits)."""
+
+    rows = []
+    for f in files:
+        rows.append(
+            ImageFile(
+                image_url=image_url,
+                path=os.path.relpath(f["path"], file_utils.IMAGES_DIR).replace(os.sep, "/"),
+                variant=f["variant"],
+                format=f["format"],
+                width=f.get("width"),
+                height=f.get("height"),
+                bytes=f.get("bytes") or 0,
+            )
+        )
+    if not rows:
+        return
+    # Re-rendering the same blob rewrites the same paths.
+    db.query(ImageFile).filter(ImageFile.path.in_([r.path for r in rows])).delete(synchronize_session=False)
+    db.add_all(rows)
+    db.flush()
+
+
+def delete_image_files(db: Session, url: str) -> bool:
+    """Remove every file generated for `url` using the manifest (caller commits).
+
+    URLs written before the manifest existed fall back to delete_file's probing.
+    """
+
+    paths = [path for (path,) in db.query(ImageFile.path).filter(ImageFile.image_url == url).all()]
+    if not paths:
+        return file_utils.delete_file(url)
+
+    for path in paths:
+        try:
+            os.remove(os.path.join(file_utils.IMAGES_DIR, path))
+        except FileNotFoundError:
+            pass
+    db.query(ImageFile).filter(ImageFile.image_url == url).delete(synchronize_session=False)
+    file_utils.delete_cached_variants(url)
+    return True
+
+
+def storage_usage(db: Session) -> dict:
+    """Bytes/files recorded in the manifest, grouped by format and variant."""
+
+    total_files, total_bytes = db.query(func.count(ImageFile.id), func.coalesce(func.sum(ImageFile.bytes), 0)).one()
+    by = {}
+    for column, key in ((ImageFile.format, "byFormat"), (ImageFile.variant, "byVariant")):
+        by[key] = {
+            value: {"files": files, "bytes": int(size or 0)}
+            for value, files, size in db.query(column, func.count(ImageFile.id), func.sum(ImageFile.bytes))
+            .group_by(column)
+            .all()
+        }
+    images = db.query(func.count(func.distinct(ImageFile.image_url))).scalar() or 0
+
+    # Files whose URL no product_images row references any more (reclaimable).
+    unreferenced = ~exists().where(ProductImage.url == ImageFile.image_url)
+    orphan_files, orphan_bytes = (
+        db.query(func.count(ImageFile.id), func.coalesce(func.sum(ImageFile.bytes), 0)).filter(unreferenced).one()
+    )
+    return {
+        "files": total_files,
+        "bytes": int(total_bytes),
+        "images": images,
+        "unreferenced": {"files": orphan_files, "bytes": int(orphan_bytes)},
+        **by,
+    }
+
+
+def release_image_file(db: Session, url: Optional[str]) -> bool:
+    """Unlink the files behind `url` once no product_images row references it.
+
+    Call after deleting (or re-pointing) the row and flushing; returns True when
+    files were removed.
+    """
+
+    if not url:
+        return False
+    if reference_count(db, url):
+        return False
+    return delete_image_files(db, url)
@@ -0,0 +1,218 @@
+"""On-demand product image variants with a size-bounded LRU disk cache.
+
+Uploads store the full-size JPEG/WebP plus the IMAGE_PRERENDER_SIZES copies;
+other widths are rendered the first time /api/images/{product_id}/{stem}?w=&fmt=
+asks for them. Rendered files live
+under IMAGE_CACHE_DIR/<product_id>/<stem>_w<width>.<ext> (w0 = full size) and
+are evicted least-recently-used once the cache exceeds IMAGE_CACHE_MAX_BYTES.
+Concurrent requests for a variant that is still rendering share one render.
+The /static and /images mounts (app.api.image_static) use the same cache for
+Accept-negotiated WebP/AVIF and ?w= requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.core import file_utils
+
+logger = logging.getLogger(__name__)
+
+# Requested widths snap up to the nearest of these so arbitrary ?w= values
+# cannot fill the cache with near-duplicates.
+VARIANT_WIDTHS = (150, 300, 500, 800, 1200)
+
+# fmt -> (extension, PIL format, quality, media type)
+VARIANT_FORMATS = {
+    "jpg": ("jpg", "JPEG", 85, "image/jpeg"),
+    "jpeg": ("jpg", "JPEG", 85, "image/jpeg"),
+    "webp": ("webp", "WebP", 80, "image/webp"),
+}
+if file_utils.AVIF_SUPPORTED:
+    VARIANT_FORMATS["avif"] = ("avif", "AVIF", 55, "image/avif")
+
+# Smallest first; the first one the client accepts wins.
+NEGOTIATED_FORMATS = ("avif", "webp")
+
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+class VariantCache:
+    """LRU bookkeeping for rendered variant files.
+
+    Recency survives restarts via file atimes (set on every hit; mtimes stay
+    put so validators are stable); the in-memory index is rebuilt from disk on
+    first use.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                found.append((st.st_atime, path, st.st_size))
+        for _, path, size in sorted(found):
+            self._entries[path] = size
+            self._total += size
+        self._loaded = True
+
+    def touch(self, path: str) -> bool:
+        """Mark a cached variant as used; False if it is not on disk."""
+        with self._lock:
+            self._load()
+            if not os.path.exists(path):
+                self._total -= self._entries.pop(path, 0)
+                return False
+            if path not in self._entries:
+                self._entries[path] = os.path.getsize(path)
+                self._total += self._entries[path]
+            self._entries.move_to_end(path)
+        try:
+            # Recency lives in atime: mtime feeds the ETag / Last-Modified and must not move on a hit.
+            os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+        except OSError:
+            pass
+        return True
+
+    def add(self, path: str, size: int) -> None:
+        """Record a freshly rendered variant and evict down to max_bytes."""
+        with self._lock:
+            self._load()
+            self._total += size - self._entries.pop(path, 0)
+            self._entries[path] = size
+            # Never evict the entry just added, even if it alone exceeds the budget.
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                victim, victim_size = self._entries.popitem(last=False)
+                self._total -= victim_size
+                try:
+                    os.remove(victim)
+                except OSError:
+                    pass
+
+
+_cache: Optional[VariantCache] = None
+_inflight: Dict[str, "asyncio.Future[None]"] = {}
+
+
+def get_variant_cache() -> VariantCache:
+    global _cache
+    if _cache is None:
+        _cache = VariantCache(file_utils.IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES)
+    return _cache
+
+
+def snap_width(width: Optional[int]) -> int:
+    """Nearest allowed width >= `width` (capped); 0 means full size."""
+    if not width:
+        return 0
+    if width < 0:
+        raise ValueError("Width must be positive")
+    return next((w for w in VARIANT_WIDTHS if w >= width), VARIANT_WIDTHS[-1])
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """Pick the smallest format the client accepts (Accept header) that we can encode."""
+    accepted = set()
+    for part in (accept or "").split(","):
+        media_type, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(media_type.strip().lower())
+
+    for fmt in NEGOTIATED_FORMATS:
+        if fmt in VARIANT_FORMATS and f"image/{fmt}" in accepted:
+            return fmt
+    return "jpg"
+
+
+def _safe_segment(value: str) -> bool:
+    return bool(value) and "/" not in value and "\\" not in value and not value.startswith(".")
+
+
+def source_path(product_id: str, stem: str) -> str:
+    """Full-size JPEG the variants are rendered from."""
+    if not _safe_segment(product_id) or not _safe_segment(stem):
+        raise ValueError("Invalid image path")
+    return os.path.join(file_utils.IMAGES_DIR, product_id, f"{stem}.jpg")
+
+
+async def get_image_variant(
+    product_id: str, stem: str, width: Optional[int] = None, fmt: str = "jpg"
+) -> Tuple[str, str]:
+    """Path and media type of the requested variant, rendering it if needed.
+
+    Raises ValueError for invalid input and FileNotFoundError when the source
+    image does not exist.
+    """
+
+    spec = VARIANT_FORMATS.get((fmt or "jpg").lower())
+    if spec is None:
+        raise ValueError(f"Unsupported format: {fmt}")
+    ext, pil_format, quality, media_type = spec
+
+    source = source_path(product_id, stem)
+    if not os.path.isfile(source):
+        raise FileNotFoundError(source)
+
+    width = snap_width(width)
+    # Full size: uploads already store JPEG and WebP siblings.
+    if width == 0:
+        stored = os.path.join(os.path.dirname(source), f"{stem}.{ext}")
+        if os.path.isfile(stored):
+            return stored, media_type
+
+    cache = get_variant_cache()
+    target = os.path.join(cache.root, product_id, f"{stem}_w{width}.{ext}")
+    if cache.touch(target):
+        return target, media_type
+
+    render = _inflight.get(target)
+    if render is None:
+        render = asyncio.ensure_future(_render(source, target, width, pil_format, quality))
+        _inflight[target] = render
+        render.add_done_callback(lambda _f, key=target: _inflight.pop(key, None))
+
+    # Shield so one client disconnecting does not cancel the render for the others.
+    await asyncio.shield(render)
+    return target, media_type
+
+
+async def _render(source: str, target: str, width: int, pil_format: str, quality: int) -> None:
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    size = await file_utils.run_image_task(
+        file_utils.render_image_variant, source, target, width or None, pil_format, quality
+    )
+    get_variant_cache().add(target, size)
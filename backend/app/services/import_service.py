@@ -7,10 +7,11 @@ import uuid
 import logging
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from pathlib import Path
 
 from app.models.models import Product, ProductImage
-from app.core.file_utils import optimize_single_image, IMAGES_DIR
+from app.services.product_image_summary import refresh_product_image_urls
+from app.core.file_utils import generate_image_derivatives, PRERENDER_SIZES
+from app.services.image_store import blob_dir, blob_is_rendered, blob_stem_for_file, blob_url, record_image_files
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -203,6 +204,8 @@ class BatchImportService:
                                 product.code, temp_dir, product.id, db
                             )
                             if images_found > 0:
+                                db.flush()
+                                refresh_product_image_urls(db, product.id)
                                 result.warnings.append(f"第 {row_num} 行: 编号 {product_code} 成功导入 {images_found} 张图片")
                             else:
                                 # 记录未匹配的编号
@@ -323,55 +326,37 @@ class BatchImportService:
             ProductImage.product_id == product_id
         ).scalar() or -1
 
-        for i, filename in enumerate(image_files):
+        existing_urls = {
+            url for (url,) in db.query(ProductImage.url).filter(ProductImage.product_id == product_id).all()
+        }
+
+        for filename in image_files:
             try:
                 src_path = os.path.join(found_folder, filename)
-                
-                # Define destination
-                # 存储结构统一为: <UPLOAD_DIR>/<product_id>/{size?}/{name}.{ext}
-                # We need to generate unique names to avoid conflicts if re-importing
-                file_stem = Path(filename).stem
-                unique_stem = f"{file_stem}_{uuid.uuid4().hex[:6]}"
-                
-                # Define sizes
-                sizes = {
-                    'thumbnail': (150, 150),
-                    'small': (300, 300),
-                    'medium': (500, 500), 
-                    'large': (800, 800)
-                }
 
-                product_dir = os.path.join(IMAGES_DIR, str(product_id))
-                os.makedirs(product_dir, exist_ok=True)
-                
-                # Optimize Main Images
-                original_jpg = os.path.join(product_dir, f"{unique_stem}.jpg")
-                original_webp = os.path.join(product_dir, f"{unique_stem}.webp")
-                
-                optimize_single_image(src_path, original_jpg, None, quality=90, format='JPEG')
-                optimize_single_image(src_path, original_webp, None, quality=80, format='WebP')
-
-                # Optimize Sizes
-                for size_name, size_dims in sizes.items():
-                    size_dir = os.path.join(product_dir, size_name)
-                    os.makedirs(size_dir, exist_ok=True)
-                    
-                    jpg_path = os.path.join(size_dir, f"{unique_stem}.jpg")
-                    webp_path = os.path.join(size_dir, f"{unique_stem}.webp")
-                    
-                    optimize_single_image(src_path, jpg_path, size_dims, quality=85, format='JPEG')
-                    optimize_single_image(src_path, webp_path, size_dims, quality=80, format='WebP')
+                # Content-addressed: the same photo is stored (and encoded) once,
+                # and re-importing it for the same product is a no-op.
+                file_stem = blob_stem_for_file(src_path, crop_square=False)
+                url = blob_url(file_stem)
+                if url in existing_urls:
+                    continue
+
+                if not blob_is_rendered(file_stem):
+                    # Decode once, then write the original (+ any pre-rendered sizes) as JPEG and WebP.
+                    files = generate_image_derivatives(src_path, blob_dir(), file_stem, crop_square=False, sizes=PRERENDER_SIZES)
+                    record_image_files(db, url, files)
 
                 # Add to DB
                 image = ProductImage(
                     id=str(uuid.uuid4()),
                     product_id=product_id,
-                    url=f"images/{product_id}/{unique_stem}.jpg",
+                    url=url,
                     alt=f"{product_code} - {filename}",
-                    type="main" if (max_sort == -1 and i == 0) else "gallery",
-                    sort_order=max_sort + 1 + i
+                    type="main" if (max_sort == -1 and count == 0) else "gallery",
+                    sort_order=max_sort + 1 + count
                 )
                 db.add(image)
+                existing_urls.add(url)
                 count += 1
 
             except Exception as e:
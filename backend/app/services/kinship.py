@@ -0,0 +1,188 @@
+"""Wright's inbreeding coefficients and pairing risk from code-based pedigrees.
+
+We build the additive (numerator) relationship matrix A with the tabular
+method over a pedigree ordered parents-before-offspring:
+
+    A[i, i] = 1 + 0.5 * A[sire, dam]
+    A[i, j] = 0.5 * (A[j, sire] + A[j, dam])     for j < i
+
+Then:
+- inbreeding of i:                F(i)    = A[i, i] - 1
+- inbreeding of a hypothetical
+  offspring of male m x female f: F(m x f) = 0.5 * A[m, f]   (coancestry)
+
+Pedigrees come from the in-memory lineage graph. Parent codes that do not
+resolve to a breeder record are kept as founder placeholders so that e.g. two
+siblings sharing an unregistered sire are still related. Unknown parents are
+treated as unrelated founders (base population).
+
+Matrices are memoized per (graph, series) and reused until the lineage graph
+is patched or rebuilt.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.services.lineage_graph import LineageGraph, normalize_lineage_code
+
+
+class KinshipMatrix:
+    __slots__ = ("index", "matrix")
+
+    def __init__(self, index: dict[str, int], matrix: np.ndarray):
+        # index: normalized code -> row in the additive relationship matrix
+        self.index = index
+        self.matrix = matrix
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _row(self, code: Optional[str]) -> Optional[int]:
+        key = normalize_lineage_code(code)
+        return self.index.get(key) if key else None
+
+    def inbreeding(self, code: Optional[str]) -> Optional[float]:
+        """F of an individual in this pedigree (None when not part of it)."""
+
+        i = self._row(code)
+        if i is None:
+            return None
+        return float(self.matrix[i, i] - 1.0)
+
+    def coancestry(self, code_a: Optional[str], code_b: Optional[str]) -> Optional[float]:
+        """Coancestry of two individuals = F of their hypothetical offspring."""
+
+        i, j = self._row(code_a), self._row(code_b)
+        if i is None or j is None:
+            return None
+        return float(0.5 * self.matrix[i, j])
+
+    def pairing_matrix(self, male_codes: list[str], female_codes: list[str]) -> np.ndarray:
+        """F of every hypothetical male x female offspring (rows: males, cols: females)."""
+
+        rows = [self._row(c) for c in male_codes]
+        cols = [self._row(c) for c in female_codes]
+        if any(r is None for r in rows) or any(c is None for c in cols):
+            raise KeyError("pairing candidates must be part of the pedigree")
+        return 0.5 * self.matrix[np.ix_(rows, cols)]
+
+
+def _collect_pedigree(graph: LineageGraph, seed_codes: Iterable[Optional[str]]) -> tuple[list[str], dict[str, tuple]]:
+    """Ancestor closure of the seeds, ordered parents-before-offspring.
+
+    Returns (order, parents) where parents maps code -> (sire_key, dam_key).
+    Edges that would close a cycle (bad pedigree data) are dropped.
+    """
+
+    parents: dict[str, tuple] = {}
+    order: list[str] = []
+    state: dict[str, int] = {}  # 1 = visiting, 2 = done
+
+    def _parents_of(key: str) -> tuple:
+        node = graph.get(key)
+        if node is None:
+            return (None, None)
+        return (normalize_lineage_code(node.sire_code), normalize_lineage_code(node.dam_code))
+
+    for seed in seed_codes:
+        root = normalize_lineage_code(seed)
+        if not root or root in state:
+            continue
+
+        # Iterative DFS (pedigrees can be deep enough to hit the recursion limit).
+        stack: list[tuple[str, int]] = [(root, 0)]
+        state[root] = 1
+        parents[root] = _parents_of(root)
+        while stack:
+            key, idx = stack.pop()
+            sire_dam = parents[key]
+            if idx < 2:
+                stack.append((key, idx + 1))
+                parent = sire_dam[idx]
+                if not parent:
+                    continue
+                seen = state.get(parent)
+                if seen == 1:
+                    # Cycle: treat this parent as unknown.
+                    fixed = list(sire_dam)
+                    fixed[idx] = None
+                    parents[key] = tuple(fixed)
+                elif seen is None:
+                    state[parent] = 1
+                    parents[parent] = _parents_of(parent)
+                    stack.append((parent, 0))
+                continue
+            state[key] = 2
+            order.append(key)
+
+    return order, parents
+
+
+def build_kinship_matrix(graph: LineageGraph, seed_codes: Iterable[Optional[str]]) -> KinshipMatrix:
+    """Additive relationship matrix over the seeds and all their ancestors."""
+
+    order, parents = _collect_pedigree(graph, seed_codes)
+    index = {key: i for i, key in enumerate(order)}
+    n = len(order)
+    A = np.zeros((n, n), dtype=np.float64)
+
+    for i, key in enumerate(order):
+        sire_key, dam_key = parents[key]
+        s = index.get(sire_key) if sire_key else None
+        d = index.get(dam_key) if dam_key else None
+
+        # Each row is one vectorized pass over already-computed individuals.
+        if s is not None and d is not None:
+            row = 0.5 * (A[s, :i] + A[d, :i])
+            A[i, i] = 1.0 + 0.5 * A[s, d]
+        elif s is not None:
+            row = 0.5 * A[s, :i]
+            A[i, i] = 1.0
+        elif d is not None:
+            row = 0.5 * A[d, :i]
+            A[i, i] = 1.0
+        else:
+            row = 0.0
+            A[i, i] = 1.0
+        A[i, :i] = row
+        A[:i, i] = row
+
+    return KinshipMatrix(index, A)
+
+
+_series_cache: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_series_cache_lock = threading.Lock()
+
+
+def series_kinship(graph: LineageGraph, series_id: str) -> KinshipMatrix:
+    """Memoized kinship matrix covering every breeder of a series (plus ancestors)."""
+
+    with _series_cache_lock:
+        per_graph = _series_cache.setdefault(graph, {})
+        cached = per_graph.get(series_id)
+        if cached is not None and cached[0] == graph.version:
+            return cached[1]
+
+    kinship = build_kinship_matrix(graph, (n.code for n in graph.members(series_id)))
+
+    with _series_cache_lock:
+        _series_cache.setdefault(graph, {})[series_id] = (graph.version, kinship)
+    return kinship
+
+
+# Offspring F thresholds: first-cousin (1/16), half-sib (1/8) matings.
+_RISK_THRESHOLDS = ((0.0625, "low"), (0.125, "moderate"))
+
+
+def inbreeding_risk_level(coefficient: Optional[float]) -> Optional[str]:
+    if coefficient is None:
+        return None
+    for limit, level in _RISK_THRESHOLDS:
+        if coefficient < limit:
+            return level
+    return "high"
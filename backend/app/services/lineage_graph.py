@@ -0,0 +1,318 @@
+"""Process-local lineage graph for turtle-album breeders.
+
+Family-tree, by-code and mate-load endpoints repeatedly resolve code-based
+relationships (sire_code / dam_code / mate_code). This module keeps those
+relationships in memory as adjacency maps keyed by normalized code, so the
+lookups are O(degree) without DB round-trips.
+
+Lifecycle:
+- Built lazily on first use (and warmed at app startup), one graph per database
+  (the read-only engine shares the graph of its writer).
+- Patched by admin product create/update/delete; invalidated by batch imports.
+- Rebuilt after LINEAGE_GRAPH_TTL_SECONDS to bound staleness from out-of-band
+  writes (operator scripts touching the DB directly).
+
+Only topology lives here; callers still fetch full Product rows (images etc.)
+by id in one batched query when they need them.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import weakref
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.session import primary_engine
+from app.models.models import Product
+
+
+LINEAGE_GRAPH_TTL_SECONDS = float(os.getenv("LINEAGE_GRAPH_TTL_SECONDS", "300"))
+
+# Lineage steps: P = via sire (paternal), M = via dam (maternal).
+PATERNAL = "P"
+MATERNAL = "M"
+
+
+def normalize_lineage_code(code: Optional[str]) -> Optional[str]:
+    """Graph key for a code: trimmed + uppercase (codes are stored uppercase)."""
+
+    key = (code or "").strip().upper()
+    return key or None
+
+
+class LineageNode:
+    __slots__ = (
+        "id",
+        "code",
+        "sex",
+        "series_id",
+        "sire_code",
+        "dam_code",
+        "mate_code",
+        "exclude_from_breeding",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        code: str,
+        sex: Optional[str],
+        series_id: Optional[str],
+        sire_code: Optional[str],
+        dam_code: Optional[str],
+        mate_code: Optional[str],
+        exclude_from_breeding: bool,
+    ):
+        self.id = id
+        self.code = code
+        self.sex = sex
+        self.series_id = series_id
+        self.sire_code = sire_code
+        self.dam_code = dam_code
+        self.mate_code = mate_code
+        self.exclude_from_breeding = exclude_from_breeding
+
+    @classmethod
+    def from_product(cls, p: Product) -> "LineageNode":
+        return cls(
+            id=p.id,
+            code=p.code,
+            sex=p.sex,
+            series_id=p.series_id,
+            sire_code=p.sire_code,
+            dam_code=p.dam_code,
+            mate_code=getattr(p, "mate_code", None),
+            exclude_from_breeding=bool(getattr(p, "exclude_from_breeding", False)),
+        )
+
+
+def _is_lineage_breeder(p) -> bool:
+    # Same predicate as the public breeder endpoints.
+    return p is not None and p.series_id is not None and p.sex is not None
+
+
+class LineageGraph:
+    """Adjacency maps over turtle-album breeders (series_id and sex populated)."""
+
+    def __init__(self) -> None:
+        self.built_at = time.monotonic()
+        # Bumped on every patch so derived caches (e.g. kinship) can detect changes.
+        self.version = 0
+        self._by_id: dict[str, LineageNode] = {}
+        self._by_code: dict[str, LineageNode] = {}
+        self._children_by_sire: dict[str, set[str]] = {}
+        self._children_by_dam: dict[str, set[str]] = {}
+        self._females_by_mate: dict[str, set[str]] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def build(cls, db: Session) -> "LineageGraph":
+        graph = cls()
+        rows = (
+            db.query(
+                Product.id,
+                Product.code,
+                Product.sex,
+                Product.series_id,
+                Product.sire_code,
+                Product.dam_code,
+                Product.mate_code,
+                Product.exclude_from_breeding,
+            )
+            .filter(Product.series_id.isnot(None))
+            .filter(Product.sex.isnot(None))
+            .all()
+        )
+        for row in rows:
+            graph._add(LineageNode(*row[:7], bool(row[7])))
+        return graph
+
+    # -- mutation -------------------------------------------------------------
+
+    @staticmethod
+    def _link(index: dict[str, set[str]], code: Optional[str], node_id: str) -> None:
+        key = normalize_lineage_code(code)
+        if key:
+            index.setdefault(key, set()).add(node_id)
+
+    @staticmethod
+    def _unlink(index: dict[str, set[str]], code: Optional[str], node_id: str) -> None:
+        key = normalize_lineage_code(code)
+        ids = index.get(key) if key else None
+        if ids is not None:
+            ids.discard(node_id)
+            if not ids:
+                index.pop(key, None)
+
+    def _add(self, node: LineageNode) -> None:
+        self._by_id[node.id] = node
+        key = normalize_lineage_code(node.code)
+        if key:
+            self._by_code[key] = node
+        self._link(self._children_by_sire, node.sire_code, node.id)
+        self._link(self._children_by_dam, node.dam_code, node.id)
+        if (node.sex or "").lower() == "female":
+            self._link(self._females_by_mate, node.mate_code, node.id)
+
+    def _discard(self, node_id: str) -> None:
+        node = self._by_id.pop(node_id, None)
+        if node is None:
+            return
+        key = normalize_lineage_code(node.code)
+        if key and self._by_code.get(key) is node:
+            self._by_code.pop(key, None)
+        self._unlink(self._children_by_sire, node.sire_code, node.id)
+        self._unlink(self._children_by_dam, node.dam_code, node.id)
+        self._unlink(self._females_by_mate, node.mate_code, node.id)
+
+    def upsert(self, product: Product) -> None:
+        """Apply a committed product create/update (drops it if no longer a breeder)."""
+
+        with self._lock:
+            self._discard(product.id)
+            if _is_lineage_breeder(product):
+                self._add(LineageNode.from_product(product))
+            self.version += 1
+
+    def remove(self, product_id: str) -> None:
+        with self._lock:
+            self._discard(product_id)
+            self.version += 1
+
+    # -- lookups --------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, code: Optional[str]) -> Optional[LineageNode]:
+        key = normalize_lineage_code(code)
+        return self._by_code.get(key) if key else None
+
+    def get_by_id(self, node_id: Optional[str]) -> Optional[LineageNode]:
+        return self._by_id.get(node_id) if node_id else None
+
+    def members(self, series_id: Optional[str] = None) -> list[LineageNode]:
+        """All breeders, or those of one series, ordered by code."""
+
+        return self._nodes(
+            n.id for n in list(self._by_id.values()) if series_id is None or n.series_id == series_id
+        )
+
+    def _nodes(self, ids: Iterable[str]) -> list[LineageNode]:
+        nodes = [self._by_id[i] for i in ids if i in self._by_id]
+        nodes.sort(key=lambda n: n.code or "")
+        return nodes
+
+    def offspring(self, code: Optional[str], sex: Optional[str]) -> list[LineageNode]:
+        """Direct offspring of a breeder (via sire_code for males, dam_code for females)."""
+
+        key = normalize_lineage_code(code)
+        if not key:
+            return []
+        sex = (sex or "").lower()
+        if sex == "male":
+            return self._nodes(self._children_by_sire.get(key, ()))
+        if sex == "female":
+            return self._nodes(self._children_by_dam.get(key, ()))
+        return []
+
+    def children_by_dam(self, dam_code: Optional[str]) -> list[LineageNode]:
+        key = normalize_lineage_code(dam_code)
+        return self._nodes(self._children_by_dam.get(key, ())) if key else []
+
+    def siblings(self, node: LineageNode) -> list[LineageNode]:
+        """Full siblings: same dam, and same sire when the sire is known."""
+
+        sire_key = normalize_lineage_code(node.sire_code)
+        return [
+            s
+            for s in self.children_by_dam(node.dam_code)
+            if s.id != node.id and (not sire_key or normalize_lineage_code(s.sire_code) == sire_key)
+        ]
+
+    def ancestors(self, node: LineageNode, depth: int) -> list[tuple[tuple[str, ...], LineageNode]]:
+        """Ancestors up to `depth` generations as (path, node) in breadth-first order.
+
+        A generation is only expanded from ancestors that exist as breeders.
+        """
+
+        result: list[tuple[tuple[str, ...], LineageNode]] = []
+        frontier: list[tuple[tuple[str, ...], LineageNode]] = [((), node)]
+        for _ in range(max(0, depth)):
+            next_frontier = []
+            for path, n in frontier:
+                sire = self.get(n.sire_code)
+                if sire is not None:
+                    next_frontier.append((path + (PATERNAL,), sire))
+                dam = self.get(n.dam_code)
+                if dam is not None:
+                    next_frontier.append((path + (MATERNAL,), dam))
+            if not next_frontier:
+                break
+            result.extend(next_frontier)
+            frontier = next_frontier
+        return result
+
+    def females_with_mate(self, mate_codes: Iterable[Optional[str]]) -> list[LineageNode]:
+        """Female breeders whose products.mate_code matches any of the given codes."""
+
+        ids: set[str] = set()
+        for code in mate_codes:
+            key = normalize_lineage_code(code)
+            if key:
+                ids.update(self._females_by_mate.get(key, ()))
+        return self._nodes(ids)
+
+
+_graphs: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_graphs_lock = threading.Lock()
+
+
+def _graph_key(db: Session):
+    # Reads come through the read-only engine and patches through the writer:
+    # both must find the same graph.
+    return primary_engine(db.get_bind())
+
+
+def get_lineage_graph(db: Session) -> LineageGraph:
+    """Return the lineage graph for this session's engine, building it if needed."""
+
+    key = _graph_key(db)
+    graph = _graphs.get(key)
+    if graph is not None and time.monotonic() - graph.built_at < LINEAGE_GRAPH_TTL_SECONDS:
+        return graph
+
+    with _graphs_lock:
+        graph = _graphs.get(key)
+        if graph is None or time.monotonic() - graph.built_at >= LINEAGE_GRAPH_TTL_SECONDS:
+            graph = LineageGraph.build(db)
+            _graphs[key] = graph
+        return graph
+
+
+def patch_lineage_graph(db: Session, product: Product) -> None:
+    """Reflect a committed product create/update in an already-built graph."""
+
+    graph = _graphs.get(_graph_key(db))
+    if graph is not None:
+        graph.upsert(product)
+
+
+def remove_from_lineage_graph(db: Session, product_id: str) -> None:
+    graph = _graphs.get(_graph_key(db))
+    if graph is not None:
+        graph.remove(product_id)
+
+
+def invalidate_lineage_graph(db: Optional[Session] = None) -> None:
+    """Drop cached graph(s); the next lookup rebuilds from the DB."""
+
+    with _graphs_lock:
+        if db is None:
+            _graphs.clear()
+        else:
+            _graphs.pop(_graph_key(db), None)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select, union
+from sqlalchemy.orm import Session
+
+from app.models.models import Product
+from app.services.lineage_graph import PATERNAL
+
+
+DEFAULT_PEDIGREE_DEPTH = 3
+MAX_PEDIGREE_DEPTH = 6
+
+DEFAULT_DESCENDANT_DEPTH = 3
+MAX_DESCENDANT_DEPTH = 10
+
+AncestorPath = tuple[str, ...]
+
+
+def fetch_breeders_by_ids(db: Session, ids: Iterable[Optional[str]]) -> dict[str, Product]:
+    """Fetch turtle-album breeders for many ids in one query.
+
+    Tree nodes only need products.main_image_url, so galleries are not loaded.
+    """
+
+    wanted = {i for i in ids if i}
+    if not wanted:
+        return {}
+
+    rows = (
+        db.query(Product)
+        .filter(Product.id.in_(wanted))
+        .filter(Product.series_id.isnot(None))
+        .filter(Product.sex.isnot(None))
+        .all()
+    )
+    return {p.id: p for p in rows}
+
+
+def ancestor_key(path: AncestorPath) -> str:
+    """Response key for an ancestor slot.
+
+    father / mother, paternalGrandmother, maternalPaternalGreatGrandfather, and
+    for deeper generations one more "Great" per level.
+    """
+
+    parent = "father" if path[-1] == PATERNAL else "mother"
+    if len(path) == 1:
+        return parent
+
+    sides = ["Paternal" if step == PATERNAL else "Maternal" for step in path[:-1]]
+    sides[0] = sides[0].lower()
+    return "".join(sides) + "Great" * (len(path) - 2) + "Grand" + parent
+
+
+def ancestor_relationship(path: AncestorPath) -> str:
+    """Node `relationship` value for an ancestor slot (matches the legacy strings)."""
+
+    parent = "father" if path[-1] == PATERNAL else "mother"
+    if len(path) == 1:
+        return parent
+    if len(path) == 2:
+        side = "paternal" if path[0] == PATERNAL else "maternal"
+        return f"{side}_grand{parent}"
+    return "great_" * (len(path) - 2) + f"grand{parent}"
+
+
+def _parent_codes(breeders: Iterable[Product]) -> tuple[set[str], set[str]]:
+    """Codes to match against sire_code (males) and dam_code (females)."""
+
+    sire_codes: set[str] = set()
+    dam_codes: set[str] = set()
+    for b in breeders:
+        sex = (b.sex or "").lower()
+        if sex == "male" and b.code:
+            sire_codes.add(b.code)
+        elif sex == "female" and b.code:
+            dam_codes.add(b.code)
+    return sire_codes, dam_codes
+
+
+def fetch_offspring(db: Session, parents: Iterable[Product]) -> list[Product]:
+    """Direct offspring of many breeders in one query (uses the sire/dam indexes)."""
+
+    sire_codes, dam_codes = _parent_codes(parents)
+    # One breeder-filtered select per side: SQLite can't use the partial sire/dam
+    # indexes for the terms of an OR.
+    sides = [
+        select(Product.id)
+        .where(column.in_(codes))
+        .where(Product.series_id.isnot(None))
+        .where(Product.sex.isnot(None))
+        for column, codes in ((Product.sire_code, sire_codes), (Product.dam_code, dam_codes))
+        if codes
+    ]
+    if not sides:
+        return []
+
+    ids = union(*sides) if len(sides) > 1 else sides[0]
+    return db.query(Product).filter(Product.id.in_(ids)).order_by(Product.code).all()
+
+
+def count_offspring(db: Session, parents: Iterable[Product]) -> dict[str, int]:
+    """Direct offspring count per parent code (one grouped query per side)."""
+
+    sire_codes, dam_codes = _parent_codes(parents)
+    counts: dict[str, int] = {}
+    for column, codes in ((Product.sire_code, sire_codes), (Product.dam_code, dam_codes)):
+        if not codes:
+            continue
+        rows = (
+            db.query(column, func.count(Product.id))
+            .filter(column.in_(codes))
+            .filter(Product.series_id.isnot(None))
+            .filter(Product.sex.isnot(None))
+            .group_by(column)
+            .all()
+        )
+        counts.update({code: n for code, n in rows})
+    return counts
+
+
+def fetch_descendant_generations(db: Session, root: Product, depth: int) -> list[list[Product]]:
+    """Descendants of `root` as breadth-first generations (one query per generation).
+
+    Each breeder is listed once, in the first generation it appears (a child of
+    two related parents is not duplicated); cycles in bad data stop at the
+    first repeat.
+    """
+
+    seen = {root.id}
+    generations: list[list[Product]] = []
+    frontier = [root]
+    for _ in range(max(0, depth)):
+        children = [c for c in fetch_offspring(db, frontier) if c.id not in seen]
+        if not children:
+            break
+        seen.update(c.id for c in children)
+        generations.append(children)
+        frontier = children
+    return generations
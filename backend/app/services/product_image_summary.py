@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.models.models import Product, ProductImage
+
+
+def pick_image_urls(images: Sequence[ProductImage]) -> tuple[Optional[str], Optional[str]]:
+    """(main_image_url, thumbnail_url) for a product's images.
+
+    thumbnail = first image by sort_order; main = the image typed "main",
+    falling back to the thumbnail.
+    """
+
+    ordered = sorted((img for img in images if img.url), key=lambda img: img.sort_order or 0)
+    if not ordered:
+        return None, None
+
+    thumbnail = ordered[0].url
+    main = next((img.url for img in ordered if img.type == "main"), thumbnail)
+    return main, thumbnail
+
+
+def refresh_product_image_urls(db: Session, product_id: str) -> Optional[Product]:
+    """Recompute products.main_image_url / thumbnail_url from product_images.
+
+    Called by the admin image endpoints (upload, delete, set-main, reorder) and
+    batch import inside their transaction; the caller flushes its pending writes
+    first and commits afterwards.
+    """
+
+    product = db.query(Product).filter(Product.id == product_id).first()
+    if not product:
+        return None
+
+    images = db.query(ProductImage).filter(ProductImage.product_id == product_id).all()
+    product.main_image_url, product.thumbnail_url = pick_image_urls(images)
+    db.flush()
+    return product
+
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.models.models import Series, Product, ProductImage
+from app.services.breeder_status import rebuild_all_breeder_status
+from app.services.product_image_summary import refresh_product_image_urls
 
 # Image URLs for different generations
 FEMALE_IMAGES = [
@@ -163,6 +165,10 @@ def main():
         child3 = create_breeder(db, series.id, "CBF-C02", "CB 子代 C02", "female",
                                sire_code="CBM-002", dam_code=current.code, image_url=FEMALE_IMAGES[0])
 
+        db.flush()
+        rebuild_all_breeder_status(db)
+        for (product_id,) in db.query(ProductImage.product_id).distinct().all():
+            refresh_product_image_urls(db, product_id)
         db.commit()
         print("Successfully added family tree data!")
         print(f"- 8 great-grandparents")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""TurtleAlbum 图片清单回填：把 image_files 清单出现之前生成的文件登记入表。
+
+对每个尚未登记的 product_images.url（images/<folder>/<stem>.jpg），按旧约定
+探测一次原图与各尺寸目录（JPEG/WebP），记录路径、尺寸与字节数。之后删除与
+用量统计都直接查询清单，不再探测文件系统。
+
+用法：
+- Dry-run:  python scripts/backfill_image_manifest.py --dry-run
+- Apply:    python scripts/backfill_image_manifest.py --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+from PIL import Image
+
+from app.core import file_utils
+from app.db.session import DATABASE_URL, SessionLocal
+from app.models.models import ImageFile, ProductImage
+from app.services.image_store import image_output_dir, record_image_files
+
+
+def _probe(url: str) -> List[Dict]:
+    output_dir = image_output_dir(url)
+    if output_dir is None:
+        return []
+    stem = Path(url).stem
+
+    candidates = [("original", os.path.join(output_dir, f"{stem}.{ext}")) for ext in ("jpg", "webp")]
+    for size_name in file_utils.PRODUCT_IMAGE_SIZES:
+        candidates += [(size_name, os.path.join(output_dir, size_name, f"{stem}.{ext}")) for ext in ("jpg", "webp")]
+
+    files = []
+    for variant, path in candidates:
+        if not os.path.isfile(path):
+            continue
+        try:
+            with Image.open(path) as img:
+                width, height = img.size
+        except Exception:
+            width = height = None
+        files.append(
+            {
+                "path": path,
+                "variant": variant,
+                "format": path.rsplit(".", 1)[-1],
+                "width": width,
+                "height": height,
+                "bytes": os.path.getsize(path),
+            }
+        )
+    return files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record existing product image files in the image_files manifest")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--dry-run", action="store_true", help="Only print what would be recorded")
+    mode.add_argument("--apply", action="store_true", help="Write image_files rows")
+    args = parser.parse_args()
+
+    print(f"DATABASE_URL={DATABASE_URL}")
+    print(f"UPLOAD_DIR={file_utils.IMAGES_DIR}")
+
+    db = SessionLocal()
+    try:
+        recorded = {url for (url,) in db.query(ImageFile.image_url).distinct().all()}
+        urls = sorted(
+            url
+            for (url,) in db.query(ProductImage.url).distinct().all()
+            if url and url not in recorded
+        )
+
+        total_files = total_bytes = missing = 0
+        for url in urls:
+            files = _probe(url)
+            if not files:
+                missing += 1
+                continue
+            total_files += len(files)
+            total_bytes += sum(f["bytes"] for f in files)
+            if args.apply:
+                record_image_files(db, url, files)
+
+        print("---")
+        print(f"unrecorded image urls: {len(urls)}")
+        print(f"urls without files on disk: {missing}")
+        print(f"files: {total_files} ({total_bytes} bytes)")
+
+        if args.apply:
+            db.commit()
+            print("OK (apply).")
+        else:
+            print("OK (dry-run).")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
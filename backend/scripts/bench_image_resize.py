@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""TurtleAlbum 图片缩放基准：直接 LANCZOS 与 draft()/reduce() 快速路径对比。
+
+对每张样图比较两种实现生成各尺寸的耗时，以及快速路径输出与基准输出之间的
+PSNR（dB，越高越接近；> 40 基本不可分辨）：
+
+- baseline: 全分辨率解码，每个尺寸都从原图直接 LANCZOS（旧实现）
+- fast:     file_utils 当前实现（按尺寸从大到小级联 + reduce()；按需渲染时 JPEG draft() 解码）
+
+用法：
+- python scripts/bench_image_resize.py                      # 默认样图（frontend/public/turtle-hero.jpg，放大到手机照片尺寸）
+- python scripts/bench_image_resize.py photo1.jpg photo2.jpg --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+import numpy as np
+from PIL import Image
+
+from app.core import file_utils
+
+DEFAULT_SAMPLE = BACKEND_DIR.parent / "frontend" / "public" / "turtle-hero.jpg"
+# 12 MP，典型手机照片
+PHONE_SIZE = (4032, 3024)
+
+
+def _psnr(a: Image.Image, b: Image.Image) -> float:
+    x = np.asarray(a.convert("RGB"), dtype=np.float64)
+    y = np.asarray(b.convert("RGB"), dtype=np.float64)
+    mse = float(np.mean((x - y) ** 2))
+    return float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def _timed(func: Callable[[], Dict[str, Image.Image]], repeat: int) -> Tuple[float, Dict[str, Image.Image]]:
+    best, out = float("inf"), {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = func()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def _baseline_derivatives(data: bytes) -> Dict[str, Image.Image]:
+    with Image.open(io.BytesIO(data)) as opened:
+        base = file_utils._prepare_image(opened, crop_square=True)
+        base.load()
+    return {name: base.resize(dims, Image.Resampling.LANCZOS) for name, dims in file_utils.PRODUCT_IMAGE_SIZES.items()}
+
+
+def _fast_derivatives(data: bytes) -> Dict[str, Image.Image]:
+    with Image.open(io.BytesIO(data)) as opened:
+        base = file_utils._prepare_image(opened, crop_square=True)
+        base.load()
+    out, previous = {}, base
+    for name, dims in sorted(file_utils.PRODUCT_IMAGE_SIZES.items(), key=lambda item: item[1][0], reverse=True):
+        previous = out[name] = file_utils._scale(previous, dims, crop_square=True)
+    return out
+
+
+def _baseline_variant(data: bytes, width: int) -> Dict[str, Image.Image]:
+    with Image.open(io.BytesIO(data)) as opened:
+        img = file_utils._prepare_image(opened)
+        return {f"w{width}": img.resize((width, round(img.height * width / img.width)), Image.Resampling.LANCZOS)}
+
+
+def _fast_variant(data: bytes, width: int) -> Dict[str, Image.Image]:
+    with Image.open(io.BytesIO(data)) as opened:
+        file_utils._draft(opened, width)
+        img = file_utils._prepare_image(opened)
+        return {f"w{width}": file_utils._downscale(img, (width, round(img.height * width / img.width)))}
+
+
+def _load_samples(paths: List[str]) -> List[Tuple[str, bytes]]:
+    samples = []
+    for path in paths:
+        with open(path, "rb") as fh:
+            samples.append((os.path.basename(path), fh.read()))
+    if samples:
+        return samples
+
+    # 默认样图放大到手机照片尺寸再编码，模拟上传的原图
+    with Image.open(DEFAULT_SAMPLE) as img:
+        big = img.convert("RGB").resize(PHONE_SIZE, Image.Resampling.BICUBIC)
+    buf = io.BytesIO()
+    big.save(buf, format="JPEG", quality=92)
+    return [(f"{DEFAULT_SAMPLE.name}@{PHONE_SIZE[0]}x{PHONE_SIZE[1]}", buf.getvalue())]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark image downscaling: LANCZOS baseline vs draft/reduce fast path")
+    parser.add_argument("images", nargs="*", help="Sample photos (default: turtle-hero.jpg upscaled to 12 MP)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (best time is reported)")
+    parser.add_argument("--widths", default="300,800", help="On-demand variant widths to benchmark")
+    args = parser.parse_args()
+
+    widths = [int(w) for w in args.widths.split(",") if w.strip()]
+    print(f"{'sample':<36} {'case':<14} {'baseline ms':>12} {'fast ms':>9} {'speedup':>8}  min PSNR dB")
+    for name, data in _load_samples(args.images):
+        cases = [("derivatives", lambda: _baseline_derivatives(data), lambda: _fast_derivatives(data))]
+        for width in widths:
+            cases.append((f"variant w{width}", lambda w=width: _baseline_variant(data, w), lambda w=width: _fast_variant(data, w)))
+
+        for case, baseline, fast in cases:
+            t_base, ref = _timed(baseline, args.repeat)
+            t_fast, out = _timed(fast, args.repeat)
+            psnr = min(_psnr(ref[key], out[key]) for key in ref)
+            print(f"{name:<36} {case:<14} {t_base * 1000:>12.1f} {t_fast * 1000:>9.1f} {t_base / t_fast:>7.1f}x  {psnr:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""TurtleAlbum SQLite 并发基准：导入写入进行时的公共读吞吐。
+
+对每个 SQLITE_PRAGMA_PROFILES 配置新建一个临时库（products 表 + 种子数据），
+若干读线程持续执行产品列表查询，同时一个写线程模拟批量导入：每个事务插入
+一批产品并在事务内停留一段时间（模拟解析/图片处理）。报告读 QPS、p95 延迟、
+读失败次数（database is locked）以及写入批次数。
+
+用法：
+- python scripts/bench_sqlite_concurrency.py
+- python scripts/bench_sqlite_concurrency.py --readers 8 --seconds 10 --batch 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.sqlite_pragmas import SQLITE_PRAGMA_PROFILES, install_sqlite_pragmas, sqlite_pragmas
+from app.models.models import Base, Product
+
+
+def _make_engine(db_file: Path, profile: str):
+    engine = create_engine(f"sqlite:///{db_file.as_posix()}", connect_args={"check_same_thread": False})
+    install_sqlite_pragmas(engine, sqlite_pragmas(profile, overrides=""))
+    return engine
+
+
+def _seed(engine, count: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        db.add_all(
+            Product(code=f"SEED-{i:06d}", price=float(i % 500), series_id=f"s-{i % 12}", sex=("male", "female")[i % 2])
+            for i in range(count)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _run(profile: str, args) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = _make_engine(Path(tmp) / "bench.db", profile)
+        _seed(engine, args.seed)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        stop = threading.Event()
+        latencies: List[float] = []
+        read_errors = [0]
+        write_batches = [0]
+        lock = threading.Lock()
+
+        def reader() -> None:
+            local, errors = [], 0
+            while not stop.is_set():
+                db = Session()
+                start = time.perf_counter()
+                try:
+                    db.execute(
+                        text(
+                            "SELECT id, code, price, sex FROM products "
+                            "WHERE series_id = :series ORDER BY code LIMIT 50 OFFSET :offset"
+                        ),
+                        {"series": f"s-{random.randrange(12)}", "offset": random.randrange(0, 200)},
+                    ).fetchall()
+                    local.append(time.perf_counter() - start)
+                except OperationalError:
+                    errors += 1
+                finally:
+                    db.close()
+            with lock:
+                latencies.extend(local)
+                read_errors[0] += errors
+
+        def writer() -> None:
+            n = 0
+            while not stop.is_set():
+                db = Session()
+                try:
+                    db.add_all(
+                        Product(code=f"IMP-{n:04d}-{i:05d}", price=1.0, series_id=f"s-{i % 12}", sex="female")
+                        for i in range(args.batch)
+                    )
+                    db.flush()
+                    # Time spent inside the import transaction (row parsing, image work).
+                    time.sleep(args.hold_ms / 1000)
+                    db.commit()
+                    write_batches[0] += 1
+                except OperationalError:
+                    db.rollback()
+                finally:
+                    db.close()
+                n += 1
+
+        threads = [threading.Thread(target=reader) for _ in range(args.readers)] + [threading.Thread(target=writer)]
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else float("nan")
+    return {
+        "qps": len(latencies) / args.seconds,
+        "p95_ms": p95 * 1000,
+        "read_errors": read_errors[0],
+        "write_batches": write_batches[0],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark public read throughput while an import writes")
+    parser.add_argument("--profiles", default=",".join(SQLITE_PRAGMA_PROFILES), help="Comma-separated pragma profiles")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=20000, help="Products inserted before the run")
+    parser.add_argument("--batch", type=int, default=2000, help="Products per import transaction")
+    parser.add_argument("--hold-ms", type=int, default=50, help="Time each import transaction stays open")
+    args = parser.parse_args()
+
+    print(f"{'profile':<10} {'read qps':>10} {'p95 ms':>8} {'read errors':>12} {'write batches':>14}")
+    for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        r = _run(profile, args)
+        print(f"{profile:<10} {r['qps']:>10.0f} {r['p95_ms']:>8.1f} {r['read_errors']:>12} {r['write_batches']:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""TurtleAlbum 图片垃圾回收：找出（并可删除）没有任何 product_images 引用的文件。
+
+按顶层目录排序逐个扫描 <UPLOAD_DIR>/<folder>/（os.scandir），分批对照 DB 引用；
+文件系统操作按 --rate 限速，可在线上 PVC 上运行。最近 --min-age 秒内写入的文件
+跳过（上传/导入在提交前先生成文件）。
+
+用法：
+- Dry-run:  python scripts/gc_orphan_images.py --dry-run
+- Apply:    python scripts/gc_orphan_images.py --apply [--rate 100]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+from app.core import file_utils
+from app.db.session import DATABASE_URL, SessionLocal
+from app.services import image_gc
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find and reclaim image files no product references")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--dry-run", action="store_true", help="Only report orphaned files")
+    mode.add_argument("--apply", action="store_true", help="Delete orphaned files")
+    parser.add_argument("--rate", type=float, default=image_gc.IMAGE_GC_RATE, help="Filesystem operations per second (0 = unthrottled)")
+    parser.add_argument("--min-age", type=int, default=image_gc.IMAGE_GC_MIN_AGE, help="Skip files modified within this many seconds")
+    parser.add_argument("--folders-per-batch", type=int, default=200, help="Folders scanned per DB session/commit")
+    args = parser.parse_args()
+
+    print(f"DATABASE_URL={DATABASE_URL}")
+    print(f"UPLOAD_DIR={file_utils.IMAGES_DIR}")
+
+    totals = {"scannedFiles": 0, "orphanFiles": 0, "orphanBytes": 0, "reclaimedBytes": 0, "skippedRecent": 0}
+    cursor = None
+    while True:
+        db = SessionLocal()
+        try:
+            report = image_gc.collect_orphans(
+                db,
+                apply=args.apply,
+                cursor=cursor,
+                max_folders=args.folders_per_batch,
+                min_age=args.min_age,
+                rate=args.rate,
+            )
+            db.commit()
+        finally:
+            db.close()
+
+        for folder in report["folders"]:
+            print(f"{folder['folder']}: {folder['files']} files, {folder['bytes']} bytes")
+        for key in totals:
+            totals[key] += report[key]
+        cursor = report["nextCursor"]
+        if cursor is None:
+            break
+
+    print("---")
+    for key, value in totals.items():
+        print(f"{key}: {value}")
+    print("OK (apply)." if args.apply else "OK (dry-run).")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.models.models import Series, Product, ProductImage
+from app.services.breeder_status import refresh_breeder_status
+from app.services.product_image_summary import refresh_product_image_urls
 
 
 def _make_engine(db_url: str):
@@ -86,6 +88,9 @@ def _upsert_breeder(
             sort_order=0,
         )
     )
+    db.flush()
+    refresh_breeder_status(db, p.id)
+    refresh_product_image_urls(db, p.id)
 
 
 def main():
@@ -34,8 +34,11 @@ if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
 
+from sqlalchemy import inspect
+
 from app.db.session import DATABASE_URL, SessionLocal
 from app.models.models import ProductImage
+from app.services.product_image_summary import refresh_product_image_urls
 
 
 @dataclass(frozen=True)
@@ -256,6 +259,7 @@ def _apply(planned_rows: List[ImageRow], folder_moves: Dict[str, str], images_ro
         img_by_id: Dict[str, ProductImage] = {str(img.id): img for img in db.query(ProductImage).all()}
 
         updated_rows = 0
+        touched_products: Set[str] = set()
         for row in planned_rows:
             if row.skip_db:
                 continue
@@ -272,7 +276,9 @@ def _apply(planned_rows: List[ImageRow], folder_moves: Dict[str, str], images_ro
 
             img.url = row.new_url
             updated_rows += 1
+            touched_products.add(str(img.product_id))
 
+        _refresh_image_summary(db, touched_products)
         db.commit()
     finally:
         db.close()
@@ -280,6 +286,18 @@ def _apply(planned_rows: List[ImageRow], folder_moves: Dict[str, str], images_ro
     return moved_dirs, updated_rows
 
 
+def _refresh_image_summary(db, product_ids: Iterable[str]) -> None:
+    """Keep products.main_image_url / thumbnail_url in sync with rewritten urls."""
+
+    # Databases not yet upgraded to the image summary columns have nothing to refresh.
+    columns = {c["name"] for c in inspect(db.connection()).get_columns("products")}
+    if "main_image_url" not in columns:
+        return
+    db.flush()
+    for product_id in sorted(product_ids):
+        refresh_product_image_urls(db, product_id)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Migrate product images from code folder to product_id folder")
     mode = parser.add_mutually_exclusive_group(required=True)
@@ -10,6 +10,8 @@ from sqlalchemy.orm import sessionmaker
 # Importing models defines Base + tables.
 from app.models.models import Base, Series, Product, ProductImage, MatingRecord, EggRecord
 from app.core.security import get_password_hash
+from app.services.breeder_status import rebuild_all_breeder_status
+from app.services.product_image_summary import refresh_product_image_urls
 
 
 def _utc_now():
@@ -164,6 +166,10 @@ def seed_turtle_album(db_session):
         )
     )
 
+    db_session.flush()
+    rebuild_all_breeder_status(db_session)
+    for (product_id,) in db_session.query(ProductImage.product_id).distinct().all():
+        refresh_product_image_urls(db_session, product_id)
     db_session.commit()
 
 
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers import breeders
+from app.api.routers.breeders import get_breeder_descendants
+from app.db.session import get_read_db
+from app.models.models import Base, Product
+from app.services.pedigree import DEFAULT_DESCENDANT_DEPTH, MAX_DESCENDANT_DEPTH
+
+
+def _build_test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal()
+
+
+def _add(db, code: str, sex: str, sire_code=None, dam_code=None) -> Product:
+    p = Product(code=code, price=0.0, series_id="s-1", sex=sex, sire_code=sire_code, dam_code=dam_code)
+    db.add(p)
+    return p
+
+
+def _seed(db) -> Product:
+    # SIRE -> A, B (dam DAM); A -> A1, A2; B -> B1; A1 -> A1X (beyond depth 2).
+    sire = _add(db, "SIRE", "male")
+    _add(db, "DAM", "female")
+    _add(db, "A", "male", sire_code="SIRE", dam_code="DAM")
+    _add(db, "B", "female", sire_code="SIRE", dam_code="DAM")
+    _add(db, "A1", "female", sire_code="A")
+    _add(db, "A2", "male", sire_code="A")
+    _add(db, "B1", "female", dam_code="B")
+    _add(db, "A1X", "male", dam_code="A1")
+    # A child of two descendants is listed once.
+    _add(db, "AB", "male", sire_code="A2", dam_code="B1")
+    db.commit()
+    return sire
+
+
+def test_descendants_returns_subtree_with_offspring_counts() -> None:
+    db = _build_test_db()
+    sire = _seed(db)
+
+    data = asyncio.run(get_breeder_descendants(sire.id, db, depth=2)).data
+
+    assert data["current"]["code"] == "SIRE"
+    assert data["current"]["offspringCount"] == 2
+    assert [(d["code"], d["generation"]) for d in data["descendants"]] == [
+        ("A", 1),
+        ("B", 1),
+        ("A1", 2),
+        ("A2", 2),
+        ("B1", 2),
+    ]
+    counts = {d["code"]: d["offspringCount"] for d in data["descendants"]}
+    assert counts == {"A": 2, "B": 1, "A1": 1, "A2": 1, "B1": 1}
+    assert data["generationCounts"] == [2, 3]
+    assert data["totalDescendants"] == 5
+    assert data["truncated"] is True
+
+    deep = asyncio.run(get_breeder_descendants(sire.id, db, depth=5)).data
+    codes = [d["code"] for d in deep["descendants"]]
+    assert codes.count("AB") == 1
+    assert deep["generationCounts"] == [2, 3, 2]
+    assert deep["truncated"] is False
+
+
+def test_descendants_query_count_is_per_generation() -> None:
+    db = _build_test_db()
+    sire = _add(db, "SIRE", "male")
+    for i in range(60):
+        _add(db, f"K{i}", "female", sire_code="SIRE")
+        _add(db, f"K{i}-G", "male", dam_code=f"K{i}")
+    db.commit()
+    sire_id = sire.id
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        data = asyncio.run(get_breeder_descendants(sire_id, db, depth=3)).data
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert data["totalDescendants"] == 120
+    # root + one query per generation + one grouped count per side.
+    assert len(statements) <= 6
+
+
+def test_descendants_rejects_invalid_depth() -> None:
+    # TestClient runs the app in another thread: share one in-memory connection.
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autoflush=False, bind=engine)()
+    sire = _seed(db)
+    app = FastAPI()
+    app.include_router(breeders.router, prefix="/api/breeders")
+    app.dependency_overrides[get_read_db] = lambda: db
+    client = TestClient(app)
+
+    for depth in (0, MAX_DESCENDANT_DEPTH + 1):
+        resp = client.get(f"/api/breeders/{sire.id}/descendants", params={"depth": depth})
+        assert resp.status_code == 422
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_breeder_descendants("missing", db, depth=DEFAULT_DESCENDANT_DEPTH))
+    assert exc.value.status_code == 404
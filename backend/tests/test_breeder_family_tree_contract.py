@@ -2,8 +2,11 @@ import asyncio
 import os
 import sys
 
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # Allow running tests from backend/ without installing the package.
 HERE = os.path.abspath(os.path.dirname(__file__))
@@ -13,8 +16,11 @@ if BACKEND_ROOT not in sys.path:
 
 from typing import Optional
 
+from app.api.routers import breeders
 from app.api.routers.breeders import get_breeder_family_tree
+from app.db.session import get_read_db
 from app.models.models import Base, Product
+from app.services.pedigree import DEFAULT_PEDIGREE_DEPTH, MAX_PEDIGREE_DEPTH
 
 
 def _build_test_db():
@@ -55,7 +61,7 @@ def test_family_tree_omits_removed_name_fields() -> None:
     dam = _seed_breeder(db, code="DAM-1", sex="female")
     current = _seed_breeder(db, code="CHILD-1", sex="male", sire_code=sire.code, dam_code=dam.code)
 
-    resp = asyncio.run(get_breeder_family_tree(current.id, db))
+    resp = asyncio.run(get_breeder_family_tree(current.id, db, depth=DEFAULT_PEDIGREE_DEPTH))
     assert resp.data is not None
 
     # Nodes should prefer returning only `code` (and other metadata) and not access Product.name.
@@ -67,3 +73,78 @@ def test_family_tree_omits_removed_name_fields() -> None:
     for r in resp.data.get("matingRecords", []):
         assert "maleName" not in r
         assert "femaleName" not in r
+
+
+def _seed_pedigree(db, generations: int) -> Product:
+    """Seed a full binary pedigree and return the youngest breeder."""
+
+    def _seed(code: str, sex: str, level: int) -> Product:
+        if level == 0:
+            return _seed_breeder(db, code=code, sex=sex)
+        sire = _seed(f"{code}P", "male", level - 1)
+        dam = _seed(f"{code}M", "female", level - 1)
+        return _seed_breeder(db, code=code, sex=sex, sire_code=sire.code, dam_code=dam.code)
+
+    return _seed("X", "female", generations)
+
+
+def test_family_tree_keeps_legacy_ancestor_keys() -> None:
+    db = _build_test_db()
+    current = _seed_pedigree(db, 3)
+
+    resp = asyncio.run(get_breeder_family_tree(current.id, db, depth=DEFAULT_PEDIGREE_DEPTH))
+    ancestors = resp.data["ancestors"]
+
+    assert ancestors["father"]["code"] == "XP"
+    assert ancestors["paternalGrandmother"]["code"] == "XPM"
+    assert ancestors["paternalGrandmother"]["relationship"] == "paternal_grandmother"
+    assert ancestors["maternalPaternalGreatGrandfather"]["code"] == "XMPP"
+    assert ancestors["maternalPaternalGreatGrandfather"]["relationship"] == "great_grandfather"
+    assert ancestors["maternalPaternalGreatGrandfather"]["generation"] == -3
+    assert len(ancestors) == 14
+
+
+def test_family_tree_depth_parameter_and_batched_queries() -> None:
+    from sqlalchemy import event
+
+    db = _build_test_db()
+    current = _seed_pedigree(db, 4)
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        resp = asyncio.run(get_breeder_family_tree(current.id, db, depth=4))
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    ancestors = resp.data["ancestors"]
+    assert ancestors["paternalPaternalPaternalGreatGreatGrandfather"]["code"] == "XPPPP"
+    assert ancestors["paternalPaternalPaternalGreatGreatGrandfather"]["relationship"] == "great_great_grandfather"
+    assert len(ancestors) == 30
+
+    # One query per ancestor generation, not one per ancestor node.
+    assert len(statements) <= 12
+
+    shallow = asyncio.run(get_breeder_family_tree(current.id, db, depth=1))
+    assert set(shallow.data["ancestors"]) == {"father", "mother"}
+
+
+def test_family_tree_depth_is_range_checked_by_the_query_validator() -> None:
+    # TestClient runs the app in another thread: share one in-memory connection.
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autoflush=False, bind=engine)()
+    app = FastAPI()
+    app.include_router(breeders.router, prefix="/api/breeders")
+    app.dependency_overrides[get_read_db] = lambda: db
+    client = TestClient(app)
+
+    for depth in (0, MAX_PEDIGREE_DEPTH + 1):
+        resp = client.get("/api/breeders/missing/family-tree", params={"depth": depth})
+        assert resp.status_code == 422
+    assert client.get("/api/breeders/missing/family-tree").status_code == 404
@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers import breeders
+from app.db.session import get_async_read_db
+from app.models.models import Base, Product
+from app.services.code_sort_fields import parse_code_sort_fields
+
+
+CODES = ["HB-10", "HB-2", "HB-1", "HB-1-A", "HB-1-1", "HB-A", "HB", "XT-3"]
+EXPECTED_ORDER = ["HB-1-1", "HB-1-A", "HB-1", "HB-2", "HB-10", "HB-A", "HB", "XT-3"]
+
+
+def _build_client() -> TestClient:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    for code in CODES:
+        prefix, parent, child, letter = parse_code_sort_fields(code)
+        db.add(
+            Product(
+                code=code,
+                price=0.0,
+                series_id="s-1",
+                sex="female",
+                code_prefix=prefix,
+                code_parent_number=parent,
+                code_child_number=child,
+                code_child_letter=letter,
+            )
+        )
+    db.commit()
+    db.close()
+
+    def _get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(breeders.router, prefix="/api/breeders")
+    app.dependency_overrides[get_async_read_db] = _get_db
+    return TestClient(app)
+
+
+def test_list_breeders_keyset_pages_follow_natural_order() -> None:
+    client = _build_client()
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"series_id": "s-1", "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/breeders", params=params)
+        assert resp.status_code == 200
+        seen.extend(item["code"] for item in resp.json()["data"])
+        pages += 1
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == EXPECTED_ORDER
+    assert pages == 3
+
+
+def test_list_breeders_ndjson_stream_matches_json() -> None:
+    client = _build_client()
+
+    resp = client.get("/api/breeders", params={"series_id": "s-1", "limit": 5, "format": "ndjson"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in resp.text.splitlines() if line]
+    assert [item["code"] for item in lines] == EXPECTED_ORDER[:5]
+    assert lines[0]["needMatingStatus"] == "normal"
+
+    rest = client.get(
+        "/api/breeders",
+        params={"series_id": "s-1", "limit": 5, "format": "ndjson", "cursor": resp.headers["X-Next-Cursor"]},
+    )
+    rest_codes = [json.loads(line)["code"] for line in rest.text.splitlines() if line]
+    assert rest_codes == EXPECTED_ORDER[5:]
+    assert "X-Next-Cursor" not in rest.headers
+
+
+def test_list_breeders_rejects_invalid_cursor() -> None:
+    client = _build_client()
+
+    resp = client.get("/api/breeders", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
@@ -0,0 +1,210 @@
+"""EXPLAIN QUERY PLAN regression checks for the hot breeder queries.
+
+Each hot path runs against a database built by the Alembic migrations; every
+statement it issues is explained, and a full scan of a breeder or gallery table fails
+the test (index range searches, PK lookups and scans of derived tables are
+fine). Breeder list pages must also read their order off the index: a temp
+B-tree sort fails them.
+"""
+
+import asyncio
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from alembic import command
+from fastapi import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.breeders import (
+    NEXT_CURSOR_HEADER,
+    get_breeder_events,
+    get_breeder_records,
+    get_breeding_dashboard,
+    get_male_mate_load,
+    list_breeders,
+)
+from app.db.alembic_manager import build_alembic_config
+from app.models.models import BreederEvent, EggRecord, MatingRecord, Product, Series
+from app.services.breeder_status import refresh_breeder_status
+from app.services.code_sort_fields import parse_code_sort_fields
+from app.services.current_mate import resolve_current_mates
+from app.services.pedigree import count_offspring, fetch_offspring
+
+HOT_TABLES = ("products", "product_images", "breeder_events", "mating_records", "egg_records")
+# Matches aliased tables too ("SCAN product_images_1" for a joinedload).
+FULL_SCAN = re.compile(rf"^SCAN ({'|'.join(HOT_TABLES)})(_\d+)?\b")
+SORT = re.compile(r"^USE TEMP B-TREE FOR (RIGHT PART OF |LAST TERM OF )?ORDER BY")
+
+
+@pytest.fixture
+def db(tmp_path):
+    url = f"sqlite:///{(tmp_path / 'plans.db').as_posix()}"
+    command.upgrade(build_alembic_config(url), "head")
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    session = sessionmaker(bind=engine, autoflush=False)()
+    _seed(session)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _seed(db) -> None:
+    now = datetime.utcnow()
+    db.add(Series(id="s-1", code="SER-1", name="Baihua"))
+    males = [Product(code=f"M-{i}", price=0.0, series_id="s-1", sex="male") for i in range(3)]
+    db.add_all(males)
+    db.flush()
+    for i in range(20):
+        # Females carry parsed natural-sort fields; the males' stay NULL.
+        prefix, parent, child, letter = parse_code_sort_fields(f"F-{i}")
+        female = Product(
+            code=f"F-{i}",
+            price=0.0,
+            series_id="s-1",
+            sex="female",
+            sire_code=males[0].code,
+            dam_code="F-0",
+            mate_code=males[i % 3].code,
+            code_prefix=prefix,
+            code_parent_number=parent,
+            code_child_number=child,
+            code_child_letter=letter,
+        )
+        db.add(female)
+        db.flush()
+        db.add(BreederEvent(product_id=female.id, event_type="mating", event_date=now, male_code=males[i % 3].code))
+        db.add(MatingRecord(female_id=female.id, male_id=males[(i + 1) % 3].id, mated_at=now - timedelta(days=i)))
+        db.add(EggRecord(female_id=female.id, laid_at=now - timedelta(days=i + 1)))
+    # Catalogue products outside the turtle album (no series/sex).
+    db.add_all(Product(code=f"CAT-{i}", price=1.0) for i in range(20))
+    db.commit()
+
+
+class _Recorder:
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            self.statements.append((statement, parameters))
+
+
+def _plan_matches(db, recorder, pattern, statement_filter=None) -> list:
+    raw = db.get_bind().raw_connection()
+    try:
+        cursor = raw.cursor()
+        matches = []
+        for statement, parameters in recorder.statements:
+            if statement_filter and not statement_filter(statement):
+                continue
+            for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall():
+                if pattern.match(row[-1]):
+                    matches.append((row[-1], statement))
+        return matches
+    finally:
+        raw.close()
+
+
+def _assert_indexed(db, run) -> None:
+    with _Recorder(db.get_bind()) as recorder:
+        run()
+    assert recorder.statements
+    assert _plan_matches(db, recorder, FULL_SCAN) == []
+
+
+def _is_list_statement(statement: str) -> bool:
+    return "FROM products" in statement and "ORDER BY" in statement
+
+
+def _list_pages(db, series_id, sex) -> None:
+    """First page and the page after its cursor."""
+    response = Response()
+    asyncio.run(list_breeders(response=response, series_id=series_id, sex=sex, limit=5, db=db, format_="json"))
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    asyncio.run(
+        list_breeders(response=Response(), series_id=series_id, sex=sex, limit=5, db=db, format_="json", cursor=cursor)
+    )
+
+
+def test_breeder_list_pages_use_the_series_sex_index(db) -> None:
+    def run():
+        _list_pages(db, "s-1", "female")
+        # Males: NULL sort fields, so the cursor holds only the code.
+        response = Response()
+        asyncio.run(list_breeders(response=response, series_id="s-1", sex="male", limit=1, db=db, format_="json"))
+        cursor = response.headers[NEXT_CURSOR_HEADER]
+        asyncio.run(
+            list_breeders(response=Response(), series_id="s-1", sex="male", limit=1, db=db, format_="json", cursor=cursor)
+        )
+        _list_pages(db, "s-1", None)
+
+    with _Recorder(db.get_bind()) as recorder:
+        run()
+    assert recorder.statements
+    assert _plan_matches(db, recorder, FULL_SCAN) == []
+    # The list statements themselves return rows in index order (galleries are fetched separately).
+    assert _plan_matches(db, recorder, SORT, _is_list_statement) == []
+
+
+def test_lineage_lookups_use_partial_indexes(db) -> None:
+    parents = db.query(Product).filter(Product.code.in_(["M-0", "F-0"])).all()
+
+    def run():
+        assert len(fetch_offspring(db, parents)) == 20
+        assert count_offspring(db, parents) == {"M-0": 20, "F-0": 20}
+        # SQL form of LineageGraph.females_with_mate (mate-code fallback).
+        (
+            db.query(Product.id)
+            .filter(Product.mate_code.in_(["M-1", "M-1公"]))
+            .filter(Product.series_id.isnot(None))
+            .filter(Product.sex.isnot(None))
+            .all()
+        )
+
+    _assert_indexed(db, run)
+
+
+def test_mate_load_and_dashboard_avoid_table_scans(db) -> None:
+    male = db.query(Product).filter(Product.code == "M-1").one()
+
+    def run():
+        asyncio.run(get_male_mate_load(male.id, limit=80, include_fallback=False, include_retired=False, db=db))
+        asyncio.run(get_breeding_dashboard(series_id="s-1", include_retired=False, db=db))
+
+    _assert_indexed(db, run)
+
+
+def test_per_female_history_uses_composite_indexes(db) -> None:
+    females = db.query(Product).filter(Product.sex == "female").filter(Product.series_id == "s-1").all()
+    female = females[0]
+
+    def run():
+        refresh_breeder_status(db, female.id)
+        db.rollback()
+        # Latest legacy mating for females without a mate code.
+        for f in females:
+            f.mate_code = None
+            f.description = None
+        resolve_current_mates(db, females)
+        asyncio.run(get_breeder_events(female.id, event_type=None, limit=10, cursor=None, db=db))
+        asyncio.run(get_breeder_records(female.id, db=db))
+
+    _assert_indexed(db, run)
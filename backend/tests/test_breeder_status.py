@@ -0,0 +1,107 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.admin import create_product, delete_product
+from app.api.routers.admin_records import (
+    admin_create_egg_record,
+    admin_create_mating_record,
+    admin_delete_mating_record,
+)
+from app.api.routers.breeders import list_breeders
+from app.services.breeder_status import rebuild_all_breeder_status
+from app.models.models import Base, BreederStatus, Product, User
+from app.schemas.schemas import EggRecordCreate, MatingRecordCreate, ProductCreate
+
+
+def _build_test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal()
+
+
+def _fake_user() -> User:
+    return User(id="u-1", username="admin", hashed_password="x", role="admin", is_active=True)
+
+
+def _create_breeder(db, code: str, sex: str) -> str:
+    payload = ProductCreate.model_validate({"code": code, "series_id": "s-1", "sex": sex})
+    resp = asyncio.run(create_product(payload, _fake_user(), db))
+    return resp.data["id"]
+
+
+def _list_status(db) -> dict:
+    resp = asyncio.run(
+        list_breeders(response=Response(), series_id="s-1", sex="female", limit=200, db=db, format_="json")
+    )
+    return {item["code"]: item for item in resp.data}
+
+
+def test_breeder_status_follows_record_writes() -> None:
+    db = _build_test_db()
+    female_id = _create_breeder(db, "F-1", "female")
+    male_id = _create_breeder(db, "M-1", "male")
+
+    # A freshly created female gets an empty status row.
+    status = db.query(BreederStatus).filter(BreederStatus.product_id == female_id).first()
+    assert status is not None
+    assert status.last_egg_at is None
+    assert _list_status(db)["F-1"]["needMatingStatus"] == "normal"
+
+    laid_at = datetime.utcnow() - timedelta(days=3)
+    asyncio.run(
+        admin_create_egg_record(EggRecordCreate(female_id=female_id, laid_at=laid_at, count=4), db, _fake_user())
+    )
+    item = _list_status(db)["F-1"]
+    assert item["needMatingStatus"] == "need_mating"
+    assert item["lastEggAt"] == laid_at.isoformat()
+    assert item["daysSinceEgg"] == 3
+
+    mated_at = datetime.utcnow()
+    mating = asyncio.run(
+        admin_create_mating_record(
+            MatingRecordCreate(female_id=female_id, male_id=male_id, mated_at=mated_at),
+            db,
+            _fake_user(),
+        )
+    )
+    assert _list_status(db)["F-1"]["needMatingStatus"] == "normal"
+
+    db.expire_all()
+    status = db.query(BreederStatus).filter(BreederStatus.product_id == female_id).first()
+    assert status.last_mating_at == mated_at
+
+    asyncio.run(admin_delete_mating_record(mating.data["id"], db, _fake_user()))
+    assert _list_status(db)["F-1"]["needMatingStatus"] == "need_mating"
+
+
+def test_breeder_status_removed_with_product() -> None:
+    db = _build_test_db()
+    female_id = _create_breeder(db, "F-2", "female")
+
+    asyncio.run(delete_product(female_id, _fake_user(), db))
+
+    assert db.query(BreederStatus).filter(BreederStatus.product_id == female_id).first() is None
+
+
+def test_rebuild_all_breeder_status_matches_sex_case_insensitively() -> None:
+    db = _build_test_db()
+    female_id = _create_breeder(db, "F-3", "female")
+    db.query(Product).filter(Product.id == female_id).update({Product.sex: "Female"})
+    db.query(BreederStatus).delete()
+    db.commit()
+
+    assert rebuild_all_breeder_status(db) == 1
+    assert db.query(BreederStatus).filter(BreederStatus.product_id == female_id).first() is not None
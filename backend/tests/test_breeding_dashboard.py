@@ -0,0 +1,87 @@
+import asyncio
+import itertools
+import os
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.breeders import get_breeding_dashboard
+from app.models.models import Base, BreederStatus, Product
+from app.services.breeder_status import need_mating_status
+from app.services.breeding_dashboard import compute_need_mating_statuses
+
+
+def _build_test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal()
+
+
+def test_vectorized_status_matches_single_female_rule() -> None:
+    now = datetime(2026, 10, 17, 9, 30)
+    dates = [None] + [now - timedelta(days=d, hours=h) for d in (0, 1, 10, 24, 25, 40) for h in (0, 20)]
+    pairs = list(itertools.product(dates, dates))
+
+    statuses, days = compute_need_mating_statuses(now, [e for e, _ in pairs], [m for _, m in pairs])
+
+    for (egg, mating), status, d in zip(pairs, statuses, days):
+        assert status == need_mating_status(now, egg, mating), (egg, mating)
+        assert d == ((now.date() - egg.date()).days if egg else None)
+
+
+def _female(db, code: str, mate_code=None, last_egg_at=None, last_mating_at=None, **extra) -> Product:
+    p = Product(code=code, price=0.0, series_id="s-1", sex="female", mate_code=mate_code, **extra)
+    db.add(p)
+    db.flush()
+    if last_egg_at or last_mating_at:
+        db.add(BreederStatus(product_id=p.id, last_egg_at=last_egg_at, last_mating_at=last_mating_at))
+    return p
+
+
+def test_dashboard_groups_females_by_current_mate() -> None:
+    db = _build_test_db()
+    now = datetime.utcnow()
+    days = lambda n: now - timedelta(days=n)  # noqa: E731
+
+    db.add(Product(code="M1", price=0.0, series_id="s-1", sex="male"))
+    db.add(Product(code="M2", price=0.0, series_id="s-1", sex="male"))
+    _female(db, "A", mate_code="M1", last_egg_at=days(30))  # warning
+    _female(db, "B", mate_code="M1", last_egg_at=days(5))  # need_mating
+    _female(db, "C", mate_code="M1", last_egg_at=days(5), last_mating_at=days(2))  # normal
+    _female(db, "D", mate_code="M2", last_egg_at=days(3))  # need_mating
+    _female(db, "E", mate_code="GHOST", last_egg_at=days(40))  # unresolved code
+    _female(db, "F", last_egg_at=days(26))  # no mate
+    _female(db, "R", mate_code="M1", last_egg_at=days(60), exclude_from_breeding=True)
+    db.add(Product(code="OTHER-SERIES", price=0.0, series_id="s-2", sex="female", mate_code="M1"))
+    db.commit()
+
+    data = asyncio.run(get_breeding_dashboard("s-1", db=db)).data
+
+    assert data["totals"] == {"females": 6, "needMating": 2, "warning": 3}
+    assert [(g["mateCode"], g["mate"] and g["mate"]["code"]) for g in data["groups"]] == [
+        ("M1", "M1"),
+        ("GHOST", None),
+        ("M2", "M2"),
+        (None, None),
+    ]
+
+    m1 = data["groups"][0]
+    assert m1["totals"] == {"females": 3, "needMating": 1, "warning": 1}
+    assert [(it["femaleCode"], it["status"]) for it in m1["items"]] == [
+        ("A", "warning"),
+        ("B", "need_mating"),
+        ("C", "normal"),
+    ]
+    assert m1["items"][0]["daysSinceEgg"] == 30
+
+    with_retired = asyncio.run(get_breeding_dashboard("s-1", include_retired=True, db=db)).data
+    assert with_retired["groups"][0]["totals"]["females"] == 4
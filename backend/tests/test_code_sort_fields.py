@@ -3,6 +3,7 @@ import os
 import sys
 
 import pytest
+from fastapi import Response
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -84,7 +85,9 @@ def test_list_breeders_sorts_naturally_for_numbered_codes() -> None:
         payload = ProductCreate.model_validate({"code": code, "series_id": BAIHUA, "sex": sex})
         asyncio.run(create_product(payload, _fake_user(), db))
 
-    response = asyncio.run(list_breeders(series_id=BAIHUA, sex=None, limit=200, db=db))
+    response = asyncio.run(
+        list_breeders(response=Response(), series_id=BAIHUA, sex=None, limit=200, db=db, format_="json")
+    )
     codes = [item["code"] for item in response.data]
 
     assert codes[:3] == [f"{BAIHUA}-1", f"{BAIHUA}-2", f"{BAIHUA}-10"]
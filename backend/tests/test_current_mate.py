@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+from fastapi import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.breeders import list_breeders
+from app.models.models import Base, MatingRecord, Product
+from app.services.current_mate import resolve_current_mates
+from app.services.lineage_graph import get_lineage_graph
+
+
+def _build_test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal()
+
+
+def _add(db, code: str, sex: str, **extra) -> Product:
+    p = Product(code=code, price=0.0, series_id="s-1", sex=sex, **extra)
+    db.add(p)
+    db.flush()
+    return p
+
+
+def _seed(db) -> dict:
+    m1 = _add(db, "M1", "male")
+    m2 = _add(db, "M2公", "male")
+    m3 = _add(db, "M3", "male")
+    f = {
+        "explicit": _add(db, "F-EXPLICIT", "female", mate_code="M1"),
+        "note": _add(db, "F-NOTE", "female", description="2.22 更换配偶为M2公\n2.25 产4蛋"),
+        "record": _add(db, "F-RECORD", "female"),
+        "none": _add(db, "F-NONE", "female"),
+    }
+    db.add(MatingRecord(female_id=f["record"].id, male_id=m1.id, mated_at=datetime(2026, 1, 1)))
+    db.add(MatingRecord(female_id=f["record"].id, male_id=m3.id, mated_at=datetime(2026, 2, 1)))
+    db.commit()
+    return {"M1": m1.id, "M2": m2.id, "M3": m3.id, **{k: v.id for k, v in f.items()}}
+
+
+def test_resolve_current_mates_uses_constant_queries() -> None:
+    db = _build_test_db()
+    ids = _seed(db)
+    get_lineage_graph(db)
+
+    females = db.query(Product).filter(Product.sex == "female").all()
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        mates = resolve_current_mates(db, females)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert mates[ids["explicit"]].id == ids["M1"]
+    assert mates[ids["note"]].id == ids["M2"]
+    assert mates[ids["record"]].id == ids["M3"]
+    assert ids["none"] not in mates
+    assert len(statements) == 1
+
+
+def test_list_breeders_exposes_current_mate() -> None:
+    db = _build_test_db()
+    ids = _seed(db)
+
+    listed = asyncio.run(list_breeders(response=Response(), series_id="s-1", sex=None, limit=50, db=db, format_="json"))
+    items = {i["code"]: i for i in listed.data}
+
+    assert items["F-EXPLICIT"]["currentMate"] == {"id": ids["M1"], "code": "M1"}
+    assert items["F-NOTE"]["currentMateCode"] == "M2"
+    assert items["F-NOTE"]["currentMate"]["id"] == ids["M2"]
+    assert items["F-RECORD"]["currentMate"]["code"] == "M3"
+    assert items["F-NONE"]["currentMate"] is None
+    assert items["M1"]["currentMate"] is None
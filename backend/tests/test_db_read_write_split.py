@@ -0,0 +1,289 @@
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+
+import pytest
+from PIL import Image
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+
+from app.api.routers import admin, breeders, carousels, settings
+from app.api.routers.admin_series import admin_list_series
+from app.core import file_utils
+from app.db.session import (
+    DB_WRITE_POOL_SIZE,
+    _async_url,
+    _normalize_postgres_url,
+    create_async_read_engine,
+    create_read_engine,
+    create_write_engine,
+    get_async_read_db,
+    primary_engine,
+    run_in_session,
+)
+from app.models.models import Base, Carousel, Product, ProductImage, User
+from app.services import image_jobs
+from app.services.lineage_graph import get_lineage_graph, patch_lineage_graph
+
+
+@pytest.fixture
+def engines(tmp_path):
+    db_url = f"sqlite:///{(tmp_path / 'app.db').as_posix()}"
+    write_engine = create_write_engine(db_url, pool_size=1, pool_timeout=0.1)
+    Base.metadata.create_all(bind=write_engine)
+    read_engine = create_read_engine(write_engine, db_url)
+    yield write_engine, read_engine
+    read_engine.dispose()
+    write_engine.dispose()
+
+
+def test_reads_see_committed_writes_and_cannot_write(engines) -> None:
+    write_engine, read_engine = engines
+    WriteSession = sessionmaker(bind=write_engine, autoflush=False)
+    ReadSession = sessionmaker(bind=read_engine, autoflush=False)
+
+    with WriteSession() as db:
+        db.add(Product(code="RW-1", price=0.0, series_id="s-1", sex="female"))
+        db.commit()
+
+    with ReadSession() as db:
+        assert [p.code for p in db.query(Product).all()] == ["RW-1"]
+        assert db.execute(text("PRAGMA query_only")).scalar() == 1
+        with pytest.raises(OperationalError, match="readonly"):
+            db.execute(text("DELETE FROM products"))
+
+
+def test_writer_is_a_single_serialized_connection(engines) -> None:
+    write_engine, _ = engines
+    with write_engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            write_engine.connect()
+    # Released connections are reused.
+    with write_engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_concurrent_admin_requests_do_not_wait_on_the_writer_pool(engines, tmp_path, monkeypatch) -> None:
+    assert DB_WRITE_POOL_SIZE > 1
+    monkeypatch.setattr(file_utils, "IMAGES_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(image_jobs, "IMAGE_JOB_STAGING_DIR", str(tmp_path / "staging"))
+    # Even with a single writer connection (timeout 0.1s), a request parked on
+    # upload I/O must not keep it from the next admin request.
+    write_engine, _ = engines
+    WriteSession = sessionmaker(bind=write_engine, autoflush=False)
+    with WriteSession() as db:
+        product = Product(code="UP-1", price=0.0, series_id="s-1", sex="female")
+        db.add(product)
+        db.commit()
+        product_id = product.id
+
+    user = User(id="u-1", username="admin", hashed_password="x", role="admin", is_active=True)
+    real_stage_upload = admin.stage_upload
+
+    async def _main():
+        staging = asyncio.Event()
+        resume = asyncio.Event()
+
+        async def _parked_stage_upload(upload, budget):
+            staging.set()
+            await resume.wait()
+            return await real_stage_upload(upload, budget)
+
+        monkeypatch.setattr(admin, "stage_upload", _parked_stage_upload)
+        with WriteSession() as upload_db:
+            buf = io.BytesIO()
+            Image.new("RGB", (64, 48), (10, 120, 200)).save(buf, format="JPEG")
+            buf.seek(0)
+            files = [UploadFile(file=buf, filename="a.jpg")]
+            upload = asyncio.create_task(admin.upload_product_images(product_id, files, user, upload_db))
+            await staging.wait()
+            with WriteSession() as list_db:
+                listed = await admin_list_series(include_inactive=True, db=list_db, current_user=user)
+            resume.set()
+            uploaded = await upload
+        return listed, uploaded
+
+    listed, uploaded = asyncio.run(_main())
+    assert listed.data == []
+    assert len(uploaded.data["images"]) == 1
+    with WriteSession() as db:
+        assert db.query(ProductImage).filter(ProductImage.product_id == product_id).count() == 1
+
+
+def test_carousel_and_settings_uploads_release_the_writer_connection(engines, monkeypatch) -> None:
+    write_engine, _ = engines
+    WriteSession = sessionmaker(bind=write_engine, autoflush=False)
+    with WriteSession() as db:
+        carousel = Carousel(title="Old", image_url="images/carousel/old.jpg")
+        db.add(carousel)
+        db.commit()
+        carousel_id = carousel.id
+    user = User(id="u-1", username="admin", hashed_password="x", role="admin", is_active=True)
+
+    async def _main():
+        staging = asyncio.Event()
+        resume = asyncio.Event()
+
+        async def _parked_save(*args):
+            staging.set()
+            await resume.wait()
+            return "images/carousel/new.jpg"
+
+        async def _parked_save_files(*args):
+            return [{"url": await _parked_save()}]
+
+        monkeypatch.setattr(carousels, "save_carousel_image", _parked_save)
+        monkeypatch.setattr(carousels, "delete_file", lambda path: True)
+        monkeypatch.setattr(settings, "save_multiple_files", _parked_save_files)
+        upload = UploadFile(file=io.BytesIO(b"x"), filename="new.jpg")
+        handlers = [
+            lambda db: carousels.update_carousel(
+                carousel_id, "New", "", "", True, 1, upload, current_user=user, db=db
+            ),
+            lambda db: settings.update_settings(
+                "Co", "", "", "", "", "", "", upload, current_user=user, db=db
+            ),
+        ]
+        results = []
+        for handler in handlers:
+            staging.clear()
+            resume.clear()
+            with WriteSession() as upload_db:
+                task = asyncio.create_task(handler(upload_db))
+                await staging.wait()
+                # Pool size 1, timeout 0.1s: this only works if the parked request let go.
+                with WriteSession() as list_db:
+                    await admin_list_series(include_inactive=True, db=list_db, current_user=user)
+                resume.set()
+                results.append(await task)
+        return results
+
+    updated, saved = asyncio.run(_main())
+    assert (updated.data["title"], updated.data["imageUrl"]) == ("New", "images/carousel/new.jpg")
+    assert (saved.data["companyName"], saved.data["customerServiceQrCode"]) == ("Co", "images/carousel/new.jpg")
+
+
+def test_lineage_graph_is_shared_between_read_and_write_sessions(engines) -> None:
+    write_engine, read_engine = engines
+    assert primary_engine(read_engine) is write_engine
+    WriteSession = sessionmaker(bind=write_engine, autoflush=False)
+    ReadSession = sessionmaker(bind=read_engine, autoflush=False)
+
+    with ReadSession() as db:
+        graph = get_lineage_graph(db)
+        assert graph.get("LG-1") is None
+
+    with WriteSession() as db:
+        product = Product(code="LG-1", price=0.0, series_id="s-1", sex="female")
+        db.add(product)
+        db.commit()
+        patch_lineage_graph(db, product)
+
+    with ReadSession() as db:
+        assert get_lineage_graph(db) is graph
+        assert graph.get("LG-1") is not None
+
+
+def test_async_read_engine_is_read_only_and_maps_to_writer(engines) -> None:
+    write_engine, _ = engines
+    db_url = str(write_engine.url)
+    async_engine = create_async_read_engine(write_engine, db_url)
+    assert async_engine.dialect.driver == "aiosqlite"
+    assert primary_engine(async_engine.sync_engine) is write_engine
+    assert create_async_read_engine(write_engine, "sqlite:///:memory:") is None
+
+    async def _check():
+        try:
+            async with AsyncSession(async_engine) as db:
+                assert (await db.execute(text("PRAGMA query_only"))).scalar() == 1
+                with pytest.raises(OperationalError, match="readonly"):
+                    await db.execute(text("DELETE FROM products"))
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(_check())
+
+
+def test_async_session_serves_breeder_list_and_stream(engines) -> None:
+    write_engine, _ = engines
+    with sessionmaker(bind=write_engine)() as db:
+        db.add_all(Product(code=f"AS-{i}", price=0.0, series_id="s-1", sex="female") for i in range(5))
+        db.commit()
+
+    async_engine = create_async_read_engine(write_engine, str(write_engine.url))
+    AsyncReadSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def _get_db():
+        async with AsyncReadSession() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(breeders.router, prefix="/api/breeders")
+    app.dependency_overrides[get_async_read_db] = _get_db
+    with TestClient(app) as client:
+        page = client.get("/api/breeders", params={"series_id": "s-1", "limit": 3})
+        assert page.status_code == 200
+        assert [b["code"] for b in page.json()["data"]] == ["AS-0", "AS-1", "AS-2"]
+        assert page.headers.get("X-Next-Cursor")
+
+        stream = client.get("/api/breeders", params={"series_id": "s-1", "limit": 5, "format": "ndjson"})
+        assert [json.loads(line)["code"] for line in stream.text.splitlines()] == [f"AS-{i}" for i in range(5)]
+
+        breeder_id = page.json()["data"][0]["id"]
+        assert client.get(f"/api/breeders/{breeder_id}").json()["data"]["code"] == "AS-0"
+        assert client.get(f"/api/breeders/{breeder_id}/events").json()["data"]["items"] == []
+    asyncio.run(async_engine.dispose())
+
+
+def test_slow_async_query_does_not_block_the_event_loop(engines) -> None:
+    write_engine, _ = engines
+    async_engine = create_async_read_engine(write_engine, str(write_engine.url))
+    slow_sql = text(
+        "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 1500000) SELECT count(*) FROM n"
+    )
+
+    async def _main():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def _ticker():
+            nonlocal ticks
+            while not done.is_set():
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        ticker = asyncio.create_task(_ticker())
+        started = time.perf_counter()
+        async with AsyncSession(async_engine) as db:
+            count = await run_in_session(db, lambda session: session.execute(slow_sql).scalar())
+        elapsed = time.perf_counter() - started
+        done.set()
+        await ticker
+        await async_engine.dispose()
+        return count, ticks, elapsed
+
+    count, ticks, elapsed = asyncio.run(_main())
+    assert count == 1500000
+    # The loop kept running other tasks while SQLite worked in aiosqlite's thread.
+    assert ticks >= max(2, int(elapsed / 0.005) // 4)
+
+
+def test_postgres_urls_map_to_their_drivers() -> None:
+    assert _normalize_postgres_url("postgres://u:p@db/album") == "postgresql://u:p@db/album"
+    assert _async_url("postgresql+psycopg2://u:p@db/album") == "postgresql+asyncpg://u:p@db/album"
+    assert _async_url("sqlite:///file:/data/app.db?mode=ro&uri=true").startswith("sqlite+aiosqlite:///file:")
+    assert _async_url("mysql://u:p@db/album") is None
@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.file_responses import IMMUTABLE_CACHE_CONTROL, is_hashed_name, parse_range
+from app.api.image_static import ImageStaticFiles
+
+PAYLOAD = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "qr_codes").mkdir()
+    (tmp_path / "qr_codes" / "shop.png").write_bytes(PAYLOAD)
+    (tmp_path / "carousel-2f1e0c4a-9b7d-4c1e-8a3f-0123456789ab.png").write_bytes(PAYLOAD)
+
+    app = Starlette()
+    app.mount("/static", ImageStaticFiles(directory=str(tmp_path), images_subdir="images"))
+    return TestClient(app)
+
+
+HASHED = "/static/carousel-2f1e0c4a-9b7d-4c1e-8a3f-0123456789ab.png"
+
+
+def test_is_hashed_name() -> None:
+    assert is_hashed_name("images/p-1/IMG_0042_ab12cd34.jpg")
+    assert is_hashed_name("shell_ab12cd34")
+    assert is_hashed_name("carousel-2f1e0c4a-9b7d-4c1e-8a3f-0123456789ab.jpg")
+    assert is_hashed_name("images/blobs/" + "a" * 64 + "-nocrop.webp")
+    assert not is_hashed_name("qr_codes/shop.png")
+    assert not is_hashed_name("logo.jpg")
+    # Hex-looking endings that the app never generates.
+    assert not is_hashed_name("banner-202410.jpg")
+    assert not is_hashed_name("shell_ab12cd3.jpg")
+    assert not is_hashed_name("cafe-decade.png")
+
+
+def test_hashed_files_are_immutable_and_revalidate_with_etag(client) -> None:
+    first = client.get(HASHED)
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert first.headers["accept-ranges"] == "bytes"
+    etag = first.headers["etag"]
+
+    cached = client.get(HASHED, headers={"If-None-Match": f'W/"other", {etag}'})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    plain = client.get("/static/qr_codes/shop.png")
+    assert plain.status_code == 200 and "cache-control" not in plain.headers
+    assert client.get("/static/qr_codes/shop.png", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_range_requests(client) -> None:
+    part = client.get(HASHED, headers={"Range": "bytes=10-19"})
+    assert part.status_code == 206
+    assert part.content == PAYLOAD[10:20]
+    assert part.headers["content-range"] == f"bytes 10-19/{len(PAYLOAD)}"
+    assert part.headers["content-length"] == "10"
+
+    tail = client.get(HASHED, headers={"Range": "bytes=-5"})
+    assert tail.content == PAYLOAD[-5:]
+
+    too_far = client.get(HASHED, headers={"Range": f"bytes={len(PAYLOAD)}-"})
+    assert too_far.status_code == 416
+    assert too_far.headers["content-range"] == f"bytes */{len(PAYLOAD)}"
+
+    # A stale If-Range validator gets the whole file.
+    stale = client.get(HASHED, headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+    assert stale.status_code == 200 and stale.content == PAYLOAD
+
+
+def test_parse_range() -> None:
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-", 100) == (0, 99)
+    assert parse_range("bytes=90-200", 100) == (90, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
@@ -0,0 +1,143 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.admin_images import get_orphaned_images, reclaim_orphaned_images
+from app.core import file_utils
+from app.models.models import Base, ImageFile, Product, ProductImage, User
+from app.services import image_gc
+from app.services.image_gc import _Throttle, collect_orphans
+
+
+@pytest.fixture
+def gc_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_utils, "IMAGES_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(image_gc, "IMAGE_GC_RATE", 0)
+    monkeypatch.setattr(image_gc, "IMAGE_GC_MIN_AGE", 0)
+
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    product = Product(code="G-1", price=0.0, series_id="s-1", sex="female")
+    db.add(product)
+    db.flush()
+    db.add(ProductImage(product_id=product.id, url=f"images/{product.id}/kept_ab12cd34.jpg", alt="G-1", type="main", sort_order=0))
+    db.commit()
+    return db, product.id
+
+
+def _touch(*parts: str, size: int = 10) -> str:
+    path = os.path.join(file_utils.IMAGES_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return path
+
+
+def _fake_user() -> User:
+    return User(id="u-1", username="admin", hashed_password="x", role="admin", is_active=True)
+
+
+def test_dry_run_reports_only_unreferenced_files(gc_env) -> None:
+    db, product_id = gc_env
+    kept = [
+        _touch(product_id, "kept_ab12cd34.jpg"),
+        _touch(product_id, "kept_ab12cd34.webp"),
+        _touch(product_id, "small", "kept_ab12cd34.jpg"),
+    ]
+    orphans = [
+        _touch(product_id, "failed_00ff00ff.jpg", size=7),
+        _touch(product_id, "medium", "failed_00ff00ff.webp", size=7),
+        _touch("OLD-CODE", "1.jpg", size=100),
+    ]
+    carousel = _touch("carousel", "carousel-1.jpg")
+
+    report = asyncio.run(get_orphaned_images(None, 200, db, _fake_user())).data
+    assert report["applied"] is False
+    assert report["scannedFiles"] == 6
+    assert (report["orphanFiles"], report["orphanBytes"]) == (3, 114)
+    assert {f["folder"]: f["files"] for f in report["folders"]} == {product_id: 2, "OLD-CODE": 1}
+    assert all(os.path.exists(p) for p in kept + orphans + [carousel])
+
+
+def test_reclaim_deletes_orphans_and_manifest_rows(gc_env) -> None:
+    db, product_id = gc_env
+    kept = _touch(product_id, "kept_ab12cd34.jpg")
+    orphan = _touch("blobs", "f" * 64 + ".jpg")
+    db.add(ImageFile(image_url="images/blobs/" + "f" * 64 + ".jpg", path="blobs/" + "f" * 64 + ".jpg", variant="original", format="jpg", bytes=10))
+    db.commit()
+
+    report = asyncio.run(reclaim_orphaned_images(None, 200, db, _fake_user())).data
+    assert report["reclaimedBytes"] == 10
+    assert os.path.exists(kept)
+    assert not os.path.exists(orphan)
+    # The emptied folder is removed too.
+    assert not os.path.exists(os.path.dirname(orphan))
+    assert db.query(ImageFile).count() == 0
+
+
+def test_rows_storing_served_url_forms_keep_their_files(gc_env) -> None:
+    db, product_id = gc_env
+    # create_product stores client-supplied URLs verbatim, e.g. the /static form it was served.
+    forms = {
+        "static": f"/static/images/{product_id}/a_00aa00aa.jpg",
+        "bare": f"static/images/{product_id}/b_00bb00bb.jpg",
+        "images": f"/images/{product_id}/c_00cc00cc.jpg",
+        "quoted": f"/static/images/{product_id}/%E9%BE%9F_00dd00dd.jpg",
+    }
+    for form, url in forms.items():
+        db.add(ProductImage(product_id=product_id, url=url, alt=form, type="gallery", sort_order=1))
+    db.commit()
+    kept = [
+        _touch(product_id, "a_00aa00aa.jpg"),
+        _touch(product_id, "small", "b_00bb00bb.webp"),
+        _touch(product_id, "c_00cc00cc.webp"),
+        _touch(product_id, "龟_00dd00dd.jpg"),
+    ]
+    orphan = _touch(product_id, "d_00ee00ee.jpg")
+
+    report = collect_orphans(db, apply=True)
+    assert report["orphanFiles"] == 1
+    assert all(os.path.exists(p) for p in kept)
+    assert not os.path.exists(orphan)
+
+
+def test_recent_files_are_skipped_and_scan_resumes_from_cursor(gc_env) -> None:
+    db, product_id = gc_env
+    for folder in ("a", "b", "c"):
+        old = _touch(folder, "x.jpg")
+        os.utime(old, (time.time() - 7200, time.time() - 7200))
+    _touch("a", "fresh.jpg")
+
+    first = collect_orphans(db, cursor=None, max_folders=2, min_age=3600)
+    assert [f["folder"] for f in first["folders"]] == ["a", "b"]
+    assert first["skippedRecent"] == 1
+    assert first["nextCursor"] == "b"
+
+    second = collect_orphans(db, cursor=first["nextCursor"], max_folders=2, min_age=3600)
+    assert [f["folder"] for f in second["folders"]] == ["c"]
+    assert second["nextCursor"] is None
+
+
+def test_throttle_limits_rate() -> None:
+    throttle = _Throttle(rate=200)
+    start = time.monotonic()
+    for _ in range(11):
+        throttle.tick()
+    assert time.monotonic() - start >= 0.045
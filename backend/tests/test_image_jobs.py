@@ -0,0 +1,303 @@
+import asyncio
+import io
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.admin import delete_product, upload_product_images
+from app.api.routers.admin_image_jobs import get_image_job
+from app.core import file_utils
+from app.models.models import Base, ImageJob, ImageJobItem, Product, ProductImage, User
+from app.services import image_jobs
+from app.services.image_jobs import ImageJobWorker, recover_interrupted_jobs
+
+
+@pytest.fixture
+def image_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_utils, "IMAGES_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(file_utils, "IMAGE_WORKERS", 0)
+    monkeypatch.setattr(image_jobs, "IMAGE_JOB_STAGING_DIR", str(tmp_path / "staging"))
+
+    # One shared in-memory database for the request session and the worker sessions.
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal, tmp_path
+
+
+def _fake_user() -> User:
+    return User(id="u-1", username="admin", hashed_password="x", role="admin", is_active=True)
+
+
+def _jpeg(name: str) -> UploadFile:
+    buf = io.BytesIO()
+    # Distinct content per name: identical bytes would share one stored blob.
+    Image.new("RGB", (900, 600), (10, 120, ord(name[0]))).save(buf, format="JPEG")
+    buf.seek(0)
+    return UploadFile(file=buf, filename=name)
+
+
+def _seed_product(db) -> str:
+    product = Product(code="P-1", price=0.0, series_id="s-1", sex="female")
+    db.add(product)
+    db.commit()
+    return product.id
+
+
+def _job(db, job_id: str) -> dict:
+    return asyncio.run(get_image_job(job_id, db, _fake_user())).data
+
+
+def test_upload_returns_placeholders_and_worker_reports_progress(image_env) -> None:
+    SessionLocal, tmp_path = image_env
+    db = SessionLocal()
+    product_id = _seed_product(db)
+
+    data = asyncio.run(
+        upload_product_images(product_id, [_jpeg("a.jpg"), _jpeg("b.jpg")], _fake_user(), db)
+    ).data
+    assert [(img["type"], img["status"]) for img in data["images"]] == [("main", "pending"), ("gallery", "pending")]
+    main_path = os.path.join(file_utils.IMAGES_DIR, *data["images"][0]["url"].split("/")[1:])
+    assert not os.path.exists(main_path)
+    assert len(os.listdir(tmp_path / "staging")) == 2
+
+    job = _job(db, data["jobId"])
+    assert (job["status"], job["total"], job["completed"], job["progress"]) == ("pending", 2, 0, 0.0)
+
+    worker = ImageJobWorker(SessionLocal)
+    assert worker.process_next() is True
+    db.expire_all()
+    job = _job(db, data["jobId"])
+    assert (job["status"], job["completed"], job["progress"]) == ("running", 1, 0.5)
+    assert [item["status"] for item in job["items"]] == ["done", "pending"]
+    assert os.path.exists(main_path)
+    assert os.path.exists(main_path[: -len(".jpg")] + ".webp")
+    # Sized copies at <folder>/<size>/<stem>.<ext>, the paths frontend buildImageUrl/buildSrcSet request.
+    folder, name = os.path.split(main_path)
+    for size in file_utils.PRODUCT_IMAGE_SIZES:
+        for ext in ("jpg", "webp"):
+            assert os.path.exists(os.path.join(folder, size, f"{name[: -len('.jpg')]}.{ext}"))
+
+    assert worker.process_next() is True
+    assert worker.process_next() is False
+    db.expire_all()
+    job = _job(db, data["jobId"])
+    assert (job["status"], job["completed"], job["failed"], job["progress"]) == ("done", 2, 0, 1.0)
+    assert job["finishedAt"] is not None
+    assert os.listdir(tmp_path / "staging") == []
+
+
+def test_failed_item_removes_placeholder_and_promotes_next_main(image_env) -> None:
+    SessionLocal, _ = image_env
+    db = SessionLocal()
+    product_id = _seed_product(db)
+
+    data = asyncio.run(
+        upload_product_images(product_id, [_jpeg("a.jpg"), _jpeg("b.jpg")], _fake_user(), db)
+    ).data
+    # Truncate the first staged original so decoding fails in the worker.
+    first = db.query(ImageJobItem).filter(ImageJobItem.position == 0).one()
+    with open(first.source_path, "r+b") as fh:
+        fh.truncate(64)
+
+    worker = ImageJobWorker(SessionLocal)
+    while worker.process_next():
+        pass
+
+    db.expire_all()
+    job = _job(db, data["jobId"])
+    assert (job["status"], job["completed"], job["failed"]) == ("failed", 1, 1)
+    assert job["items"][0]["status"] == "failed" and job["items"][0]["error"]
+
+    remaining = db.query(ProductImage).filter(ProductImage.product_id == product_id).all()
+    assert [(img.id, img.type) for img in remaining] == [(data["images"][1]["id"], "main")]
+    product = db.query(Product).filter(Product.id == product_id).one()
+    assert product.main_image_url == data["images"][1]["url"]
+
+
+def test_duplicate_content_in_one_request_gets_one_row(image_env) -> None:
+    SessionLocal, tmp_path = image_env
+    db = SessionLocal()
+    product_id = _seed_product(db)
+
+    data = asyncio.run(
+        upload_product_images(product_id, [_jpeg("a.jpg"), _jpeg("a-copy.jpg"), _jpeg("b.jpg")], _fake_user(), db)
+    ).data
+    assert [img["type"] for img in data["images"]] == ["main", "gallery"]
+    assert len(os.listdir(tmp_path / "staging")) == 2
+    assert _job(db, data["jobId"])["total"] == 2
+
+    # The item failing leaves no row behind pointing at files that were never written.
+    first = db.query(ImageJobItem).filter(ImageJobItem.position == 0).one()
+    with open(first.source_path, "r+b") as fh:
+        fh.truncate(64)
+    while ImageJobWorker(SessionLocal).process_next():
+        pass
+    db.expire_all()
+    remaining = db.query(ProductImage).filter(ProductImage.product_id == product_id).all()
+    assert [img.id for img in remaining] == [data["images"][1]["id"]]
+
+
+def _second_product(db) -> str:
+    product = Product(code="P-2", price=0.0, series_id="s-1", sex="female")
+    db.add(product)
+    db.commit()
+    return product.id
+
+
+def test_upload_of_still_queued_content_shares_the_pending_item(image_env) -> None:
+    SessionLocal, tmp_path = image_env
+    db = SessionLocal()
+    p1 = _seed_product(db)
+    p2 = _second_product(db)
+
+    first = asyncio.run(upload_product_images(p1, [_jpeg("a.jpg")], _fake_user(), db)).data
+    second = asyncio.run(upload_product_images(p2, [_jpeg("a.jpg")], _fake_user(), db)).data
+    assert second["jobId"] is None
+    assert [(img["url"], img["status"]) for img in second["images"]] == [(first["images"][0]["url"], "pending")]
+    assert db.query(ImageJobItem).count() == 1
+    assert len(os.listdir(tmp_path / "staging")) == 1
+
+    # Deleting the product that queued it hands the work to the row sharing it.
+    asyncio.run(delete_product(p1, _fake_user(), db))
+    assert ImageJobWorker(SessionLocal).process_next() is True
+    db.expire_all()
+    row = db.query(ProductImage).filter(ProductImage.product_id == p2).one()
+    assert os.path.exists(os.path.join(file_utils.IMAGES_DIR, *row.url.split("/")[1:]))
+    assert os.listdir(tmp_path / "staging") == []
+
+
+def test_failed_shared_item_drops_every_row_showing_its_blob(image_env) -> None:
+    SessionLocal, _ = image_env
+    db = SessionLocal()
+    p1 = _seed_product(db)
+    p2 = _second_product(db)
+
+    asyncio.run(upload_product_images(p1, [_jpeg("a.jpg")], _fake_user(), db))
+    kept = asyncio.run(upload_product_images(p2, [_jpeg("b.jpg")], _fake_user(), db)).data["images"][0]
+    asyncio.run(upload_product_images(p2, [_jpeg("a.jpg")], _fake_user(), db))
+    items = db.query(ImageJobItem).filter(ImageJobItem.status == "pending").all()
+    shared = next(item for item in items if item.job.product_id == p1)
+    with open(shared.source_path, "r+b") as fh:
+        fh.truncate(64)
+
+    while ImageJobWorker(SessionLocal).process_next():
+        pass
+
+    db.expire_all()
+    assert db.query(ProductImage).filter(ProductImage.product_id == p1).count() == 0
+    remaining = db.query(ProductImage).filter(ProductImage.product_id == p2).all()
+    assert [(img.id, img.type) for img in remaining] == [(kept["id"], "main")]
+    assert db.query(Product).filter(Product.id == p2).one().main_image_url == kept["url"]
+
+
+def test_undecodable_upload_is_rejected_before_queueing(image_env) -> None:
+    SessionLocal, tmp_path = image_env
+    db = SessionLocal()
+    product_id = _seed_product(db)
+
+    broken = UploadFile(file=io.BytesIO(b"not an image"), filename="broken.jpg")
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(upload_product_images(product_id, [_jpeg("ok.jpg"), broken], _fake_user(), db))
+
+    assert exc.value.status_code == 400 and "broken.jpg" in exc.value.detail
+    assert db.query(ImageJob).count() == 0
+    assert os.listdir(tmp_path / "staging") == []
+
+
+def test_oversized_upload_is_rejected_with_413(image_env, monkeypatch) -> None:
+    SessionLocal, tmp_path = image_env
+    db = SessionLocal()
+    product_id = _seed_product(db)
+    monkeypatch.setattr(file_utils, "UPLOAD_MAX_FILE_BYTES", 1024)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(upload_product_images(product_id, [_jpeg("big.jpg")], _fake_user(), db))
+
+    assert exc.value.status_code == 413 and "big.jpg" in exc.value.detail
+    assert db.query(ProductImage).count() == 0
+    assert os.listdir(tmp_path / "staging") == []
+
+
+def test_interrupted_items_resume_after_restart(image_env) -> None:
+    SessionLocal, _ = image_env
+    db = SessionLocal()
+    product_id = _seed_product(db)
+
+    data = asyncio.run(upload_product_images(product_id, [_jpeg("a.jpg")], _fake_user(), db)).data
+    # Another process claimed the item and is still renewing its lease.
+    db.query(ImageJobItem).update(
+        {"status": "running", "claimed_by": "other:1", "lease_expires_at": datetime.utcnow() + timedelta(minutes=5)}
+    )
+    db.query(ImageJob).update({"status": "running"})
+    db.commit()
+    assert recover_interrupted_jobs(SessionLocal) == 0
+    assert ImageJobWorker(SessionLocal).process_next() is False
+
+    # It crashed: the lease runs out without a heartbeat.
+    db.query(ImageJobItem).update({"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    assert recover_interrupted_jobs(SessionLocal) == 1
+    worker = ImageJobWorker(SessionLocal)
+    worker.start()
+    try:
+        for _ in range(200):
+            db.expire_all()
+            if _job(db, data["jobId"])["status"] == "done":
+                break
+            asyncio.run(asyncio.sleep(0.05))
+    finally:
+        worker.stop(timeout=5)
+
+    assert _job(db, data["jobId"])["status"] == "done"
+
+
+def test_heartbeat_renews_only_the_workers_own_leases(image_env, monkeypatch) -> None:
+    SessionLocal, _ = image_env
+    db = SessionLocal()
+    product_id = _seed_product(db)
+    asyncio.run(upload_product_images(product_id, [_jpeg("a.jpg"), _jpeg("b.jpg")], _fake_user(), db))
+
+    worker = ImageJobWorker(SessionLocal)
+    mine = worker._claim(SessionLocal())
+    other = db.query(ImageJobItem).filter(ImageJobItem.id != mine.id).one()
+    stale = datetime.utcnow() - timedelta(seconds=1)
+    db.query(ImageJobItem).filter(ImageJobItem.id == other.id).update(
+        {"status": "running", "claimed_by": "other:1", "lease_expires_at": stale}
+    )
+    db.query(ImageJobItem).filter(ImageJobItem.id == mine.id).update({"lease_expires_at": stale})
+    db.commit()
+
+    assert worker.renew_leases() == 1
+    db.expire_all()
+    assert db.get(ImageJobItem, mine.id).lease_expires_at > datetime.utcnow()
+    assert db.get(ImageJobItem, other.id).lease_expires_at == stale
+
+
+def test_deleting_product_discards_queued_work(image_env) -> None:
+    SessionLocal, tmp_path = image_env
+    db = SessionLocal()
+    product_id = _seed_product(db)
+
+    asyncio.run(upload_product_images(product_id, [_jpeg("a.jpg")], _fake_user(), db))
+    asyncio.run(delete_product(product_id, _fake_user(), db))
+
+    assert db.query(ImageJob).count() == 0
+    assert db.query(ImageJobItem).count() == 0
+    assert os.listdir(tmp_path / "staging") == []
+    assert ImageJobWorker(SessionLocal).process_next() is False
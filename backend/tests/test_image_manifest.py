@@ -0,0 +1,122 @@
+import asyncio
+import io
+import os
+import sys
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.admin import delete_product_image, upload_product_images
+from app.api.routers.admin_images import get_image_storage_usage
+from app.core import file_utils
+from app.models.models import Base, ImageFile, Product, ProductImage, User
+from app.services import image_jobs
+from app.services.image_jobs import ImageJobWorker
+from app.services.image_store import delete_image_files
+
+
+@pytest.fixture
+def manifest_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_utils, "IMAGES_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(file_utils, "IMAGE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(file_utils, "IMAGE_WORKERS", 0)
+    monkeypatch.setattr(image_jobs, "IMAGE_JOB_STAGING_DIR", str(tmp_path / "staging"))
+
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal
+
+
+def _fake_user() -> User:
+    return User(id="u-1", username="admin", hashed_password="x", role="admin", is_active=True)
+
+
+def _jpeg(color) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (640, 480), color).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _uploaded_product(SessionLocal) -> tuple:
+    db = SessionLocal()
+    product = Product(code="M-1", price=0.0, series_id="s-1", sex="female")
+    db.add(product)
+    db.commit()
+
+    files = [UploadFile(file=io.BytesIO(_jpeg(c)), filename=f"{i}.jpg") for i, c in enumerate([(200, 0, 0), (0, 0, 200)])]
+    asyncio.run(upload_product_images(product.id, files, _fake_user(), db))
+    while ImageJobWorker(SessionLocal).process_next():
+        pass
+    db.expire_all()
+    return db, product.id
+
+
+def test_worker_records_every_generated_file(manifest_env) -> None:
+    db, product_id = _uploaded_product(manifest_env)
+
+    images = db.query(ProductImage).filter(ProductImage.product_id == product_id).all()
+    assert len(images) == 2
+    for image in images:
+        rows = db.query(ImageFile).filter(ImageFile.image_url == image.url).all()
+        variants = ["original", *file_utils.PRERENDER_SIZES]
+        assert {(r.variant, r.format) for r in rows} == {(v, f) for v in variants for f in ("jpg", "webp")}
+        for row in rows:
+            path = os.path.join(file_utils.IMAGES_DIR, row.path)
+            assert os.path.getsize(path) == row.bytes
+            if row.variant == "original":
+                assert (row.width, row.height) == (480, 480)
+
+
+def test_delete_uses_manifest_and_usage_reports_totals(manifest_env) -> None:
+    db, product_id = _uploaded_product(manifest_env)
+
+    usage = asyncio.run(get_image_storage_usage(db, _fake_user())).data
+    # jpg + webp for the original and every prerendered size.
+    per_image = 2 * (1 + len(file_utils.PRERENDER_SIZES))
+    assert usage["images"] == 2 and usage["files"] == 2 * per_image
+    assert usage["bytes"] == sum(r.bytes for r in db.query(ImageFile).all())
+    assert set(usage["byFormat"]) == {"jpg", "webp"}
+    assert usage["unreferenced"] == {"files": 0, "bytes": 0}
+
+    image = db.query(ProductImage).filter(ProductImage.product_id == product_id).first()
+    paths = [os.path.join(file_utils.IMAGES_DIR, r.path) for r in db.query(ImageFile).filter(ImageFile.image_url == image.url)]
+    asyncio.run(delete_product_image(product_id, image.id, _fake_user(), db))
+
+    assert not any(os.path.exists(p) for p in paths)
+    assert db.query(ImageFile).filter(ImageFile.image_url == image.url).count() == 0
+    assert asyncio.run(get_image_storage_usage(db, _fake_user())).data["files"] == per_image
+
+
+def test_unreferenced_manifest_rows_are_reported(manifest_env) -> None:
+    db = manifest_env()
+    db.add(ImageFile(image_url="images/blobs/gone.jpg", path="blobs/gone.jpg", variant="original", format="jpg", bytes=123))
+    db.commit()
+
+    usage = asyncio.run(get_image_storage_usage(db, _fake_user())).data
+    assert usage["unreferenced"] == {"files": 1, "bytes": 123}
+
+
+def test_urls_without_manifest_fall_back_to_probing(manifest_env) -> None:
+    db = manifest_env()
+    folder = os.path.join(file_utils.IMAGES_DIR, "legacy")
+    os.makedirs(os.path.join(folder, "small"))
+    legacy = [os.path.join(folder, "old.jpg"), os.path.join(folder, "old.webp"), os.path.join(folder, "small", "old.jpg")]
+    for path in legacy:
+        with open(path, "wb") as f:
+            f.write(b"x")
+
+    assert delete_image_files(db, "images/legacy/old.jpg")
+    assert not any(os.path.exists(p) for p in legacy)
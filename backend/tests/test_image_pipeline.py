@@ -0,0 +1,240 @@
+import asyncio
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.admin import upload_product_images
+from app.core import file_utils
+from app.core.file_utils import (
+    PRODUCT_IMAGE_SIZES,
+    UploadBudget,
+    UploadTooLargeError,
+    generate_image_derivatives,
+    stream_upload,
+)
+from app.models.models import Base, Product, ProductImage, User
+from app.services import image_jobs
+from app.services.image_jobs import ImageJobWorker, stage_upload
+
+
+def _jpeg_bytes(size=(1200, 800), orientation=None) -> bytes:
+    img = Image.new("RGB", size, (200, 30, 30))
+    buf = io.BytesIO()
+    if orientation:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        img.save(buf, format="JPEG", exif=exif.tobytes())
+    else:
+        img.save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _expected_files(product_dir, stem):
+    files = [os.path.join(product_dir, f"{stem}.{ext}") for ext in ("jpg", "webp")]
+    for size_name in PRODUCT_IMAGE_SIZES:
+        files += [os.path.join(product_dir, size_name, f"{stem}.{ext}") for ext in ("jpg", "webp")]
+    return files
+
+
+def test_generate_image_derivatives_square_crop(tmp_path) -> None:
+    product_dir = str(tmp_path / "p-1")
+    generate_image_derivatives(_jpeg_bytes((1200, 800)), product_dir, "a", True)
+
+    for path in _expected_files(product_dir, "a"):
+        assert os.path.exists(path), path
+
+    with Image.open(os.path.join(product_dir, "a.jpg")) as img:
+        assert img.size == (800, 800)
+    for size_name, dims in PRODUCT_IMAGE_SIZES.items():
+        with Image.open(os.path.join(product_dir, size_name, "a.webp")) as img:
+            assert img.size == dims
+
+
+def test_generate_image_derivatives_applies_exif_rotation_and_padding(tmp_path) -> None:
+    product_dir = str(tmp_path / "p-2")
+    # Orientation 6 = rotate 90°: a 1200x800 landscape is stored, a portrait is shown.
+    src = tmp_path / "src.jpg"
+    src.write_bytes(_jpeg_bytes((1200, 800), orientation=6))
+
+    generate_image_derivatives(str(src), product_dir, "b", crop_square=False)
+
+    with Image.open(os.path.join(product_dir, "b.jpg")) as img:
+        assert img.size == (800, 1200)
+    with Image.open(os.path.join(product_dir, "small", "b.jpg")) as img:
+        assert img.size == (300, 300)
+
+
+@pytest.fixture
+def upload_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_utils, "IMAGES_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(image_jobs, "IMAGE_JOB_STAGING_DIR", str(tmp_path / "staging"))
+
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    product = Product(code="P-1", price=0.0, series_id="s-1", sex="female")
+    db.add(product)
+    db.commit()
+    yield SessionLocal, db, product.id
+    db.close()
+
+
+def _fake_user() -> User:
+    return User(id="u-1", username="admin", hashed_password="x", role="admin", is_active=True)
+
+
+def test_upload_keeps_event_loop_free_and_worker_renders_all_sizes(upload_env) -> None:
+    SessionLocal, db, product_id = upload_env
+
+    async def _run():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def _ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        ticker = asyncio.create_task(_ticker())
+        files = [
+            UploadFile(file=io.BytesIO(_jpeg_bytes((2000, 1500 + i))), filename=f"photo{i}.jpg")
+            for i in range(3)
+        ]
+        try:
+            data = (await upload_product_images(product_id, files, _fake_user(), db)).data
+            # Rendering happens in the job worker (process pool), never on the loop.
+            worker = ImageJobWorker(SessionLocal)
+            while await asyncio.to_thread(worker.process_next):
+                pass
+        finally:
+            done.set()
+            await ticker
+        return data, ticks
+
+    try:
+        data, ticks = asyncio.run(_run())
+    finally:
+        file_utils.shutdown_image_executor()
+
+    assert [img["type"] for img in data["images"]] == ["main", "gallery", "gallery"]
+    assert ticks > 1
+    for img in data["images"]:
+        folder, name = os.path.split(os.path.join(file_utils.IMAGES_DIR, *img["url"].split("/")[1:]))
+        for path in _expected_files(folder, name[: -len(".jpg")]):
+            assert os.path.exists(path), path
+
+
+def test_stage_upload_rejects_undecodable_upload(upload_env, tmp_path) -> None:
+    broken = UploadFile(file=io.BytesIO(b"not an image"), filename="broken.jpg")
+    with pytest.raises(ValueError, match="broken.jpg"):
+        asyncio.run(stage_upload(broken))
+
+    # The staged copy is not left behind.
+    assert os.listdir(tmp_path / "staging") == []
+
+
+class _RecordingReader(io.BytesIO):
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.read_sizes = []
+
+    def read(self, size=-1):
+        self.read_sizes.append(size)
+        return super().read(size)
+
+
+def test_stream_upload_reads_in_chunks_and_enforces_limits(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(file_utils, "UPLOAD_CHUNK_SIZE", 1024)
+    payload = os.urandom(5000)
+
+    reader = _RecordingReader(payload)
+    dest = str(tmp_path / "ok.bin")
+    assert asyncio.run(stream_upload(UploadFile(file=reader, filename="ok.bin"), dest)) == 5000
+    assert max(reader.read_sizes) == 1024
+    with open(dest, "rb") as f:
+        assert f.read() == payload
+
+    # Per-file limit: the partial file is removed.
+    dest = str(tmp_path / "big.bin")
+    budget = UploadBudget(max_request_bytes=10_000, max_file_bytes=4096)
+    with pytest.raises(UploadTooLargeError, match="big.bin"):
+        asyncio.run(stream_upload(UploadFile(file=io.BytesIO(payload), filename="big.bin"), dest, budget))
+    assert not os.path.exists(dest)
+
+    # Per-request limit: counted across files.
+    budget = UploadBudget(max_request_bytes=8000, max_file_bytes=6000)
+    asyncio.run(stream_upload(UploadFile(file=io.BytesIO(payload), filename="a.bin"), str(tmp_path / "a.bin"), budget))
+    with pytest.raises(UploadTooLargeError, match="per request"):
+        asyncio.run(stream_upload(UploadFile(file=io.BytesIO(payload), filename="b.bin"), str(tmp_path / "b.bin"), budget))
+
+
+def test_upload_rejects_oversized_request(upload_env, tmp_path, monkeypatch) -> None:
+    _, db, product_id = upload_env
+    content = _jpeg_bytes()
+    monkeypatch.setattr(file_utils, "UPLOAD_MAX_REQUEST_BYTES", len(content) + 1)
+
+    files = [UploadFile(file=io.BytesIO(_jpeg_bytes((1200, 800 + i))), filename=f"{i}.jpg") for i in range(2)]
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(upload_product_images(product_id, files, _fake_user(), db))
+
+    assert exc.value.status_code == 413 and "per request" in exc.value.detail
+    assert os.listdir(tmp_path / "staging") == []
+    assert db.query(ProductImage).count() == 0
+    assert not os.path.exists(tmp_path / "images")
+
+
+def _detailed_image(size) -> Image.Image:
+    # Gradients plus fine stripes: enough detail for resampling differences to show.
+    x = np.linspace(0, 255, size[0], dtype=np.float64)
+    y = np.linspace(0, 255, size[1], dtype=np.float64)[:, None]
+    r = np.broadcast_to(x, (size[1], size[0]))
+    g = np.broadcast_to(y, (size[1], size[0]))
+    b = ((np.arange(size[0]) // 7 + np.arange(size[1])[:, None] // 11) % 2) * 255
+    return Image.fromarray(np.dstack([r, g, b]).astype(np.uint8), "RGB")
+
+
+def _psnr(a: Image.Image, b: Image.Image) -> float:
+    mse = np.mean((np.asarray(a, dtype=np.float64) - np.asarray(b, dtype=np.float64)) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def test_fast_downscale_matches_lanczos() -> None:
+    img = _detailed_image((3000, 2000))
+    for size in [(800, 533), (300, 200), (150, 100)]:
+        reference = img.resize(size, Image.Resampling.LANCZOS)
+        assert _psnr(file_utils._downscale(img, size), reference) > 30
+
+
+def test_render_variant_decodes_jpeg_in_draft_mode(tmp_path, monkeypatch) -> None:
+    source = tmp_path / "big.jpg"
+    _detailed_image((2400, 1600)).save(source, format="JPEG", quality=92)
+
+    decoded = []
+    real_prepare = file_utils._prepare_image
+    monkeypatch.setattr(file_utils, "_prepare_image", lambda img, *a: decoded.append(img.size) or real_prepare(img, *a))
+
+    out = tmp_path / "w300.webp"
+    file_utils.render_image_variant(str(source), str(out), 300, "WebP", 80)
+
+    # 1/4 scale decode: still at least 300px on both sides.
+    assert decoded == [(600, 400)]
+    with Image.open(out) as img:
+        assert img.size == (300, 200)
@@ -0,0 +1,113 @@
+import asyncio
+import io
+import os
+import sys
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.admin import delete_product, delete_product_image, upload_product_images
+from app.core import file_utils
+from app.models.models import Base, ImageJob, Product, ProductImage, User
+from app.services import image_jobs
+from app.services.image_jobs import ImageJobWorker
+from app.services.image_store import blob_stem, blob_url
+from app.services.import_service import BatchImportService
+
+
+@pytest.fixture
+def store_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_utils, "IMAGES_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(file_utils, "IMAGE_WORKERS", 0)
+    monkeypatch.setattr(image_jobs, "IMAGE_JOB_STAGING_DIR", str(tmp_path / "staging"))
+
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal, tmp_path
+
+
+def _fake_user() -> User:
+    return User(id="u-1", username="admin", hashed_password="x", role="admin", is_active=True)
+
+
+def _photo_bytes() -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (900, 600), (200, 80, 20)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _product(db, code: str) -> str:
+    product = Product(code=code, price=0.0, series_id="s-1", sex="female")
+    db.add(product)
+    db.commit()
+    return product.id
+
+
+def _upload(db, product_id: str, content: bytes) -> dict:
+    files = [UploadFile(file=io.BytesIO(content), filename="IMG_0001.jpg")]
+    return asyncio.run(upload_product_images(product_id, files, _fake_user(), db)).data
+
+
+def test_identical_uploads_share_one_blob_and_skip_reencoding(store_env) -> None:
+    SessionLocal, _ = store_env
+    db = SessionLocal()
+    content = _photo_bytes()
+    url = blob_url(blob_stem(content))
+    blob_path = os.path.join(file_utils.IMAGES_DIR, *url.split("/")[1:])
+
+    p1, p2 = _product(db, "P-1"), _product(db, "P-2")
+    first = _upload(db, p1, content)
+    assert first["jobId"] and first["images"][0]["url"] == url
+    while ImageJobWorker(SessionLocal).process_next():
+        pass
+    assert os.path.exists(blob_path)
+
+    second = _upload(db, p2, content)
+    assert second["jobId"] is None
+    assert [(img["url"], img["status"]) for img in second["images"]] == [(url, "ready")]
+    assert db.query(ImageJob).count() == 1
+
+    # Deleting one reference keeps the shared files.
+    asyncio.run(delete_product_image(p1, first["images"][0]["id"], _fake_user(), db))
+    assert os.path.exists(blob_path)
+
+    # The last reference going away unlinks them.
+    asyncio.run(delete_product(p2, _fake_user(), db))
+    assert db.query(ProductImage).count() == 0
+    assert not os.path.exists(blob_path)
+    assert not os.path.exists(blob_path[: -len(".jpg")] + ".webp")
+
+
+def test_reimport_reuses_blob_and_does_not_duplicate_rows(store_env, tmp_path) -> None:
+    SessionLocal, _ = store_env
+    db = SessionLocal()
+    product_id = _product(db, "A1")
+
+    folder = tmp_path / "zip" / "a1"
+    folder.mkdir(parents=True)
+    (folder / "1.jpg").write_bytes(_photo_bytes())
+
+    assert BatchImportService._process_product_images("A1", str(tmp_path / "zip"), product_id, db) == 1
+    db.commit()
+    assert BatchImportService._process_product_images("A1", str(tmp_path / "zip"), product_id, db) == 0
+    db.commit()
+
+    rows = db.query(ProductImage).filter(ProductImage.product_id == product_id).all()
+    assert [img.url for img in rows] == [blob_url(blob_stem(_photo_bytes(), crop_square=False))]
+    assert rows[0].type == "main"
+    blob_dir = os.path.join(file_utils.IMAGES_DIR, "blobs")
+    blobs = [name for name in os.listdir(blob_dir) if os.path.isfile(os.path.join(blob_dir, name))]
+    assert sorted(blobs) == sorted(os.path.basename(rows[0].url)[: -len(".jpg")] + ext for ext in (".jpg", ".webp"))
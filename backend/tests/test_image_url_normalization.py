@@ -25,6 +25,7 @@ PRODUCT_ID = "550e8400-e29b-41d4-a716-446655440000"
         (f"/static/images/{PRODUCT_ID}/a.jpg", f"/static/images/{PRODUCT_ID}/a.jpg"),
         ("https://example.com/a.jpg", "https://example.com/a.jpg"),
         ("/api/images/a.jpg", "/api/images/a.jpg"),
+        (f"images/blobs/{'a' * 64}.jpg", f"/static/images/blobs/{'a' * 64}.jpg"),
         # Strict mode: do not normalize code-based paths anymore.
         ("images/p01/a.jpg", ""),
         ("/static/other/p01/a.jpg", ""),
@@ -0,0 +1,169 @@
+import asyncio
+import io
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.testclient import TestClient
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.image_static import ImageStaticFiles
+from app.api.routers.images import get_product_image_variant
+from app.core import file_utils
+from app.services import image_variants
+from app.services.image_variants import VariantCache, get_image_variant, negotiate_format, snap_width
+
+
+@pytest.fixture
+def variant_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_utils, "IMAGES_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(file_utils, "IMAGE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(file_utils, "IMAGE_WORKERS", 0)
+    monkeypatch.setattr(image_variants, "_cache", None)
+
+    product_dir = tmp_path / "images" / "p-1"
+    product_dir.mkdir(parents=True)
+    Image.new("RGB", (1000, 800), (40, 90, 200)).save(product_dir / "shell_ab12cd34.jpg", format="JPEG")
+    return tmp_path
+
+
+def test_snap_width() -> None:
+    assert [snap_width(w) for w in (None, 1, 150, 151, 640, 5000)] == [0, 150, 150, 300, 800, 1200]
+
+
+def test_variant_is_rendered_once_and_served_from_cache(variant_env, monkeypatch) -> None:
+    calls = []
+    render = file_utils.render_image_variant
+
+    def _counting_render(*args):
+        calls.append(args)
+        return render(*args)
+
+    monkeypatch.setattr(file_utils, "render_image_variant", _counting_render)
+
+    async def _fetch_concurrently():
+        return await asyncio.gather(*[get_image_variant("p-1", "shell_ab12cd34", 280, "webp") for _ in range(5)])
+
+    results = asyncio.run(_fetch_concurrently())
+    assert len(calls) == 1
+    path, media_type = results[0]
+    assert {r for r in results} == {(path, "image/webp")}
+    assert path == os.path.join(str(variant_env / "cache"), "p-1", "shell_ab12cd34_w300.webp")
+    with Image.open(path) as img:
+        assert (img.format, img.size) == ("WEBP", (300, 240))
+
+    asyncio.run(get_image_variant("p-1", "shell_ab12cd34", 300, "webp"))
+    assert len(calls) == 1
+
+    # Full-size JPEG is the stored original itself.
+    full, _ = asyncio.run(get_image_variant("p-1", "shell_ab12cd34"))
+    assert full == os.path.join(file_utils.IMAGES_DIR, "p-1", "shell_ab12cd34.jpg")
+
+
+def test_cache_evicts_least_recently_used(tmp_path) -> None:
+    cache = VariantCache(str(tmp_path), max_bytes=250)
+    paths = [str(tmp_path / f"{name}.jpg") for name in ("a", "b", "c")]
+
+    def _render(path):
+        with open(path, "wb") as fh:
+            fh.write(b"x" * 100)
+        cache.add(path, 100)
+
+    _render(paths[0])
+    _render(paths[1])
+    assert cache.touch(paths[0])
+    _render(paths[2])
+
+    assert [os.path.exists(p) for p in paths] == [True, False, True]
+    assert cache.total_bytes == 200
+    assert not cache.touch(paths[1])
+
+    # A fresh index is rebuilt from disk with recency taken from atimes.
+    os.utime(paths[0], (1, 1))
+    extra = tmp_path / "d.jpg"
+    extra.write_bytes(b"x" * 100)
+    VariantCache(str(tmp_path), max_bytes=200).add(str(extra), 100)
+    assert [os.path.exists(p) for p in (paths[0], paths[2], str(extra))] == [False, True, True]
+
+
+def test_deleting_an_image_drops_its_cached_variants(variant_env) -> None:
+    path, _ = asyncio.run(get_image_variant("p-1", "shell_ab12cd34", 150, "jpg"))
+    assert os.path.exists(path)
+
+    file_utils.delete_file("images/p-1/shell_ab12cd34.jpg")
+    assert not os.path.exists(path)
+
+
+def _request(**headers: str) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_endpoint_rejects_bad_requests(variant_env) -> None:
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_product_image_variant("p-1", "missing", _request(), 300, "jpg"))
+    assert exc.value.status_code == 404
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_product_image_variant("p-1", "shell_ab12cd34", _request(), 300, "gif"))
+    assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_product_image_variant("..", "shell_ab12cd34", _request(), 300, "jpg"))
+    assert exc.value.status_code == 400
+
+    response = asyncio.run(get_product_image_variant("p-1", "shell_ab12cd34", _request(), 500, "jpg"))
+    assert response.media_type == "image/jpeg"
+
+    # Conditional headers are read from the request.
+    etag = response.headers["etag"]
+    cached = asyncio.run(get_product_image_variant("p-1", "shell_ab12cd34", _request(if_none_match=etag), 500, "jpg"))
+    assert cached.status_code == 304
+
+
+def test_negotiate_format_prefers_smallest_accepted(monkeypatch) -> None:
+    assert negotiate_format(None) == "jpg"
+    assert negotiate_format("image/webp,image/apng,*/*;q=0.8") == "webp"
+    assert negotiate_format("image/webp;q=0, image/jpeg") == "jpg"
+    # AVIF is only offered when an encoder is available.
+    assert negotiate_format("image/avif,image/webp") == ("avif" if file_utils.AVIF_SUPPORTED else "webp")
+    monkeypatch.setitem(image_variants.VARIANT_FORMATS, "avif", ("avif", "AVIF", 55, "image/avif"))
+    assert negotiate_format("image/avif,image/webp") == "avif"
+
+
+def test_static_mount_negotiates_format_and_width(variant_env) -> None:
+    webp_sibling = variant_env / "images" / "p-1" / "shell_ab12cd34.webp"
+    Image.new("RGB", (1000, 800)).save(webp_sibling, format="WEBP")
+    (variant_env / "robots.txt").write_text("ok")
+
+    app = Starlette()
+    app.mount("/static", ImageStaticFiles(directory=str(variant_env), images_subdir="images"))
+    client = TestClient(app)
+    url = "/static/images/p-1/shell_ab12cd34.jpg"
+
+    plain = client.get(url)
+    assert (plain.headers["content-type"], plain.headers["vary"]) == ("image/jpeg", "Accept")
+    assert "immutable" in plain.headers["cache-control"]
+    revalidated = client.get(url, headers={"If-None-Match": plain.headers["etag"]})
+    assert (revalidated.status_code, revalidated.headers["vary"]) == (304, "Accept")
+
+    webp = client.get(url, headers={"Accept": "image/webp,*/*"})
+    assert (webp.headers["content-type"], webp.headers["vary"]) == ("image/webp", "Accept")
+    assert webp.content == webp_sibling.read_bytes()
+
+    small = client.get(url + "?w=300", headers={"Accept": "image/webp,*/*"})
+    with Image.open(io.BytesIO(small.content)) as img:
+        assert (img.format, img.size) == ("WEBP", (300, 240))
+
+    assert client.get("/static/images/p-1/missing.jpg").status_code == 404
+    other = client.get("/static/robots.txt")
+    assert other.status_code == 200 and "vary" not in other.headers
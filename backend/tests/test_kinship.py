@@ -0,0 +1,165 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.admin import create_product
+from app.api.routers.breeders import get_breeder_inbreeding, get_pairing_matrix
+from app.models.models import Base, Product, User
+from app.schemas.schemas import ProductCreate
+from app.services import kinship as kinship_service
+from app.services.kinship import build_kinship_matrix, series_kinship
+from app.services.lineage_graph import get_lineage_graph
+
+
+def _build_test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal()
+
+
+def _fake_user() -> User:
+    return User(id="u-1", username="admin", hashed_password="x", role="admin", is_active=True)
+
+
+def _create(db, code: str, sex: str, **extra) -> str:
+    payload = ProductCreate.model_validate({"code": code, "series_id": "s-1", "sex": sex, **extra})
+    return asyncio.run(create_product(payload, _fake_user(), db)).data["id"]
+
+
+def _seed_family(db) -> dict:
+    # Founders SIRE x DAM -> full sibs SON, DAUGHTER; SON x DAUGHTER -> INBRED.
+    # HALF-SIS shares only SIRE; OUTSIDER is unrelated.
+    ids = {}
+    ids["SIRE"] = _create(db, "SIRE", "male")
+    ids["DAM"] = _create(db, "DAM", "female")
+    ids["OTHER-DAM"] = _create(db, "OTHER-DAM", "female")
+    ids["SON"] = _create(db, "SON", "male", sire_code="SIRE", dam_code="DAM")
+    ids["DAUGHTER"] = _create(db, "DAUGHTER", "female", sire_code="SIRE", dam_code="DAM")
+    ids["HALF-SIS"] = _create(db, "HALF-SIS", "female", sire_code="SIRE", dam_code="OTHER-DAM")
+    ids["INBRED"] = _create(db, "INBRED", "female", sire_code="SON", dam_code="DAUGHTER")
+    ids["OUTSIDER"] = _create(db, "OUTSIDER", "male")
+    return ids
+
+
+def test_kinship_matches_textbook_coefficients() -> None:
+    db = _build_test_db()
+    _seed_family(db)
+    kinship = series_kinship(get_lineage_graph(db), "s-1")
+
+    assert kinship.inbreeding("SIRE") == 0.0
+    assert kinship.inbreeding("SON") == 0.0
+    assert kinship.inbreeding("INBRED") == pytest.approx(0.25)
+
+    assert kinship.coancestry("SON", "DAUGHTER") == pytest.approx(0.25)  # full sibs
+    assert kinship.coancestry("SON", "HALF-SIS") == pytest.approx(0.125)  # half sibs
+    assert kinship.coancestry("SIRE", "DAUGHTER") == pytest.approx(0.25)  # parent x offspring
+    assert kinship.coancestry("OUTSIDER", "DAUGHTER") == 0.0
+    # Son x his inbred daughter: A = 0.5 * (A[SON,SON] + A[SON,DAUGHTER]) = 0.75.
+    assert kinship.coancestry("SON", "INBRED") == pytest.approx(0.375)
+
+
+def test_kinship_links_siblings_through_unregistered_parent() -> None:
+    db = _build_test_db()
+    _create(db, "A", "male", sire_code="GHOST-SIRE")
+    _create(db, "B", "female", sire_code="GHOST-SIRE")
+
+    kinship = series_kinship(get_lineage_graph(db), "s-1")
+    assert kinship.coancestry("A", "B") == pytest.approx(0.125)
+
+
+def test_series_kinship_is_memoized_until_graph_changes() -> None:
+    db = _build_test_db()
+    _seed_family(db)
+    graph = get_lineage_graph(db)
+
+    first = series_kinship(graph, "s-1")
+    assert series_kinship(graph, "s-1") is first
+
+    _create(db, "LATE", "male", sire_code="SON", dam_code="HALF-SIS")
+    second = series_kinship(graph, "s-1")
+    assert second is not first
+    assert second.inbreeding("LATE") == pytest.approx(0.125)
+
+
+def test_inbreeding_endpoint() -> None:
+    db = _build_test_db()
+    ids = _seed_family(db)
+
+    data = asyncio.run(get_breeder_inbreeding(ids["INBRED"], db)).data
+    assert data["code"] == "INBRED"
+    assert data["coefficient"] == 0.25
+    assert data["riskLevel"] == "high"
+    assert data["parentsKnown"] is True
+
+    assert asyncio.run(get_breeder_inbreeding(ids["OUTSIDER"], db)).data["riskLevel"] == "low"
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_breeder_inbreeding("missing", db))
+    assert exc.value.status_code == 404
+
+
+def test_pairing_matrix_endpoint() -> None:
+    db = _build_test_db()
+    _seed_family(db)
+
+    data = asyncio.run(get_pairing_matrix("s-1", db=db)).data
+    males = [m["code"] for m in data["males"]]
+    females = [f["code"] for f in data["females"]]
+    assert males == ["OUTSIDER", "SIRE", "SON"]
+    assert females == ["DAM", "DAUGHTER", "HALF-SIS", "INBRED", "OTHER-DAM"]
+
+    row = dict(zip(females, data["coefficients"][males.index("SON")]))
+    assert row["DAUGHTER"] == 0.25
+    assert row["HALF-SIS"] == 0.125
+    assert row["DAM"] == 0.25
+    assert row["OTHER-DAM"] == 0.0
+    assert all(v == 0.0 for v in data["coefficients"][males.index("OUTSIDER")])
+
+
+def test_pairing_matrix_scales_to_large_series(monkeypatch) -> None:
+    db = _build_test_db()
+    # 400 breeders over several generations: ~200 x 200 candidate pairs.
+    rows = []
+    for g in range(8):
+        for i in range(50):
+            sex = "male" if i % 2 == 0 else "female"
+            sire = f"G{g - 1}-{(i * 7) % 50 // 2 * 2}" if g else None
+            dam = f"G{g - 1}-{(i * 11) % 50 // 2 * 2 + 1}" if g else None
+            rows.append(Product(code=f"G{g}-{i}", price=0.0, series_id="s-1", sex=sex, sire_code=sire, dam_code=dam))
+    db.add_all(rows)
+    db.commit()
+
+    built = []
+
+    def _counting_build(graph, seed_codes):
+        matrix = build_kinship_matrix(graph, seed_codes)
+        built.append(len(matrix))
+        return matrix
+
+    monkeypatch.setattr(kinship_service, "build_kinship_matrix", _counting_build)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    data = asyncio.run(get_pairing_matrix("s-1", db=db)).data
+    assert len(data["males"]) == 200
+    assert len(data["females"]) == 200
+    # One lineage load and one relationship matrix over the 400 breeders (no per-pair work).
+    assert len(statements) == 1
+    assert built == [400]
+
+    # Repeat requests reuse the memoized matrix.
+    asyncio.run(get_pairing_matrix("s-1", db=db))
+    assert len(statements) == 1
+    assert built == [400]
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.admin import create_product, delete_product, update_product
+from app.api.routers.breeders import get_breeder_by_code
+from app.models.models import Base, User
+from app.schemas.schemas import ProductCreate, ProductUpdate
+from app.services.lineage_graph import get_lineage_graph
+
+
+def _build_test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal()
+
+
+def _fake_user() -> User:
+    return User(id="u-1", username="admin", hashed_password="x", role="admin", is_active=True)
+
+
+def _create(db, code: str, sex: str, **extra) -> str:
+    payload = ProductCreate.model_validate({"code": code, "series_id": "s-1", "sex": sex, **extra})
+    return asyncio.run(create_product(payload, _fake_user(), db)).data["id"]
+
+
+def test_lineage_graph_indexes_relationships() -> None:
+    db = _build_test_db()
+    _create(db, "SIRE", "male")
+    _create(db, "DAM", "female", mate_code="SIRE")
+    a = _create(db, "KID-A", "female", sire_code="SIRE", dam_code="DAM")
+    _create(db, "KID-B", "male", sire_code="SIRE", dam_code="DAM")
+    _create(db, "KID-C", "male", dam_code="DAM")
+    _create(db, "KID-D", "male", sire_code="SIRE")
+
+    graph = get_lineage_graph(db)
+    kid_a = graph.get_by_id(a)
+
+    assert graph.get("kid-a") is kid_a
+    assert [n.code for n in graph.offspring("SIRE", "male")] == ["KID-A", "KID-B", "KID-D"]
+    assert [n.code for n in graph.offspring("DAM", "female")] == ["KID-A", "KID-B", "KID-C"]
+    assert [n.code for n in graph.siblings(kid_a)] == ["KID-B"]
+    assert [(path, n.code) for path, n in graph.ancestors(kid_a, 3)] == [(("P",), "SIRE"), (("M",), "DAM")]
+    assert [n.code for n in graph.females_with_mate(["SIRE"])] == ["DAM"]
+
+
+def test_lineage_graph_is_patched_by_admin_writes() -> None:
+    db = _build_test_db()
+    sire_id = _create(db, "SIRE", "male")
+    kid_id = _create(db, "KID", "female", sire_code="SIRE")
+
+    graph = get_lineage_graph(db)
+    assert [n.code for n in graph.offspring("SIRE", "male")] == ["KID"]
+
+    # Code change on the child re-keys it; lineage edge stays.
+    asyncio.run(update_product(kid_id, ProductUpdate(code="KID-1"), _fake_user(), db))
+    assert get_lineage_graph(db) is graph
+    assert graph.get("KID") is None
+    assert [n.code for n in graph.offspring("SIRE", "male")] == ["KID-1"]
+    assert asyncio.run(get_breeder_by_code("KID-1", db)).data["id"] == kid_id
+
+    # Created after the graph was built.
+    _create(db, "KID-2", "male", sire_code="SIRE")
+    assert [n.code for n in graph.offspring("SIRE", "male")] == ["KID-1", "KID-2"]
+
+    asyncio.run(delete_product(sire_id, _fake_user(), db))
+    assert graph.get("SIRE") is None
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_breeder_by_code("SIRE", db))
+    assert exc.value.status_code == 404
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.breeders import get_male_mate_load
+from app.models.models import Base, BreederEvent, EggRecord, MatingRecord, Product
+from app.services.lineage_graph import get_lineage_graph
+
+
+def _build_test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal()
+
+
+def _add(db, code: str, sex: str, **extra) -> Product:
+    p = Product(code=code, price=0.0, series_id="s-1", sex=sex, **extra)
+    db.add(p)
+    db.flush()
+    return p
+
+
+def _event(db, female: Product, event_type: str, when: datetime, male_code=None) -> None:
+    db.add(BreederEvent(product_id=female.id, event_type=event_type, event_date=when, male_code=male_code))
+
+
+def _seed(db, now: datetime) -> Product:
+    male = _add(db, "M", "male")
+    other = _add(db, "OTHER", "male")
+    days = lambda n: now - timedelta(days=n)  # noqa: E731
+
+    f1 = _add(db, "F1", "female")
+    _event(db, f1, "mating", days(40), "M")
+    _event(db, f1, "egg", days(30))
+
+    f2 = _add(db, "F2", "female")
+    db.add(MatingRecord(female_id=f2.id, male_id=male.id, mated_at=days(10)))
+    db.add(EggRecord(female_id=f2.id, laid_at=days(12)))
+
+    _add(db, "F3", "female", mate_code="M")
+    _add(db, "F3-RETIRED", "female", mate_code="M", exclude_from_breeding=True)
+
+    f4 = _add(db, "F4", "female")
+    _event(db, f4, "mating", days(3), "OTHER")
+    _event(db, f4, "egg", days(30))
+
+    f5 = _add(db, "F5", "female")
+    _event(db, f5, "mating", days(50), "M")
+    db.add(MatingRecord(female_id=f5.id, male_id=other.id, mated_at=days(5)))
+    _event(db, f5, "egg", days(8))
+    db.add(EggRecord(female_id=f5.id, laid_at=days(20)))
+
+    f6 = _add(db, "F6", "female")
+    _event(db, f6, "mating", days(15), "M")
+    db.add(EggRecord(female_id=f6.id, laid_at=days(9)))
+
+    db.commit()
+    return male
+
+
+def test_mate_load_combines_events_and_legacy_records() -> None:
+    db = _build_test_db()
+    now = datetime.utcnow().replace(microsecond=0)
+    male = _seed(db, now)
+
+    data = asyncio.run(get_male_mate_load(male.id, limit=80, include_fallback=True, include_retired=False, db=db)).data
+    items = {it["femaleCode"]: it for it in data["items"]}
+
+    assert [it["femaleCode"] for it in data["items"]] == ["F1", "F6", "F2", "F5", "F3"]
+    assert data["totals"] == {"relatedFemales": 5, "needMating": 1, "warning": 1}
+
+    assert items["F1"]["status"] == "warning"
+    assert items["F1"]["lastEggAt"] == (now - timedelta(days=30)).isoformat()
+    assert items["F1"]["lastMatingWithThisMaleAt"] == (now - timedelta(days=40)).isoformat()
+
+    assert items["F2"]["status"] == "normal"
+    assert items["F2"]["lastMatingAt"] == (now - timedelta(days=10)).isoformat()
+
+    assert items["F3"]["lastEggAt"] is None
+    assert items["F3"]["lastMatingWithThisMaleAt"] is None
+
+    # Later mating with another male clears the need but keeps this male's last date.
+    assert items["F5"]["status"] == "normal"
+    assert items["F5"]["lastEggAt"] == (now - timedelta(days=8)).isoformat()
+    assert items["F5"]["lastMatingAt"] == (now - timedelta(days=5)).isoformat()
+    assert items["F5"]["lastMatingWithThisMaleAt"] == (now - timedelta(days=50)).isoformat()
+
+    assert items["F6"]["status"] == "need_mating"
+    assert items["F6"]["daysSinceEgg"] == 9
+
+    retired = asyncio.run(get_male_mate_load(male.id, limit=80, include_fallback=True, include_retired=True, db=db)).data
+    assert "F3-RETIRED" in {it["femaleCode"] for it in retired["items"]}
+
+    no_fallback = asyncio.run(get_male_mate_load(male.id, limit=80, include_fallback=False, include_retired=False, db=db)).data
+    assert "F3" not in {it["femaleCode"] for it in no_fallback["items"]}
+
+
+def test_mate_load_runs_a_single_aggregate_query() -> None:
+    db = _build_test_db()
+    male_id = _seed(db, datetime.utcnow()).id
+    get_lineage_graph(db)
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        asyncio.run(get_male_mate_load(male_id, limit=80, include_fallback=True, include_retired=False, db=db))
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    # Male lookup + one windowed query for all related females.
+    assert len(statements) == 2
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import sys
+
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api.routers.admin import (
+    create_product,
+    delete_product_image,
+    reorder_product_images,
+    set_product_main_image,
+)
+from app.api.routers.breeders import get_breeder_by_code, list_breeders
+from app.models.models import Base, Product, ProductImage, User
+from app.schemas.schemas import ProductCreate, ProductImageCreate
+
+
+def _build_test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal()
+
+
+def _fake_user() -> User:
+    return User(id="u-1", username="admin", hashed_password="x", role="admin", is_active=True)
+
+
+def _seed(db) -> tuple[Product, list[ProductImage]]:
+    product = Product(code="P-1", price=0.0, series_id="s-1", sex="female")
+    db.add(product)
+    db.flush()
+    images = [
+        ProductImage(product_id=product.id, url=f"images/{product.id}/{name}.jpg", alt=name, type=t, sort_order=i)
+        for i, (name, t) in enumerate([("a", "gallery"), ("b", "main"), ("c", "gallery")])
+    ]
+    db.add_all(images)
+    db.commit()
+    return product, images
+
+
+def _summary(db, product_id: str) -> tuple:
+    db.expire_all()
+    p = db.query(Product).filter(Product.id == product_id).one()
+    name = lambda url: url.rsplit("/", 1)[-1] if url else None  # noqa: E731
+    return name(p.main_image_url), name(p.thumbnail_url)
+
+
+def test_admin_image_endpoints_maintain_summary_columns() -> None:
+    db = _build_test_db()
+    product, (a, b, c) = _seed(db)
+    user = _fake_user()
+
+    asyncio.run(set_product_main_image(product.id, c.id, user, db))
+    assert _summary(db, product.id) == ("c.jpg", "a.jpg")
+
+    asyncio.run(
+        reorder_product_images(
+            product.id,
+            [{"id": c.id, "sort_order": 0}, {"id": a.id, "sort_order": 1}, {"id": b.id, "sort_order": 2}],
+            user,
+            db,
+        )
+    )
+    assert _summary(db, product.id) == ("c.jpg", "c.jpg")
+
+    # Deleting the main image promotes the first remaining one.
+    asyncio.run(delete_product_image(product.id, c.id, user, db))
+    assert _summary(db, product.id) == ("a.jpg", "a.jpg")
+
+    asyncio.run(delete_product_image(product.id, a.id, user, db))
+    asyncio.run(delete_product_image(product.id, b.id, user, db))
+    assert _summary(db, product.id) == (None, None)
+
+
+def test_create_product_fills_summary_columns_from_its_images() -> None:
+    db = _build_test_db()
+    payload = ProductCreate(
+        code="P-2",
+        images=[
+            ProductImageCreate(url="https://cdn.example.com/g.jpg", alt="g", type="gallery", sort_order=0),
+            ProductImageCreate(url="https://cdn.example.com/m.jpg", alt="m", type="main", sort_order=1),
+        ],
+    )
+    product_id = asyncio.run(create_product(payload, _fake_user(), db)).data["id"]
+
+    assert _summary(db, product_id) == ("m.jpg", "g.jpg")
+
+
+def test_list_endpoints_read_summary_columns_without_galleries() -> None:
+    db = _build_test_db()
+    product, (a, b, c) = _seed(db)
+    asyncio.run(set_product_main_image(product.id, b.id, _fake_user(), db))
+
+    items = asyncio.run(
+        list_breeders(
+            response=Response(), series_id="s-1", sex=None, limit=10, db=db, format_="json", include_images=False
+        )
+    ).data
+    assert items[0]["images"] == []
+    assert items[0]["mainImageUrl"] == f"/static/images/{product.id}/b.jpg"
+    assert items[0]["thumbnailUrl"] == f"/static/images/{product.id}/a.jpg"
+
+    full = asyncio.run(
+        list_breeders(response=Response(), series_id="s-1", sex=None, limit=10, db=db, format_="json")
+    ).data
+    assert [img["alt"] for img in full[0]["images"]] == ["a", "b", "c"]
+
+    by_code = asyncio.run(get_breeder_by_code("p-1", db)).data
+    assert by_code["mainImageUrl"] == f"images/{product.id}/b.jpg"
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, text
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.db.sqlite_pragmas import install_sqlite_pragmas, parse_pragmas, sqlite_pragmas
+
+
+def _pragma(conn, name: str):
+    return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_profiles_and_overrides(monkeypatch) -> None:
+    monkeypatch.delenv("SQLITE_PRAGMA_PROFILE", raising=False)
+    monkeypatch.setenv("SQLITE_PRAGMAS", "mmap_size=0, Cache_Size=-2000")
+
+    pragmas = sqlite_pragmas()
+    assert pragmas["journal_mode"] == "WAL"
+    assert pragmas["mmap_size"] == "0" and pragmas["cache_size"] == "-2000"
+
+    assert "journal_mode" not in sqlite_pragmas("default", overrides="")
+    assert parse_pragmas("a=1,,broken,b = 2") == {"a": "1", "b": "2"}
+    with pytest.raises(ValueError):
+        sqlite_pragmas("fast-and-loose")
+
+
+def test_wal_profile_applied_to_every_connection(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}", connect_args={"check_same_thread": False})
+    install_sqlite_pragmas(engine, sqlite_pragmas("wal", overrides="busy_timeout=1234"))
+
+    with engine.connect() as a, engine.connect() as b:
+        for conn in (a, b):
+            assert _pragma(conn, "journal_mode") == "wal"
+            assert _pragma(conn, "synchronous") == 1  # NORMAL
+            assert _pragma(conn, "temp_store") == 2  # MEMORY
+            assert _pragma(conn, "busy_timeout") == 1234
+            assert _pragma(conn, "cache_size") == -65536
+
+
+def test_readers_are_not_blocked_by_an_open_write_transaction(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}", connect_args={"check_same_thread": False})
+    install_sqlite_pragmas(engine, sqlite_pragmas("wal", overrides="busy_timeout=0"))
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    writer = engine.connect()
+    tx = writer.begin()
+    writer.execute(text("INSERT INTO t VALUES (2)"))
+    # Force the write lock the way a large import spills its page cache.
+    writer.execute(text("UPDATE t SET x = x + 10"))
+    try:
+        with engine.connect() as reader:
+            # Readers see the last committed snapshot instead of "database is locked".
+            assert reader.execute(text("SELECT x FROM t")).scalars().all() == [1]
+    finally:
+        tx.rollback()
+        writer.close()
+
+
+def test_memory_engines_skip_file_pragmas() -> None:
+    engine = create_engine("sqlite:///:memory:")
+    installed = install_sqlite_pragmas(engine, sqlite_pragmas("wal", overrides=""))
+    assert "journal_mode" not in installed and "mmap_size" not in installed
+    with engine.connect() as conn:
+        assert _pragma(conn, "temp_store") == 2
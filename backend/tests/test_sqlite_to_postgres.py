@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS = BACKEND_ROOT / "scripts"
+
+
+def _run(args, db_url: str, check: bool = True) -> subprocess.CompletedProcess:
+    env = os.environ.copy()
+    env["DATABASE_URL"] = db_url
+    return subprocess.run(
+        [sys.executable, *args],
+        env=env,
+        cwd=str(BACKEND_ROOT),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        check=check,
+    )
+
+
+def _url(db_file: Path) -> str:
+    return f"sqlite:///{db_file.as_posix()}"
+
+
+def _init_source(db_file: Path) -> None:
+    _run([str(SCRIPTS / "db_migrate.py"), "upgrade"], _url(db_file))
+    conn = sqlite3.connect(db_file)
+    try:
+        conn.execute("INSERT INTO series (id, code, name, is_active) VALUES ('s-1', 'SER-1', 'Baihua', 1)")
+        for i in range(25):
+            conn.execute(
+                "INSERT INTO products (id, code, price, series_id, sex, exclude_from_breeding, created_at) "
+                "VALUES (?, ?, 0.0, 's-1', 'female', 0, '2026-10-01 08:00:00.000000')",
+                (f"p-{i}", f"HB-{i}"),
+            )
+        conn.execute(
+            "INSERT INTO product_images (id, product_id, url, alt, type, sort_order) "
+            "VALUES ('img-1', 'p-0', 'images/p-0/a.jpg', 'a', 'main', 0)"
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_copies_every_table_in_batches(tmp_path: Path) -> None:
+    source = tmp_path / "app.db"
+    _init_source(source)
+    # Any SQLAlchemy URL works as the target; CI points it at a Postgres container.
+    target_url = os.getenv("TEST_POSTGRES_URL") or f"sqlite:///{(tmp_path / 'target.db').as_posix()}"
+
+    dry = _run([str(SCRIPTS / "sqlite_to_postgres.py"), "--source", str(source), "--target", target_url, "--dry-run"], _url(source))
+    assert "OK (dry-run)." in dry.stdout
+
+    args = [str(SCRIPTS / "sqlite_to_postgres.py"), "--source", str(source), "--target", target_url, "--apply"]
+    proc = _run([*args, "--batch-size", "10", "--truncate"], _url(source))
+    assert "OK (apply). 27 rows copied." in proc.stdout
+
+    # A second run refuses to append to the copied data.
+    again = _run(args, _url(source), check=False)
+    assert again.returncode != 0 and "target tables are not empty" in again.stdout
+
+
+def test_refuses_dangling_foreign_keys(tmp_path: Path) -> None:
+    source = tmp_path / "app.db"
+    _init_source(source)
+    conn = sqlite3.connect(source)
+    conn.execute("DELETE FROM products WHERE id = 'p-0'")
+    conn.commit()
+    conn.close()
+
+    proc = _run(
+        [str(SCRIPTS / "sqlite_to_postgres.py"), "--source", str(source), "--target", "sqlite://", "--dry-run"],
+        _url(source),
+        check=False,
+    )
+    assert proc.returncode == 1
+    assert "product_images.product_id -> products.id: 1 rows" in proc.stdout
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+import sys
+
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+# Allow running tests from backend/ without installing the package.
+HERE = os.path.abspath(os.path.dirname(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.api import upload_limits
+from app.api.upload_limits import UploadSizeLimitMiddleware
+from app.core import file_utils
+from app.schemas.schemas import ErrorResponse
+
+BOUNDARY = "limitboundary"
+CHUNK = 16 * 1024
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.exception_handler(HTTPException)
+    async def http_exception_handler(request, exc):
+        return JSONResponse(status_code=exc.status_code, content=ErrorResponse(message=exc.detail).model_dump())
+
+    @app.post("/upload")
+    async def upload(files: list[UploadFile] = File(...)):
+        return {"sizes": [len(await f.read()) for f in files]}
+
+    app.add_middleware(UploadSizeLimitMiddleware)
+    return app
+
+
+def _multipart(payload_bytes: int) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="files"; filename="a.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + b"x" * payload_bytes + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def _send_request(body: bytes, *, content_length: bool):
+    """Drive the ASGI app with `body` in CHUNK pieces; returns (status, json, chunks read)."""
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+    if content_length:
+        headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/upload",
+        "raw_path": b"/upload",
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    chunks = [body[i : i + CHUNK] for i in range(0, len(body), CHUNK)]
+    read = 0
+    sent = []
+
+    async def receive():
+        nonlocal read
+        if read < len(chunks):
+            read += 1
+            return {"type": "http.request", "body": chunks[read - 1], "more_body": read < len(chunks)}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(_app()(scope, receive, send))
+    status = next(m["status"] for m in sent if m["type"] == "http.response.start")
+    content = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return status, json.loads(content), read
+
+
+def test_upload_within_the_limit_is_parsed(monkeypatch) -> None:
+    monkeypatch.setattr(file_utils, "UPLOAD_MAX_REQUEST_BYTES", 256 * 1024)
+    status, content, _ = _send_request(_multipart(200 * 1024), content_length=True)
+    assert status == 200
+    assert content == {"sizes": [200 * 1024]}
+
+
+def test_oversized_content_length_is_rejected_without_reading_the_body(monkeypatch) -> None:
+    monkeypatch.setattr(file_utils, "UPLOAD_MAX_REQUEST_BYTES", 256 * 1024)
+    status, content, read = _send_request(_multipart(1024 * 1024), content_length=True)
+    assert status == 413
+    assert content["success"] is False
+    assert read == 0
+
+
+def test_oversized_chunked_body_stops_being_read_at_the_limit(monkeypatch) -> None:
+    monkeypatch.setattr(file_utils, "UPLOAD_MAX_REQUEST_BYTES", 256 * 1024)
+    body = _multipart(1024 * 1024)
+    status, content, read = _send_request(body, content_length=False)
+    assert status == 413
+    assert content["success"] is False
+    allowed = 256 * 1024 + upload_limits.MULTIPART_OVERHEAD_BYTES
+    # Reading stopped at the first chunk past the limit, far short of the whole body.
+    assert read == allowed // CHUNK + 1
+    assert read * CHUNK < len(body)
@@ -240,7 +240,11 @@ export const adminProductService = {
       url: string;
       alt: string;
       type: 'main' | 'gallery' | 'dimensions' | 'detail';
+      // 'pending' until the background job has written the resized files.
+      status?: 'pending' | 'ready';
     }>;
+    // Poll GET /api/admin/image-jobs/{jobId} for progress.
+    jobId?: string;
   }> {
     try {
       const formData = new FormData();
@@ -254,7 +258,9 @@ export const adminProductService = {
           url: string;
           alt: string;
           type: 'main' | 'gallery' | 'dimensions' | 'detail';
+          status?: 'pending' | 'ready';
         }>;
+        jobId?: string;
       }>>(
         ENDPOINTS.PRODUCT_IMAGES(productId),
         formData,
@@ -37,6 +37,9 @@ export interface Breeder {
   lastMatingAt?: string | null;
   daysSinceEgg?: number | null;
 
+  // Denormalized main/first image (present even when the gallery is omitted).
+  mainImageUrl?: string | null;
+  thumbnailUrl?: string | null;
   images?: Array<{ id?: string; url: string; alt: string; type: string; sortOrder?: number }>;
 
   createdAt?: string;